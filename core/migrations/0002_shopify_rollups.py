@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopifyRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('covered_since', models.DateField()),
+                ('brand', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='shopify_rollup', to='core.brand')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ShopifyDailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders', models.IntegerField(default=0)),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopify_daily', to='core.brand')),
+            ],
+            options={
+                'unique_together': {('brand', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ShopifyOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField()),
+                ('day', models.DateField()),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('updated_at', models.DateTimeField()),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopify_orders', to='core.brand')),
+            ],
+            options={
+                'unique_together': {('brand', 'order_id')},
+            },
+        ),
+    ]
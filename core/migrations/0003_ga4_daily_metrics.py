@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_shopify_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GA4DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sessions', models.IntegerField(default=0)),
+                ('users', models.IntegerField(default=0)),
+                ('purchases', models.IntegerField(default=0)),
+                ('fetched_at', models.DateTimeField(auto_now=True)),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ga4_days', to='core.brand')),
+            ],
+            options={
+                'unique_together': {('brand', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ga4_daily_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentionCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_id', models.CharField(max_length=64)),
+                ('last_mention_id', models.CharField(blank=True, max_length=64)),
+                ('last_published_at', models.DateTimeField(blank=True, null=True)),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mention_cursors', to='core.brand')),
+            ],
+            options={
+                'unique_together': {('brand', 'alert_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MentionDailyBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_id', models.CharField(max_length=64)),
+                ('day', models.DateField()),
+                ('volume', models.IntegerField(default=0)),
+                ('positive', models.IntegerField(default=0)),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mention_days', to='core.brand')),
+            ],
+            options={
+                'unique_together': {('brand', 'alert_id', 'day')},
+            },
+        ),
+    ]
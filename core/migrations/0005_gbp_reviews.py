@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_mention_buckets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GBPReviewState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_update_time', models.CharField(blank=True, max_length=40)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('review_count', models.IntegerField(default=0)),
+                ('brand', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='gbp_review_state', to='core.brand')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GBPReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_id', models.CharField(max_length=128)),
+                ('rating', models.PositiveSmallIntegerField()),
+                ('update_time', models.DateTimeField()),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gbp_reviews', to='core.brand')),
+            ],
+            options={
+                'unique_together': {('brand', 'review_id')},
+            },
+        ),
+    ]
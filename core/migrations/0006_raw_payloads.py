@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+from utils.payloads import pack
+
+BATCH = 2000
+
+
+def move_raw_json(apps, schema_editor):
+    """Move existing inline raw_json into RawPayload, one copy per distinct body."""
+    RawPayload = apps.get_model("core", "RawPayload")
+    MetricSnapshot = apps.get_model("core", "MetricSnapshot")
+    pending = MetricSnapshot.objects.exclude(raw_json={}).filter(payload__isnull=True).order_by("pk")
+    while True:
+        rows = list(pending.only("pk", "raw_json")[:BATCH])
+        if not rows:
+            return
+        payloads = {}
+        for row in rows:
+            digest, blob, size = pack(row.raw_json)
+            payloads.setdefault(digest, RawPayload(digest=digest, data=blob, size=size))
+            row.payload_id, row.raw_json = digest, {}
+        RawPayload.objects.bulk_create(payloads.values(), ignore_conflicts=True)
+        MetricSnapshot.objects.bulk_update(rows, ["payload", "raw_json"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_gbp_reviews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RawPayload',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='metricsnapshot',
+            name='raw_json',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='metricsnapshot',
+            name='payload',
+            field=models.ForeignKey(blank=True, db_column='payload_digest', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.rawpayload'),
+        ),
+        migrations.RunPython(move_raw_json, migrations.RunPython.noop),
+    ]
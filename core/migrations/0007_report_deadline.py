@@ -0,0 +1,28 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_raw_payloads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='deadline_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='finalised_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('collecting', 'Collecting'), ('finalising', 'Finalising'), ('ready', 'Ready'), ('error', 'Error')], default='queued', max_length=12),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_report_deadline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('cursor', models.BigIntegerField(default=0)),
+                ('brands_total', models.PositiveIntegerField(default=0)),
+                ('brands_dispatched', models.PositiveIntegerField(default=0)),
+                ('shards_dispatched', models.PositiveIntegerField(default=0)),
+                ('domains_dispatched', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'get_latest_by': 'started_at',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_refresh_runs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='metricsnapshot',
+            name='reused_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.metricsnapshot'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+from core.models.domain import normalise_domain
+
+
+def link_competitors(apps, schema_editor):
+    """Point existing competitors at their canonical Domain."""
+    Domain = apps.get_model("core", "Domain")
+    Competitor = apps.get_model("core", "Competitor")
+    hosts = {}
+    for comp in Competitor.objects.filter(domain__isnull=True).exclude(website="").iterator():
+        host = normalise_domain(comp.website)
+        if not host:
+            continue
+        if host not in hosts:
+            hosts[host], _ = Domain.objects.get_or_create(host=host)
+        comp.domain = hosts[host]
+        comp.save(update_fields=["domain"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_snapshot_reuse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Domain',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('host', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='competitor',
+            name='domain',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='competitors', to='core.domain'),
+        ),
+        migrations.CreateModel(
+            name='DomainSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_name', models.CharField(max_length=64)),
+                ('value', models.FloatField(blank=True, null=True)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('domain', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='core.domain')),
+                ('payload', models.ForeignKey(blank=True, db_column='payload_digest', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.rawpayload')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['domain', 'metric_name', 'fetched_at'], name='core_domain_domain__e4bf3f_idx')],
+                'unique_together': {('domain', 'metric_name', 'fetched_at')},
+            },
+        ),
+        migrations.RunPython(link_competitors, migrations.RunPython.noop),
+    ]
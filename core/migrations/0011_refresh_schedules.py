@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_competitor_domains'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_name', models.CharField(max_length=64)),
+                ('change_rate', models.FloatField(default=1.0)),
+                ('samples', models.PositiveSmallIntegerField(default=0)),
+                ('interval', models.PositiveIntegerField()),
+                ('next_refresh_at', models.DateTimeField(db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='refresh_schedules', to='core.brand')),
+            ],
+            options={
+                'unique_together': {('brand', 'metric_name')},
+            },
+        ),
+    ]
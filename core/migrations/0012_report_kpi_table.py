@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_refresh_schedules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='kpi_table',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
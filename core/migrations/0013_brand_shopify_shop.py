@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_report_kpi_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brand',
+            name='shopify_shop',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_brand_shopify_shop'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brandoauthtoken',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
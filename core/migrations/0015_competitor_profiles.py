@@ -0,0 +1,56 @@
+# Generated by Django 5.0.14 on 2026-10-17 04:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.models.domain import normalise_profile
+
+
+def link_profiles(apps, schema_editor):
+    """Point existing competitors at their canonical social profile Domains."""
+    Domain = apps.get_model("core", "Domain")
+    Competitor = apps.get_model("core", "Competitor")
+    sources = {
+        "twitter_profile": ("twitter", "twitter_handle"),
+        "instagram_profile": ("instagram", "instagram_url"),
+        "facebook_profile": ("facebook", "facebook_url"),
+    }
+    hosts = {}
+    for comp in Competitor.objects.iterator():
+        changed = []
+        for field, (network, source) in sources.items():
+            host = normalise_profile(network, getattr(comp, source))
+            if not host:
+                continue
+            if host not in hosts:
+                hosts[host], _ = Domain.objects.get_or_create(host=host)
+            setattr(comp, field, hosts[host])
+            changed.append(field)
+        if changed:
+            comp.save(update_fields=changed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_oauth_token_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competitor',
+            name='facebook_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.domain'),
+        ),
+        migrations.AddField(
+            model_name='competitor',
+            name='instagram_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.domain'),
+        ),
+        migrations.AddField(
+            model_name='competitor',
+            name='twitter_profile',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.domain'),
+        ),
+        migrations.RunPython(link_profiles, migrations.RunPython.noop),
+    ]
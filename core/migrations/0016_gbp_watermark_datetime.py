@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def parse_watermarks(apps, schema_editor):
+    """Carry the RFC 3339 text watermarks over as datetimes."""
+    GBPReviewState = apps.get_model("core", "GBPReviewState")
+    for state in GBPReviewState.objects.exclude(last_update_time=""):
+        state.last_update_at = parse_datetime(state.last_update_time)
+        state.save(update_fields=["last_update_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_competitor_profiles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gbpreviewstate',
+            name='last_update_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(parse_watermarks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='gbpreviewstate',
+            name='last_update_time',
+        ),
+        migrations.RenameField(
+            model_name='gbpreviewstate',
+            old_name='last_update_at',
+            new_name='last_update_time',
+        ),
+    ]
@@ -1,3 +1,6 @@
 from .oauth import *
+from .domain import *
 from .report import *
 from .metrics import *
+from .ingest import *
+from .refresh import *
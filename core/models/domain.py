@@ -0,0 +1,106 @@
+"""Canonical competitor domains, shared by every tenant that tracks them.
+
+Website-derived public metrics (Domain Authority, backlinks, traffic
+estimates) depend only on the site, so they are stored once per domain as
+DomainSnapshot rows and read by every report whose competitors point at it.
+Social profiles are canonical the same way – ``twitter.com/<handle>``,
+``instagram.com/<user>``, ``facebook.com/<page>`` – and carry the
+follower counts.
+"""
+from __future__ import annotations
+from urllib.parse import urlsplit
+
+from django.db import models
+from django.utils import timezone
+
+__all__ = ["normalise_domain", "normalise_profile", "Domain", "DomainSnapshot"]
+
+
+def normalise_domain(url: str) -> str:
+    """
+    ``https://www.Example.com/shop/`` → ``example.com/shop``: scheme, ``www.``,
+    default ports, query, fragment and trailing slash dropped; host lower-cased.
+    """
+    parts = urlsplit(url.strip() if "//" in url else f"//{url.strip()}")
+    host = (parts.hostname or "").rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/")
+    return f"{host}{path}" if host else ""
+
+
+# social network → canonical profile host
+PROFILE_HOSTS = {"twitter": "twitter.com", "instagram": "instagram.com", "facebook": "facebook.com"}
+
+
+def normalise_profile(network: str, value: str) -> str:
+    """
+    ``("twitter", "@Acme")`` / ``("instagram", "https://www.instagram.com/Acme/")``
+    → ``twitter.com/acme`` / ``instagram.com/acme``; ``""`` without a handle.
+    """
+    value = (value or "").strip()
+    if "/" in value:  # a profile URL – the handle is its first path segment
+        value = normalise_domain(value).partition("/")[2].split("/")[0]
+    handle = value.lstrip("@").lower()
+    return f"{PROFILE_HOSTS[network]}/{handle}" if handle else ""
+
+
+class Domain(models.Model):
+    host = models.CharField(max_length=255, unique=True)  # normalise_domain() output
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.host
+
+    @classmethod
+    def for_url(cls, url: str) -> "Domain | None":
+        host = normalise_domain(url or "")
+        if not host:
+            return None
+        domain, _ = cls.objects.get_or_create(host=host)
+        return domain
+
+    @classmethod
+    def for_profile(cls, network: str, value: str) -> "Domain | None":
+        host = normalise_profile(network, value)
+        if not host:
+            return None
+        domain, _ = cls.objects.get_or_create(host=host)
+        return domain
+
+    @property
+    def profile(self) -> tuple[str, str] | None:
+        """``(network, handle)`` for a social profile, None for a website."""
+        host, _, path = self.host.partition("/")
+        for network, profile_host in PROFILE_HOSTS.items():
+            if host == profile_host and path:
+                return network, path.split("/")[0]
+        return None
+
+
+class DomainSnapshot(models.Model):
+    """One website-level KPI pull, shared across tenants (cf. MetricSnapshot)."""
+
+    domain = models.ForeignKey(Domain, on_delete=models.CASCADE, related_name="snapshots")
+    metric_name = models.CharField(max_length=64)
+    value = models.FloatField(null=True, blank=True)
+    payload = models.ForeignKey(
+        "core.RawPayload",
+        on_delete=models.PROTECT,
+        related_name="+",
+        db_column="payload_digest",
+        null=True,
+        blank=True,
+    )
+    fetched_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["domain", "metric_name", "fetched_at"]),
+        ]
+        unique_together = ("domain", "metric_name", "fetched_at")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.domain} | {self.metric_name} @ {self.fetched_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,141 @@
+"""Local state kept by incremental ingestion (webhooks, cursors, daily pulls).
+
+Instead of re-downloading a provider's whole history on every report we keep
+small rollups here and only ask the provider for what changed since.
+"""
+from __future__ import annotations
+
+from django.db import models
+
+from core.models.oauth import Brand  # pragma: no cover
+
+__all__ = [
+    "ShopifyOrder",
+    "ShopifyDailyRevenue",
+    "ShopifyRollupState",
+    "GA4DailyMetric",
+    "MentionCursor",
+    "MentionDailyBucket",
+    "GBPReview",
+    "GBPReviewState",
+]
+
+
+# ─────────────────────────────  Shopify  ────────────────────────────────────
+class ShopifyOrder(models.Model):
+    """Ledger of orders seen via webhook/backfill so updates & deletes stay idempotent."""
+
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name="shopify_orders")
+    order_id = models.BigIntegerField()
+    day = models.DateField()  # UTC day of created_at
+    total_price = models.DecimalField(max_digits=14, decimal_places=2)
+    updated_at = models.DateTimeField()  # Shopify's updated_at – drops stale deliveries
+
+    class Meta:
+        unique_together = ("brand", "order_id")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} | order {self.order_id}"
+
+
+class ShopifyDailyRevenue(models.Model):
+    """Per-day revenue / order-count rollup maintained as orders arrive."""
+
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name="shopify_daily")
+    day = models.DateField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("brand", "day")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} | {self.day}: {self.revenue} / {self.orders}"
+
+
+class ShopifyRollupState(models.Model):
+    """First day from which the rollups are complete for a brand."""
+
+    brand = models.OneToOneField(Brand, on_delete=models.CASCADE, related_name="shopify_rollup")
+    covered_since = models.DateField()
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} rollups since {self.covered_since}"
+
+
+# ─────────────────────────────  GA4  ────────────────────────────────────────
+class GA4DailyMetric(models.Model):
+    """One GA4 day per brand; 30-day windows are summed from these rows."""
+
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name="ga4_days")
+    day = models.DateField()
+    sessions = models.IntegerField(default=0)
+    users = models.IntegerField(default=0)
+    purchases = models.IntegerField(default=0)
+    fetched_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("brand", "day")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} | GA4 {self.day}"
+
+
+# ─────────────────────────────  Mention  ────────────────────────────────────
+class MentionCursor(models.Model):
+    """Newest mention already counted for a (brand, alert) – the next pull starts after it."""
+
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name="mention_cursors")
+    alert_id = models.CharField(max_length=64)
+    last_mention_id = models.CharField(max_length=64, blank=True)
+    last_published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("brand", "alert_id")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} | alert {self.alert_id} @ {self.last_mention_id}"
+
+
+class MentionDailyBucket(models.Model):
+    """Running mention volume / positive-tone count per (brand, alert, day)."""
+
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name="mention_days")
+    alert_id = models.CharField(max_length=64)
+    day = models.DateField()
+    volume = models.IntegerField(default=0)
+    positive = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("brand", "alert_id", "day")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} | alert {self.alert_id} {self.day}: {self.volume}"
+
+
+# ─────────────────────────────  Google Business Profile  ────────────────────
+class GBPReview(models.Model):
+    """Star rating per review so edits adjust the running sum instead of double-counting."""
+
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name="gbp_reviews")
+    review_id = models.CharField(max_length=128)
+    rating = models.PositiveSmallIntegerField()
+    update_time = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("brand", "review_id")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} | review {self.review_id}: {self.rating}"
+
+
+class GBPReviewState(models.Model):
+    """Sync watermark + running rating aggregates per brand."""
+
+    brand = models.OneToOneField(Brand, on_delete=models.CASCADE, related_name="gbp_review_state")
+    last_update_time = models.DateTimeField(null=True, blank=True)  # newest review updateTime seen
+    rating_sum = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} reviews @ {self.last_update_time}"
@@ -1,6 +1,8 @@
 """MetricSnapshot records every individual KPI pull so we can rewind history.
-Each snapshot stores both the *numeric value* we will chart later and the
-*raw JSON* response for auditability / recalculation.
+Each snapshot stores both the *numeric value* we will chart later and a link
+to the *raw JSON* response for auditability / recalculation. Raw responses
+live in RawPayload, zstd-compressed and keyed by content hash, so the several
+KPIs cut from one response share a single stored copy.
 """
 from __future__ import annotations
 
@@ -12,7 +14,25 @@ from django.utils import timezone
 from core.models.oauth import Brand  # pragma: no cover
 from core.models.report import Report  # pragma: no cover
 
-__all__ = ["MetricSnapshot"]
+__all__ = ["RawPayload", "MetricSnapshot"]
+
+
+class RawPayload(models.Model):
+    """One provider response, stored once however many snapshots cite it."""
+
+    digest = models.CharField(max_length=64, primary_key=True)  # sha256 of canonical JSON
+    data = models.BinaryField()  # zstd-compressed canonical JSON
+    size = models.PositiveIntegerField()  # uncompressed bytes
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"payload {self.digest[:12]} ({len(self.data)}/{self.size} B)"
+
+    @property
+    def json(self) -> dict:
+        from utils.payloads import decode
+
+        return decode(self.data)
 
 
 class MetricSnapshot(models.Model):
@@ -36,10 +56,29 @@ class MetricSnapshot(models.Model):
 
     metric_name = models.CharField(max_length=64)
     value = models.FloatField(null=True, blank=True)
-    raw_json = models.JSONField()
+    payload = models.ForeignKey(
+        RawPayload,
+        on_delete=models.PROTECT,
+        related_name="+",
+        db_column="payload_digest",
+        null=True,
+        blank=True,
+    )
+    # legacy inline copy – rows written before RawPayload existed
+    raw_json = models.JSONField(default=dict, blank=True)
 
     fetched_at = models.DateTimeField(default=timezone.now, db_index=True)
 
+    # set when this row was copied from a still-fresh snapshot instead of
+    # fetched; copies never serve as the source of another reuse
+    reused_from = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+
     class Meta:
         indexes = [
             models.Index(fields=["brand", "metric_name", "fetched_at"]),
@@ -50,5 +89,10 @@ class MetricSnapshot(models.Model):
             "fetched_at",
         )
 
+    @property
+    def raw(self) -> dict:
+        """The provider response behind this value (payload or legacy column)."""
+        return self.payload.json if self.payload_id else self.raw_json
+
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.brand} | {self.metric_name} @ {self.fetched_at:%Y‑%m‑%d %H:%M}"
\ No newline at end of file
@@ -17,6 +17,8 @@ class Brand(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     name = models.CharField(max_length=128, blank=True)
     website = models.URLField(blank=True, null=True)
+    # "<shop>.myshopify.com", set when Shopify connects; order webhooks are matched on it
+    shopify_shop = models.CharField(max_length=255, blank=True, default="", db_index=True)
 
     def __str__(self) -> str:
         return self.name or f"Brand<{self.pk}>"
@@ -40,6 +42,8 @@ class BrandOAuthToken(models.Model):
     refresh_token = EncryptedTextField(blank=True, null=True)
     expires_at = models.DateTimeField()
     scope = models.TextField(blank=True)
+    # bumped on reconnect / refresh – worker-side token caches compare against it
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("brand", "provider")
@@ -60,7 +64,7 @@ class BrandOAuthToken(models.Model):
         elif self.provider == self.PROVIDER_SHOPIFY:
             # Shopify tokens do not expire by default – noop
             return
-        self.save(update_fields=["access_token", "refresh_token", "expires_at"])
+        self.save(update_fields=["access_token", "refresh_token", "expires_at", "updated_at"])
 
     # ──────────────────────────── provider‑specific flows ─────────────────────────────
     def _refresh_meta(self):
@@ -0,0 +1,55 @@
+"""Checkpoint + adaptive per-metric schedule for the fleet refresh
+(``core.tasks.refresh_all_reports``)."""
+from __future__ import annotations
+from django.db import models
+from django.utils import timezone
+
+from .oauth import Brand
+
+__all__ = ["RefreshRun", "RefreshSchedule"]
+
+
+class RefreshRun(models.Model):
+    """
+    One fleet refresh. ``cursor`` is the last Brand pk whose shard has been
+    dispatched, so a run that dies part-way resumes after it instead of
+    starting over.
+    """
+
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)  # every shard dispatched
+
+    cursor = models.BigIntegerField(default=0)
+    brands_total = models.PositiveIntegerField(default=0)
+    brands_dispatched = models.PositiveIntegerField(default=0)
+    shards_dispatched = models.PositiveIntegerField(default=0)
+    domains_dispatched = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        get_latest_by = "started_at"
+
+    def __str__(self) -> str:  # pragma: no cover
+        state = "done" if self.finished_at else f"at brand {self.cursor}"
+        return f"Refresh {self.started_at:%Y-%m-%d %H:%M} ({state})"
+
+
+class RefreshSchedule(models.Model):
+    """
+    When a (brand, metric) series is next worth re-pulling. ``interval`` is
+    derived from ``change_rate`` – the share of recent pulls whose value moved
+    – so volatile series refresh often and flat ones rarely (utils.volatility).
+    """
+
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name="refresh_schedules")
+    metric_name = models.CharField(max_length=64)
+    change_rate = models.FloatField(default=1.0)
+    samples = models.PositiveSmallIntegerField(default=0)
+    interval = models.PositiveIntegerField()  # seconds
+    next_refresh_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("brand", "metric_name")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.brand} | {self.metric_name} every {self.interval // 3600}h"
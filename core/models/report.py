@@ -5,19 +5,27 @@ from django.db import models
 from django.utils import timezone
 
 from .oauth import Brand  # one Brand per logged‑in workspace
+from .domain import Domain
 
 class Report(models.Model):
-    STATUS_CHOICES = [
-        ("queued", "Queued"),
-        ("running", "Running"),
-        ("ready", "Ready"),
-        ("error", "Error"),
-    ]
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        COLLECTING = "collecting", "Collecting"
+        FINALISING = "finalising", "Finalising"
+        READY = "ready", "Ready"
+        ERROR = "error", "Error"
+
+    STATUS_CHOICES = Status.choices
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     owner = models.ForeignKey(Brand, on_delete=models.CASCADE)
     created_at = models.DateTimeField(default=timezone.now)
-    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default="queued")
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.QUEUED)
+
+    # latency budget: past this the report is finalised with whatever was collected
+    deadline_at = models.DateTimeField(null=True, blank=True)
+    finalised_at = models.DateTimeField(null=True, blank=True)
     ai_insight = models.TextField(blank=True, default="")
 
     # main site (our brand)
@@ -26,6 +34,10 @@ class Report(models.Model):
     # JSON blob where Celery drops raw metrics / KPI table once compiled
     data = models.JSONField(default=dict, blank=True)
 
+    # KPI table materialised at finalisation (utils.kpi.kpi_table); reset to
+    # NULL whenever snapshots for this report are written, rebuilt on next read
+    kpi_table = models.JSONField(null=True, blank=True)
+
     # PDF path (filled when WeasyPrint export finishes)
     pdf_path = models.FilePathField(path="reports", match=r".*\.pdf$", null=True, blank=True)
 
@@ -45,5 +57,31 @@ class Competitor(models.Model):
     instagram_url = models.URLField(blank=True)
     twitter_handle = models.CharField(max_length=60, blank=True)
 
+    # canonical site / social profiles shared with every other report tracking them
+    domain = models.ForeignKey(Domain, on_delete=models.PROTECT, related_name="competitors", null=True, blank=True)
+    twitter_profile = models.ForeignKey(Domain, on_delete=models.PROTECT, related_name="+", null=True, blank=True)
+    instagram_profile = models.ForeignKey(Domain, on_delete=models.PROTECT, related_name="+", null=True, blank=True)
+    facebook_profile = models.ForeignKey(Domain, on_delete=models.PROTECT, related_name="+", null=True, blank=True)
+
+    # every Domain FK above – the KPI table merges their snapshots per competitor
+    DOMAIN_FIELDS = ("domain", "twitter_profile", "instagram_profile", "facebook_profile")
+    _PROFILE_SOURCES = {
+        "twitter_profile": ("twitter", "twitter_handle"),
+        "instagram_profile": ("instagram", "instagram_url"),
+        "facebook_profile": ("facebook", "facebook_url"),
+    }
+
+    def save(self, *args, **kwargs):
+        if self.website and self.domain_id is None:
+            self.domain = Domain.for_url(self.website)
+        for field, (network, source) in self._PROFILE_SOURCES.items():
+            if getattr(self, source) and getattr(self, f"{field}_id") is None:
+                setattr(self, field, Domain.for_profile(network, getattr(self, source)))
+        super().save(*args, **kwargs)
+
+    @property
+    def domain_ids(self) -> list[int]:
+        return [pk for pk in (getattr(self, f"{f}_id") for f in self.DOMAIN_FIELDS) if pk]
+
     def __str__(self):
         return self.website
\ No newline at end of file
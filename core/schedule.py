@@ -2,12 +2,15 @@
 from __future__ import annotations
 from datetime import timedelta
 from celery.schedules import crontab
+from django.conf import settings
 
 def register(celery_app):
-    # Run every Monday at 03:00 UTC
+    # Run every day at 03:00 UTC – each run only pulls the series that are
+    # due (utils.volatility), so REFRESH_INTERVAL_MIN can go down to a day
     celery_app.conf.beat_schedule.update({
-        "weekly_metric_refresh": {
+        "daily_metric_refresh": {
             "task": "core.tasks.refresh_all_reports",
-            "schedule": crontab(hour=3, minute=0, day_of_week="mon"),
+            "schedule": crontab(hour=3, minute=0),
+            "options": {"queue": "scheduled", "priority": settings.PRIORITY_SCHEDULED},
         },
     })
\ No newline at end of file
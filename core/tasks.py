@@ -1,15 +1,21 @@
 from __future__ import annotations
+import asyncio
+import json
 import logging
 from typing import Any, Dict, List
 from datetime import timedelta
 
-from celery import shared_task, chain, group
+from celery import shared_task, chain, chord
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 
 from core.models.oauth import Brand
 from core.models.metrics import MetricSnapshot
 from core.models.report import Report, Competitor
+from core.models.refresh import RefreshRun
+from core.models.domain import Domain, DomainSnapshot
 from utils.api_clients import (
     MozClient,
     SerpstackClient,
@@ -21,145 +27,969 @@ from utils.api_clients import (
     MetaInsightsClient,
     GBPClient,
     ShopifyClient,
+    gather_calls,
 )
+from utils.ingest import (
+    apply_mention_buckets,
+    mention_cursor,
+    seed_shopify_rollups,
+    shopify_rollup_summary,
+    sync_ga4_daily,
+    sync_gbp_reviews,
+)
+from utils.snapshots import SnapshotWriter, store_domain_snapshots
+from utils.circuit import CircuitOpenError
+from utils.redis_conn import get_redis
+from utils import volatility
+from utils import cache as response_cache
+from utils.kpi import kpi_records, kpi_table, materialise_kpi_table
 
 logger = logging.getLogger(__name__)
 
 
-def _store_snapshot(
-    *,
-    report: Report | None,
-    brand: Brand,
-    metric: str,
-    value: float | None,
-    raw: Dict[str, Any] | None = None,
-) -> None:
-    """
-    Helper to create a MetricSnapshot for a given report & brand.
-    """
-    MetricSnapshot.objects.create(
-        report=report,
-        brand=brand,
-        metric_name=metric,
-        value=value,
-        raw_json=raw or {},
-        fetched_at=timezone.now(),
-    )
+# Plan keys served by fetch_batched_public_metrics (multi-target endpoints)
+BATCHED_PLAN_KEYS = ("domain_authority", "traffic", "twitter")
 
 
-@shared_task(name="fetch_public_metrics")
-def fetch_public_metrics(report_id: str, brand_id: str) -> None:
+def _report_brands(report: Report) -> List[Brand]:
     """
-    Pull public metrics (SEO, social counts, traffic estimates, mentions) for a brand.
+    Brands collected per report – just the owner. Competitors are canonical
+    Domains (site + social profiles) shared across tenants, collected by
+    ``fetch_domain_metrics``.
     """
-    report = Report.objects.filter(id=report_id).first()
-    brand = Brand.objects.get(id=brand_id)
+    return [report.owner]
+
+
+def _competitor_domains(competitors) -> List[tuple]:
+    """``(owner id, domain id, host)`` for every site / profile Domain of the *competitors* queryset."""
+    rows: List[tuple] = []
+    for field in Competitor.DOMAIN_FIELDS:
+        rows += (
+            competitors.filter(**{f"{field}__isnull": False})
+            .values_list("report__owner_id", f"{field}_id", f"{field}__host")
+        )
+    return rows
+
+
+def _report_domain_ids(report: Report) -> List[int]:
+    return list(dict.fromkeys(domain_id for _owner, domain_id, _host in _competitor_domains(report.competitors.all())))
+
+
+def _public_plan(brand: Brand, *, batched: bool = False) -> List[tuple]:
+    """
+    Every independent public API call for *brand* as
+    ``(key, client class, method, args)``. Nothing is constructed here – a
+    missing API key must only fail the steps that need it, inside the
+    caller's error handling (see ``_with_clients``).
+    With *batched* the multi-target calls are left to the batch stage.
+    """
+    plan: List[tuple] = [
+        ("domain_authority", MozClient, "domain_authority", (brand.website,)),
+        ("backlinks", MozClient, "backlinks", (brand.website,)),
+        ("serp", SerpstackClient, "serp_features", (brand.name or brand.website,)),
+        ("traffic", DataForSEOClient, "traffic_estimate", (brand.website,)),
+    ]
+    # social handles are optional brand attributes, like the Mention ids below
+    twitter = getattr(brand, "twitter", None)
+    instagram = getattr(brand, "instagram", None)
+    facebook_page = getattr(brand, "facebook_page", None)
+    if twitter:
+        plan.append(("twitter", TwitterClient, "public_metrics", (twitter,)))
+    if instagram:
+        plan.append(("instagram", SocialBladeClient, "instagram_stats", (instagram,)))
+    if facebook_page:
+        plan.append(("facebook", SocialBladeClient, "facebook_stats", (facebook_page,)))
+    if getattr(brand, "mention_account_id", None) and getattr(brand, "mention_alert_id", None):
+        # only mentions newer than the stored cursor are fetched
+        since_id = mention_cursor(brand, brand.mention_alert_id)
+        plan.append(("mentions", MentionClient, "new_mention_buckets", (brand.mention_account_id, brand.mention_alert_id, since_id)))
+    if batched:
+        plan = [step for step in plan if step[0] not in BATCHED_PLAN_KEYS]
+    return plan
+
+
+def _with_clients(plan: List[tuple]) -> List[tuple]:
+    """*plan* with each client class replaced by one shared instance (``gather_calls`` shape)."""
+    clients: Dict[type, Any] = {}
+    for _key, cls, _method, _args in plan:
+        if cls not in clients:
+            clients[cls] = cls()
+    return [(key, clients[cls], method, args) for key, cls, method, args in plan]
 
-    moz = MozClient()
-    serp = SerpstackClient()
-    dfs = DataForSEOClient()
-    tw = TwitterClient()
-    men = MentionClient()
-    sb = SocialBladeClient()
 
+def _store_public(snaps: SnapshotWriter, report: Report | None, brand: Brand, results: Dict[str, Any]) -> None:
+    """Buffer whichever results of ``_public_plan`` are present as MetricSnapshots."""
     # 1) Domain Authority & Backlinks (Moz)
-    da = moz.domain_authority(brand.website)
-    _store_snapshot(report=report, brand=brand, metric="domain_authority", value=da, raw=None)
-    bl = moz.backlinks(brand.website)
-    _store_snapshot(report=report, brand=brand, metric="backlinks", value=bl, raw=None)
+    if "domain_authority" in results:
+        snaps.add(brand, "domain_authority", results["domain_authority"], report=report)
+    if "backlinks" in results:
+        snaps.add(brand, "backlinks", results["backlinks"], report=report)
 
     # 2) SERP features (featured snippet & local pack)
-    serp_data = serp.serp_features(brand.name or brand.website)
-    _store_snapshot(report=report, brand=brand, metric="serp_featured_snippet", value=int(serp_data["featured_snippet"]), raw=serp_data)
-    _store_snapshot(report=report, brand=brand, metric="serp_local_pack", value=int(serp_data["local_pack"]), raw=serp_data)
+    if "serp" in results:
+        serp_data = results["serp"]
+        snaps.add(brand, "serp_featured_snippet", int(serp_data["featured_snippet"]), serp_data, report=report)
+        snaps.add(brand, "serp_local_pack", int(serp_data["local_pack"]), serp_data, report=report)
 
     # 3) Traffic Estimates (DataForSEO)
-    traffic = dfs.traffic_estimate(brand.website)
-    _store_snapshot(report=report, brand=brand, metric="est_organic_visits", value=traffic.get("organic"), raw=traffic)
-    _store_snapshot(report=report, brand=brand, metric="est_paid_visits", value=traffic.get("paid"), raw=traffic)
+    if "traffic" in results:
+        traffic = results["traffic"]
+        snaps.add(brand, "est_organic_visits", traffic.get("organic"), traffic, report=report)
+        snaps.add(brand, "est_paid_visits", traffic.get("paid"), traffic, report=report)
 
     # 4) Twitter followers
-    if brand.twitter:
-        tw_data = tw.public_metrics(brand.twitter)
-        _store_snapshot(report=report, brand=brand, metric="twitter_followers", value=tw_data.get("followers_count"), raw=tw_data)
+    if "twitter" in results:
+        tw_data = results["twitter"]
+        snaps.add(brand, "twitter_followers", tw_data.get("followers_count"), tw_data, report=report)
 
     # 5) SocialBlade Instagram & Facebook
-    if brand.instagram:
-        ig_data = sb.instagram_stats(brand.instagram)
-        _store_snapshot(report=report, brand=brand, metric="instagram_followers", value=ig_data.get("followers"), raw=ig_data)
-        _store_snapshot(report=report, brand=brand, metric="instagram_growth_30d", value=ig_data.get("growth_30d"), raw=ig_data)
-    if brand.facebook_page:
-        fb_data = sb.facebook_stats(brand.facebook_page)
-        _store_snapshot(report=report, brand=brand, metric="facebook_followers", value=fb_data.get("followers"), raw=fb_data)
+    if "instagram" in results:
+        ig_data = results["instagram"]
+        snaps.add(brand, "instagram_followers", ig_data.get("followers"), ig_data, report=report)
+        snaps.add(brand, "instagram_growth_30d", ig_data.get("growth_30d"), ig_data, report=report)
+    if "facebook" in results:
+        fb_data = results["facebook"]
+        snaps.add(brand, "facebook_followers", fb_data.get("followers"), fb_data, report=report)
 
     # 6) Mention.com sentiment & volume
-    if getattr(brand, "mention_account_id", None) and getattr(brand, "mention_alert_id", None):
-        men_data = men.brand_mentions(brand.mention_account_id, brand.mention_alert_id)
-        _store_snapshot(report=report, brand=brand, metric="mentions_volume", value=men_data["volume"], raw=men_data)
-        _store_snapshot(report=report, brand=brand, metric="mentions_sentiment", value=men_data["sentiment_pct"], raw=men_data)
+    if "mentions" in results:
+        men_data = apply_mention_buckets(brand, brand.mention_alert_id, results["mentions"])
+        snaps.add(brand, "mentions_volume", men_data["volume"], men_data, report=report)
+        snaps.add(brand, "mentions_sentiment", men_data["sentiment_pct"], men_data, report=report)
 
 
-@shared_task(name="fetch_private_metrics")
-def fetch_private_metrics(report_id: str, brand_id: str) -> None:
+@shared_task(name="fetch_public_metrics")
+def fetch_public_metrics(
+    report_id: str,
+    brand_id: str,
+    concurrent: bool | None = None,
+    batched: bool = False,
+    keys: List[str] | None = None,
+) -> List[Dict[str, Any]]:
     """
-    Pull private metrics (GA4, IG reach, GBP reviews, Shopify) for a brand.
+    Pull public metrics (SEO, social counts, traffic estimates, mentions) for a brand.
+    Pass *batched* when ``fetch_batched_public_metrics`` covers the multi-target calls,
+    *keys* to run only those plan steps.
+
+    In concurrent mode every provider call is issued at once (capped by
+    ``PUBLIC_FETCH_CONCURRENCY``), so wall-clock time tracks the slowest
+    provider rather than the sum of all of them. Snapshots are written after
+    the fan-out completes, outside the event loop. A failing call only loses
+    its own metrics; returns one ``_step_status`` per plan step.
     """
     report = Report.objects.filter(id=report_id).first()
     brand = Brand.objects.get(id=brand_id)
 
-    # GA4 analytics
-    ga4 = GA4Client(brand)
-    ga4_data = ga4.summary()
-    for key, val in ga4_data.items():
-        _store_snapshot(report=report, brand=brand, metric=f"ga4_{key}", value=val, raw=ga4_data)
+    plan = _public_plan(brand, batched=batched)
+    if keys is not None:
+        plan = [step for step in plan if step[0] in keys]
+    plan = _with_clients(plan)
+    if concurrent is None:
+        concurrent = settings.PUBLIC_FETCH_CONCURRENT
+    if concurrent:
+        results = asyncio.run(gather_calls(plan, limit=settings.PUBLIC_FETCH_CONCURRENCY))
+    else:
+        results = {}
+        for key, client, method, args in plan:
+            try:
+                results[key] = getattr(client, method)(*args)
+            except Exception as exc:
+                results[key] = exc
+
+    statuses: List[Dict[str, Any]] = []
+    for key, client, _method, _args in plan:
+        if isinstance(results[key], Exception):
+            exc = results.pop(key)
+            logger.warning("%s for brand %s failed: %r", key, brand.id, exc)
+            statuses.append(_step_status(brand.id, key, client.PROVIDER, error=repr(exc)))
+        else:
+            statuses.append(_step_status(brand.id, key, client.PROVIDER))
+
+    with SnapshotWriter(report) as snaps:
+        _store_public(snaps, report, brand, results)
+    return statuses
+
+
+# Plan key → metric names it writes (a trailing "_" matches a prefix)
+STEP_FAMILIES = {
+    "domain_authority": ("domain_authority",),
+    "backlinks": ("backlinks",),
+    "serp": ("serp_",),
+    "traffic": ("est_organic_visits", "est_paid_visits"),
+    "twitter": ("twitter_followers",),
+    "instagram": ("instagram_",),
+    "facebook": ("facebook_",),
+    "mentions": ("mentions_",),
+    "ga4": ("ga4_",),
+    "ig_insights": ("ig_reach",),
+    "gbp": ("gbp_",),
+    "shopify": ("shopify_",),
+}
+
+
+def _step_for(metric: str) -> str | None:
+    for key, names in STEP_FAMILIES.items():
+        if any(metric == n or (n.endswith("_") and metric.startswith(n)) for n in names):
+            return key
+    return None
+
+
+def _reuse_fresh(snaps: SnapshotWriter, report: Report, brand: Brand, keys) -> set:
+    """
+    Copy into *report* the latest snapshots of every step in *keys* that is
+    still within its ``METRIC_FRESHNESS`` window for *brand*; returns the
+    reused keys. Only original fetches count – a copy never keeps a metric fresh.
+    """
+    now = timezone.now()
+    cutoffs = {
+        key: now - timedelta(seconds=settings.METRIC_FRESHNESS[key])
+        for key in keys if settings.METRIC_FRESHNESS.get(key)
+    }
+    if not cutoffs:
+        return set()
+
+    latest: Dict[str, Dict[str, Any]] = {}
+    recent = (
+        MetricSnapshot.objects
+        .filter(brand=brand, reused_from__isnull=True, fetched_at__gte=min(cutoffs.values()))
+        .exclude(report=report)
+        .order_by("-fetched_at")
+        .values("id", "brand_id", "metric_name", "value", "payload_id", "fetched_at")
+    )
+    for row in recent:
+        latest.setdefault(row["metric_name"], row)
+
+    reused = set()
+    for metric, row in latest.items():
+        key = _step_for(metric)
+        if key in cutoffs and row["fetched_at"] >= cutoffs[key]:
+            snaps.copy(row, report=report)
+            reused.add(key)
+    return reused
+
+
+def _step_status(brand_id, key: str, provider: str, *, error: str | None = None) -> Dict[str, Any]:
+    """Result of one collection subtask as seen by ``collect_results``."""
+    return {"brand": brand_id, "key": key, "provider": provider, "ok": error is None, "error": error}
+
+
+def _provider_options(provider: str) -> Dict[str, Any]:
+    """``PUBLIC_PROVIDER_TASKS`` defaults overlaid with the *provider* entry."""
+    policy = settings.PUBLIC_PROVIDER_TASKS
+    return {**policy["default"], **policy.get(provider, {})}
+
+
+def _public_step_signature(report_id: str, brand_id, key: str, provider: str, *, expires=None):
+    """``fetch_public_step`` for one plan step, carrying its provider's limits / queue."""
+    opts = _provider_options(provider)
+    sig = fetch_public_step.si(report_id, brand_id, key).set(
+        soft_time_limit=opts["soft_time_limit"], time_limit=opts["time_limit"],
+    )
+    if opts.get("queue"):
+        sig = sig.set(queue=opts["queue"])
+    if expires is not None:  # not worth starting once the report deadline has passed
+        sig = sig.set(expires=expires)
+    return sig
+
+
+def _public_step_signatures(report_id: str, brand: Brand, *, batched: bool = True, expires=None) -> List:
+    """One ``fetch_public_step`` signature per plan step of *brand*."""
+    return [
+        _public_step_signature(report_id, brand.id, key, client_cls.PROVIDER, expires=expires)
+        for key, client_cls, _method, _args in _public_plan(brand, batched=batched)
+    ]
+
+
+@shared_task(bind=True, name="fetch_public_step")
+def fetch_public_step(self, report_id: str, brand_id: str, key: str) -> Dict[str, Any]:
+    """
+    One provider call of ``_public_plan`` (*key*) for a brand, stored on its own
+    – or a copy of the brand's last snapshots when they are still fresh.
+
+    Failures are retried per ``PUBLIC_PROVIDER_TASKS``; once retries run out –
+    or the soft time limit hits, or the circuit is open – the task *returns*
+    a failed status instead of raising, so the surrounding chord still fires.
+    """
+    report = Report.objects.filter(id=report_id).first()
+    brand = Brand.objects.get(id=brand_id)
+    step = next((s for s in _public_plan(brand) if s[0] == key), None)
+    if step is None:  # brand lost that profile since the plan was built
+        return _step_status(brand.id, key, "")
+    _key, client_cls, method, args = step
+    provider = client_cls.PROVIDER
+    opts = _provider_options(provider)
+
+    if report is not None:
+        with SnapshotWriter(report) as snaps:
+            if _reuse_fresh(snaps, report, brand, [key]):
+                return _step_status(brand.id, key, provider)
+
+    try:
+        client = client_cls()
+    except Exception as exc:  # missing credentials – retrying won't help
+        logger.warning("%s for brand %s: %s client unavailable: %r", key, brand.id, provider, exc)
+        return _step_status(brand.id, key, provider, error=repr(exc))
+    try:
+        result = getattr(client, method)(*args)
+    except (SoftTimeLimitExceeded, CircuitOpenError) as exc:
+        logger.warning("%s for brand %s gave up: %r", key, brand.id, exc)
+        return _step_status(brand.id, key, provider, error=repr(exc))
+    except Exception as exc:
+        if self.request.retries < opts["max_retries"]:
+            raise self.retry(exc=exc, countdown=opts["retry_delay"] * 2 ** self.request.retries)
+        logger.warning("%s for brand %s failed after %d retries: %r", key, brand.id, self.request.retries, exc)
+        return _step_status(brand.id, key, provider, error=repr(exc))
+
+    with SnapshotWriter(report) as snaps:
+        _store_public(snaps, report, brand, {key: result})
+    return _step_status(brand.id, key, provider)
+
+
+# Steps stored once per canonical Domain (DomainSnapshot) → provider
+DOMAIN_STEPS = {
+    "domain_authority": MozClient.PROVIDER,
+    "backlinks": MozClient.PROVIDER,
+    "traffic": DataForSEOClient.PROVIDER,
+    # social profile Domains – one step each, named after the network
+    "twitter": TwitterClient.PROVIDER,
+    "instagram": SocialBladeClient.PROVIDER,
+    "facebook": SocialBladeClient.PROVIDER,
+}
+WEBSITE_STEPS = ("domain_authority", "backlinks", "traffic")
+
+
+def _domain_steps(domain: Domain) -> set:
+    """Steps that apply to *domain*: its network for a social profile, else the website ones."""
+    profile = domain.profile
+    return {profile[0]} if profile else set(WEBSITE_STEPS)
+
+
+def _stale_domain_keys(domains: List[Domain]) -> Dict[int, set]:
+    """``{domain pk: steps with no DomainSnapshot inside their METRIC_FRESHNESS window}``."""
+    now = timezone.now()
+    cutoffs = {
+        key: now - timedelta(seconds=settings.METRIC_FRESHNESS.get(key, 0))
+        for key in DOMAIN_STEPS
+    }
+    stale = {d.pk: _domain_steps(d) for d in domains}
+    recent = (
+        DomainSnapshot.objects
+        .filter(domain__in=domains, fetched_at__gte=min(cutoffs.values()))
+        .values_list("domain_id", "metric_name", "fetched_at")
+    )
+    for domain_id, metric, fetched_at in recent:
+        key = _step_for(metric)
+        if key in cutoffs and fetched_at >= cutoffs[key]:
+            stale[domain_id].discard(key)
+    return stale
+
+
+@shared_task(name="fetch_domain_metrics")
+def fetch_domain_metrics(domain_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Public metrics for canonical competitor domains – website KPIs for sites,
+    follower counts for social profiles. A domain is only fetched for the
+    steps that aren't fresh, however many tenants and reports reference it;
+    DA, traffic and Twitter go out as multi-target batches.
+    Returns one ``_step_status`` per provider call, like the batched stage.
+    """
+    domains = list(Domain.objects.filter(id__in=domain_ids))
+    stale = _stale_domain_keys(domains)
+    statuses: List[Dict[str, Any]] = []
+    rows: List[tuple] = []
+
+    def targets(key: str) -> List[Domain]:
+        return [d for d in domains if key in stale[d.pk]]
+
+    def attempt(key: str, provider: str, call):
+        try:
+            out = call()
+        except Exception as exc:
+            logger.warning("Domain %s (%s) failed: %r", key, provider, exc)
+            statuses.append(_step_status(None, key, provider, error=repr(exc)))
+            return None
+        statuses.append(_step_status(None, key, provider))
+        return out
+
+    # clients are built inside attempt(): a missing key is a failed step, not a failed chord
+    da_targets = targets("domain_authority")
+    if da_targets:
+        da = attempt("domain_authority", MozClient.PROVIDER, lambda: MozClient().domain_authority_many([d.host for d in da_targets]))
+        rows += [(d, "domain_authority", da[d.host], None) for d in da_targets] if da else []
+    for d in targets("backlinks"):
+        total = attempt("backlinks", MozClient.PROVIDER, lambda: MozClient().backlinks(d.host))
+        if total is not None:
+            rows.append((d, "backlinks", total, None))
+    tr_targets = targets("traffic")
+    if tr_targets:
+        hosts = [d.host for d in tr_targets]
+        traffic = attempt("traffic", DataForSEOClient.PROVIDER, lambda: DataForSEOClient().traffic_estimate(hosts))
+        if traffic is not None and len(hosts) == 1:
+            traffic = {hosts[0]: traffic}
+        for d in tr_targets if traffic else []:
+            t = traffic.get(d.host, {})
+            rows += [(d, "est_organic_visits", t.get("organic"), t), (d, "est_paid_visits", t.get("paid"), t)]
+
+    # social profiles – the same metric names _store_public writes for brands
+    tw_targets = targets("twitter")
+    if tw_targets:
+        handles = {d.pk: TwitterClient.normalise_handle(d.profile[1]) for d in tw_targets}
+        followers = attempt("twitter", TwitterClient.PROVIDER, lambda: TwitterClient().public_metrics_many(list(handles.values())))
+        for d in tw_targets if followers else []:
+            if handles[d.pk] in followers:
+                tw = followers[handles[d.pk]]
+                rows.append((d, "twitter_followers", tw.get("followers_count"), tw))
+    for d in targets("instagram"):
+        ig = attempt("instagram", SocialBladeClient.PROVIDER, lambda: SocialBladeClient().instagram_stats(d.profile[1]))
+        if ig is not None:
+            rows += [(d, "instagram_followers", ig.get("followers"), ig), (d, "instagram_growth_30d", ig.get("growth_30d"), ig)]
+    for d in targets("facebook"):
+        fb = attempt("facebook", SocialBladeClient.PROVIDER, lambda: SocialBladeClient().facebook_stats(d.profile[1]))
+        if fb is not None:
+            rows.append((d, "facebook_followers", fb.get("followers"), fb))
+
+    store_domain_snapshots(rows)
+    return statuses
+
+
+@shared_task(name="collect_results")
+def collect_results(results: List[Any], report_id: str) -> Dict[str, Any]:
+    """
+    Chord callback for the collection stage (public steps + private job):
+    record on ``Report.data`` which providers / metrics are missing so the
+    report can say so instead of failing.
+    """
+    statuses: List[Dict[str, Any]] = []
+    for res in results:
+        statuses += res if isinstance(res, list) else [res]
+    missing = [st for st in statuses if not st["ok"]]
+
+    report = Report.objects.get(id=report_id)
+    if report.status == Report.Status.COLLECTING:  # the deadline may have finalised it already
+        report.data["missing_providers"] = sorted({st["provider"] for st in missing})
+        report.data["missing_metrics"] = [
+            {"brand": st["brand"], "key": st["key"], "provider": st["provider"], "error": st["error"]} for st in missing
+        ]
+        report.save(update_fields=["data"])
+    return {"ok": len(statuses) - len(missing), "missing": len(missing)}
+
+
+@shared_task(name="fetch_batched_public_metrics")
+def fetch_batched_public_metrics(
+    report_ids: List[str],
+    brand_ids: List[str] | None = None,
+    due: Dict[str, List[str]] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Batch stage for multi-target endpoints: Domain Authority (Moz url_metrics),
+    traffic estimates (DataForSEO) and Twitter followers (bulk user lookup)
+    for the brand of every report in *report_ids* – plus any report-less *brand_ids* from a scheduled
+    refresh – in as few provider calls as each API allows, split back into
+    per-brand snapshots. Metrics still fresh for a report are copied instead
+    of fetched; *due* (``{brand id: plan keys}``) limits the report-less
+    brands to those steps. Returns one ``_step_status`` per provider batch.
+    """
+    pairs: List[tuple] = []
+    reports = Report.objects.filter(id__in=report_ids).select_related("owner")
+    for report in reports:
+        pairs += [(report, b) for b in _report_brands(report)]
+    pairs += [(None, b) for b in Brand.objects.filter(id__in=brand_ids or [])]
+
+    # one flush for every report / brand in the batch, reused copies included
+    snaps = SnapshotWriter()
+    fresh = {
+        (report.pk, brand.pk): _reuse_fresh(snaps, report, brand, BATCHED_PLAN_KEYS)
+        for report, brand in pairs if report is not None
+    }
+
+    def needs(report, brand, key: str) -> bool:
+        if report is None and due is not None:
+            return key in due.get(str(brand.pk), ())
+        return key not in fresh.get((report.pk if report else None, brand.pk), ())
+
+    def targets(key: str, attr: str) -> List[str]:
+        return list(dict.fromkeys(
+            getattr(b, attr, None) for r, b in pairs if getattr(b, attr, None) and needs(r, b, key)
+        ))
+
+    # separate lists – a brand whose DA was reused must not be paid for at Moz
+    da_sites = targets("domain_authority", "website")
+    traffic_sites = targets("traffic", "website")
+    handles = targets("twitter", "twitter")
 
+    statuses: List[Dict[str, Any]] = []
+
+    def attempt(key: str, provider: str, call):
+        # one provider failing must not sink the other two batches
+        try:
+            out = call()
+        except Exception as exc:
+            logger.warning("Batched %s (%s) failed: %r", key, provider, exc)
+            statuses.append(_step_status(None, key, provider, error=repr(exc)))
+            return None
+        statuses.append(_step_status(None, key, provider))
+        return out
+
+    da: Dict[str, int] | None = {}
+    if da_sites:
+        da = attempt("domain_authority", MozClient.PROVIDER, lambda: MozClient().domain_authority_many(da_sites))
+    traffic: Dict[str, Any] | None = {}
+    if traffic_sites:
+        traffic = attempt("traffic", DataForSEOClient.PROVIDER, lambda: DataForSEOClient().traffic_estimate(traffic_sites))
+        if traffic is not None and len(traffic_sites) == 1:
+            traffic = {traffic_sites[0]: traffic}
+    followers: Dict[str, Any] | None = {}
+    if handles:
+        followers = attempt("twitter", TwitterClient.PROVIDER, lambda: TwitterClient().public_metrics_many(handles))
+    norm = TwitterClient.normalise_handle
+
+    with snaps:
+        for report, brand in pairs:
+            results: Dict[str, Any] = {}
+            if brand.website and da is not None and needs(report, brand, "domain_authority"):
+                results["domain_authority"] = da[brand.website]
+            if brand.website and traffic is not None and needs(report, brand, "traffic"):
+                results["traffic"] = traffic.get(brand.website, {})
+            twitter = getattr(brand, "twitter", None)
+            if twitter and followers and needs(report, brand, "twitter") and norm(twitter) in followers:
+                results["twitter"] = followers[norm(twitter)]
+            _store_public(snaps, report, brand, results)
+    return statuses
+
+
+def _collect_ga4(snaps: SnapshotWriter, brand: Brand) -> None:
+    # GA4 analytics – current vs previous period summed from the local daily
+    # rows; one batch call brings the days not stored yet plus totalUsers
+    comparison = sync_ga4_daily(brand, GA4Client(brand))
+    for key, val in comparison["current"].items():
+        snaps.add(brand, f"ga4_{key}", val, comparison)
+    for key, val in comparison["previous"].items():
+        snaps.add(brand, f"ga4_{key}_prev", val, comparison)
+
+
+def _collect_ig_insights(snaps: SnapshotWriter, brand: Brand) -> None:
     # Instagram Business insights
-    if getattr(brand, "instagram_business_id", None):
-        meta = MetaInsightsClient(brand)
-        ig_ins = meta.instagram_insights()
-        _store_snapshot(report=report, brand=brand, metric="ig_reach", value=ig_ins.get("reach"), raw=ig_ins)
+    ig_ins = MetaInsightsClient(brand).instagram_insights()
+    snaps.add(brand, "ig_reach", ig_ins.get("reach"), ig_ins)
+
 
+def _collect_gbp(snaps: SnapshotWriter, brand: Brand) -> None:
     # Google Business Profile reviews
-    if getattr(brand, "gbp_location_id", None):
-        gbp = GBPClient(brand)
-        gbp_data = gbp.reviews()
-        _store_snapshot(report=report, brand=brand, metric="gbp_avg_rating", value=gbp_data.get("rating"), raw=gbp_data)
-        _store_snapshot(report=report, brand=brand, metric="gbp_review_count", value=gbp_data.get("count"), raw=gbp_data)
+    gbp_data = sync_gbp_reviews(brand, GBPClient(brand))
+    snaps.add(brand, "gbp_avg_rating", gbp_data.get("rating"), gbp_data)
+    snaps.add(brand, "gbp_review_count", gbp_data.get("count"), gbp_data)
+
+
+def _collect_shopify(snaps: SnapshotWriter, brand: Brand) -> None:
+    # Shopify sales – local webhook rollups when they cover the window
+    shop_data = shopify_rollup_summary(brand)
+    if shop_data is None:
+        shop_data = ShopifyClient(brand).sales_summary()
+    snaps.add(brand, "shopify_rev", shop_data.get("revenue"), shop_data)
+    snaps.add(brand, "shopify_aov", shop_data.get("aov"), shop_data)
+
+
+PRIVATE_COLLECTORS = {
+    "ga4": _collect_ga4,
+    "ig_insights": _collect_ig_insights,
+    "gbp": _collect_gbp,
+    "shopify": _collect_shopify,
+}
+
+
+@shared_task(name="fetch_private_metrics")
+def fetch_private_metrics(report_id: str, brand_id: str) -> List[Dict[str, Any]]:
+    """
+    Pull private metrics (GA4, IG reach, GBP reviews, Shopify) for a brand.
+    All snapshots are written in one batch when the task finishes. Sources
+    still fresh for the brand are copied instead of fetched; a failing source
+    is logged and reported in the returned statuses, the others still run.
+    """
+    report = Report.objects.filter(id=report_id).first()
+    brand = Brand.objects.get(id=brand_id)
+
+    statuses: List[Dict[str, Any]] = []
+    with SnapshotWriter(report) as snaps:
+        steps = _private_steps(brand)
+        fresh = _reuse_fresh(snaps, report, brand, [key for key, _ in steps]) if report else set()
+        for key, provider in steps:
+            if key in fresh:
+                statuses.append(_step_status(brand.id, key, provider))
+                continue
+            try:
+                PRIVATE_COLLECTORS[key](snaps, brand)
+            except Exception as exc:
+                logger.warning("%s for brand %s failed: %r", key, brand.id, exc)
+                statuses.append(_step_status(brand.id, key, provider, error=repr(exc)))
+            else:
+                statuses.append(_step_status(brand.id, key, provider))
+    return statuses
+
+
+@shared_task(name="backfill_shopify_rollups")
+def backfill_shopify_rollups(brand_id: str) -> None:
+    """Seed the Shopify revenue rollups once, right after the shop connects."""
+    brand = Brand.objects.get(id=brand_id)
+    seed_shopify_rollups(brand, ShopifyClient(brand))
+
 
-    # Shopify sales
+# ---------------------------------------------------------------------------
+# Finalisation – runs once, either when collection completes or at the deadline
+# ---------------------------------------------------------------------------
+
+# Plan key → the snapshot metric that proves the step landed
+STEP_METRICS = {
+    "domain_authority": "domain_authority",
+    "backlinks": "backlinks",
+    "serp": "serp_featured_snippet",
+    "traffic": "est_organic_visits",
+    "twitter": "twitter_followers",
+    "instagram": "instagram_followers",
+    "facebook": "facebook_followers",
+    "mentions": "mentions_volume",
+    # private, owner brand only
+    "ga4": "ga4_sessions",
+    "ig_insights": "ig_reach",
+    "gbp": "gbp_avg_rating",
+    "shopify": "shopify_rev",
+}
+PRIVATE_STEP_KEYS = ("ga4", "ig_insights", "gbp", "shopify")
+
+
+def _private_steps(brand: Brand) -> List[tuple]:
+    """``(key, provider)`` for every block ``fetch_private_metrics`` runs for *brand*."""
+    steps = [("ga4", GA4Client.PROVIDER)]
+    if getattr(brand, "instagram_business_id", None):
+        steps.append(("ig_insights", MetaInsightsClient.PROVIDER))
+    if getattr(brand, "gbp_location_id", None):
+        steps.append(("gbp", GBPClient.PROVIDER))
     if getattr(brand, "shopify_shop", None):
-        shop = ShopifyClient(brand)
-        shop_data = shop.sales_summary()
-        _store_snapshot(report=report, brand=brand, metric="shopify_rev", value=shop_data.get("revenue"), raw=shop_data)
-        _store_snapshot(report=report, brand=brand, metric="shopify_aov", value=shop_data.get("aov"), raw=shop_data)
+        steps.append(("shopify", ShopifyClient.PROVIDER))
+    return steps
+
+
+def _missing_metrics(report: Report) -> List[Dict[str, Any]]:
+    """Every expected step with no snapshot on *report*, keeping known failure reasons."""
+    present = set(MetricSnapshot.objects.filter(report=report).values_list("brand_id", "metric_name"))
+    known = {(m["brand"], m["key"]): m["error"] for m in report.data.get("missing_metrics", [])}
+
+    missing: List[Dict[str, Any]] = []
+    for brand in _report_brands(report):
+        steps = [(key, client_cls.PROVIDER) for key, client_cls, _method, _args in _public_plan(brand)]
+        if brand.pk == report.owner_id:
+            steps += _private_steps(brand)
+        for key, provider in steps:
+            if (brand.pk, STEP_METRICS[key]) in present:
+                continue
+            error = known.get((brand.pk, key)) or known.get((None, key)) or "not collected before the deadline"
+            missing.append({"brand": brand.pk, "key": key, "provider": provider, "error": error})
+
+    # competitors: shared domain rows only need to be fresh, not on this report
+    domains = list(Domain.objects.filter(id__in=_report_domain_ids(report)))
+    hosts = {d.pk: d.host for d in domains}
+    for domain_id, keys in _stale_domain_keys(domains).items():
+        for key in sorted(keys):
+            error = known.get((None, key)) or "not collected before the deadline"
+            missing.append({"brand": None, "domain": hosts[domain_id], "key": key, "provider": DOMAIN_STEPS[key], "error": error})
+    return missing
+
+
+def _schedule_deadline(report: Report, budget: int | None):
+    """Arm the deadline finaliser; returns the deadline (None when unbudgeted)."""
+    if not budget:
+        return None
+    deadline = timezone.now() + timedelta(seconds=budget)
+    finalise_report.apply_async((report.id,), {"reason": "deadline"}, eta=deadline)
+    return deadline
+
+
+@shared_task(name="finalise_report")
+def finalise_report(report_id: str, reason: str = "complete") -> bool:
+    """
+    Close collection for a report: mark missing metrics, then hand off to the
+    AI insight and PDF tasks. Both the pipeline and the deadline timer call
+    this; the atomic ``collecting → finalising`` update lets only the first
+    one through.
+    """
+    claimed = Report.objects.filter(id=report_id, status=Report.Status.COLLECTING).update(
+        status=Report.Status.FINALISING, finalised_at=timezone.now(),
+    )
+    if not claimed:
+        return False
+
+    report = Report.objects.select_related("owner").get(id=report_id)
+    try:
+        missing = _missing_metrics(report)
+    except Exception:  # noqa: BLE001 – the claim is taken; never strand the report in FINALISING
+        logger.exception("Missing-metric check failed for report %s; using the collected statuses", report_id)
+        missing = report.data.get("missing_metrics", [])
+    report.data.update(
+        missing_metrics=missing,
+        missing_providers=sorted({m["provider"] for m in missing}),
+        partial=bool(missing),
+        finalised_by=reason,
+    )
+    report.save(update_fields=["data"])
+    try:
+        materialise_kpi_table(report_id)  # views / PDF / insight read this, no pandas per request
+    except Exception:  # noqa: BLE001
+        logger.exception("KPI table build failed for report %s; views rebuild it on read", report_id)
+    if missing and reason == "deadline":
+        logger.info("Report %s finalised at deadline with %d missing metrics", report_id, len(missing))
+        if settings.REPORT_BACKFILL_MISSING:
+            backfill_report_metrics.apply_async((report_id,), countdown=settings.REPORT_BACKFILL_DELAY)
+
+    chain(generate_ai_insight.si(report_id), render_report_pdf.si(report_id)).apply_async()
+    return True
+
+
+@shared_task(name="generate_ai_insight")
+def generate_ai_insight(report_id: str) -> None:
+    """DeepSeek recommendations for the KPI table; optional, so failures are only logged."""
+    from utils.deepseek import fetch_insight
+
+    report = Report.objects.select_related("owner").get(id=report_id)
+    try:
+        kpi_json = json.dumps(kpi_records(kpi_table(report)))
+        report.ai_insight = fetch_insight(kpi_json, report.owner.name)
+    except Exception:  # noqa: BLE001
+        logger.exception("AI insight failed for report %s", report_id)
+        return
+    report.save(update_fields=["ai_insight"])
+
+
+@shared_task(name="render_report_pdf")
+def render_report_pdf(report_id: str) -> None:
+    """Render report.html to PDF and mark the report ready."""
+    from django.template.loader import render_to_string
+    from utils.pdf import html_to_pdf
+
+    report = Report.objects.select_related("owner").get(id=report_id)
+    try:
+        html = render_to_string("report.html", {"report": report, "kpi": kpi_table(report)})
+        report.pdf_path = html_to_pdf(html)
+        report.status = Report.Status.READY
+    except Exception:  # noqa: BLE001
+        logger.exception("PDF render failed for report %s", report_id)
+        report.status = Report.Status.ERROR
+    report.save(update_fields=["pdf_path", "status"])
+
+
+@shared_task(name="backfill_report_metrics")
+def backfill_report_metrics(report_id: str) -> None:
+    """
+    Re-run the steps a deadline-finalised report went without, then finalise
+    it again (new KPI table, insight and PDF). Runs under a fresh budget.
+    """
+    report = Report.objects.get(id=report_id)
+    missing = report.data.get("missing_metrics", [])
+    jobs: List = [
+        _public_step_signature(report_id, m["brand"], m["key"], m["provider"])
+        for m in missing if m["brand"] is not None and m["key"] not in PRIVATE_STEP_KEYS
+    ]
+    if any(m["key"] in PRIVATE_STEP_KEYS for m in missing):
+        jobs.append(fetch_private_metrics.si(report_id, report.owner_id))
+    if any(m["brand"] is None for m in missing):
+        # the re-finalise moves finalised_at, so the new domain rows are read
+        jobs.append(fetch_domain_metrics.si(_report_domain_ids(report)))
+    if not jobs:
+        return
+    if not Report.objects.filter(id=report_id, status=Report.Status.READY).update(status=Report.Status.COLLECTING):
+        return  # still rendering or failed – leave it alone
+
+    # nobody is waiting on a backfill – keep it behind interactive work
+    jobs = [job.set(queue="scheduled", priority=settings.PRIORITY_SCHEDULED) for job in jobs]
+    _schedule_deadline(report, settings.REPORT_LATENCY_BUDGET)
+    chord(jobs, finalise_report.si(report_id, reason="backfill")).apply_async()
 
 
 @shared_task(name="start_report_generation")
-def start_report_generation(report_id: str) -> str:
+def start_report_generation(report_id: str, budget: int | None = None) -> str:
     """
-    Orchestrates the end-to-end workflow: public metrics → private metrics → PDF → AI insight.
+    Orchestrates the end-to-end workflow: public + private metrics in parallel
+    → finalise → AI insight → PDF.
+
+    *budget* (seconds, default ``REPORT_LATENCY_BUDGET``; 0 disables it) bounds
+    how long the user waits: when it runs out the report is finalised with
+    whatever snapshots exist and the rest is marked missing.
     """
     report = Report.objects.get(id=report_id)
     brand = report.owner
+    if budget is None:
+        budget = settings.REPORT_LATENCY_BUDGET
 
-    # Build public jobs for brand + competitors
-    public_jobs: List = [fetch_public_metrics.s(report_id, brand.id)]
-    for comp in report.competitors.all():
-        public_jobs.append(fetch_public_metrics.s(report_id, comp.brand.id))
-
-    workflow = chain(
-        group(public_jobs),
-        fetch_private_metrics.s(report_id, brand.id),
-        # finalise_report and generate_ai_insight are imported lazily below
-        finalise_report.s(report_id),
-        generate_ai_insight.s(report_id),
-    )
-    workflow.apply_async()
-
+    # collecting before anything is dispatched, so a fast pipeline can finalise
     report.status = Report.Status.COLLECTING
     report.save(update_fields=["status"])
+    deadline = _schedule_deadline(report, budget)
+    if deadline:
+        Report.objects.filter(id=report_id).update(deadline_at=deadline)
+
+    # Build public jobs for brand + competitors; DA & traffic go out as one
+    # multi-target batch for the whole report, every other provider call is
+    # its own subtask so a slow or failing provider only loses its metrics
+    jobs: List = [fetch_batched_public_metrics.si([report_id]).set(expires=deadline)]
+    for b in _report_brands(report):
+        jobs += _public_step_signatures(report_id, b, expires=deadline)
+    # private sources are independent of the public ones – same parallel stage
+    jobs.append(fetch_private_metrics.si(report_id, brand.id).set(expires=deadline))
+    # competitors: shared per-domain metrics, fetched only where not fresh
+    domain_ids = _report_domain_ids(report)
+    if domain_ids:
+        jobs.append(fetch_domain_metrics.si(domain_ids).set(expires=deadline))
+
+    # finalisation starts once every collection job has finished
+    chord(jobs, collect_results.s(report_id) | finalise_report.si(report_id)).apply_async()
     return report.id
 
 
-# Avoid circular import; import at module end
-from core.tasks import finalise_report, generate_ai_insight  # noqa: E402
+# ---------------------------------------------------------------------------
+# Fleet refresh – daily, sharded and spread over REFRESH_WINDOW
+# ---------------------------------------------------------------------------
+
+REFRESH_DOMAINS_KEY = "mi:refresh:{run}:domains"
+
+
+def _claim_domains(run_id: int, domains: List[tuple]) -> List[tuple]:
+    """The ``(id, host)`` *domains* not yet dispatched by this run (one Redis set per run)."""
+    domains = list(dict.fromkeys(domains))
+    if not domains:
+        return []
+    key = REFRESH_DOMAINS_KEY.format(run=run_id)
+    pipe = get_redis().pipeline()
+    for _pk, host in domains:
+        pipe.sadd(key, host)
+    pipe.expire(key, settings.REFRESH_RESUME_WITHIN)
+    added = pipe.execute()[:-1]
+    return [d for d, new in zip(domains, added) if new]
+
+
+def _release_domains(run_id: int, domains: List[tuple]) -> None:
+    """Hand claimed ``(id, host)`` *domains* back, e.g. when their shard could not be dispatched."""
+    if domains:
+        get_redis().srem(REFRESH_DOMAINS_KEY.format(run=run_id), *[host for _pk, host in domains])
+
+
+@shared_task(name="core.tasks.refresh_all_reports", acks_late=True)
+def refresh_all_reports() -> Dict[str, Any]:
+    """
+    Dispatch the daily refresh for every brand without running it here;
+    each shard only pulls the series that are due (``utils.volatility``).
+
+    Brands are paged by pk (keyset, ``REFRESH_CHUNK_SIZE`` per query) and cut
+    into shards of ``REFRESH_SHARD_SIZE``; shard *n* is delayed so the shards
+    are spread evenly over ``REFRESH_WINDOW`` instead of all landing at 03:00.
+    Competitor domains are deduped across tenants – each is refreshed once.
+    The cursor is saved after every shard; an unfinished run younger than
+    ``REFRESH_RESUME_WITHIN`` is resumed (acks_late redelivers this task if
+    the worker dies) and spreads its remaining shards over what is left of
+    the window from now on – the original pace once the window has passed.
+    The adaptive-scheduling savings and API cache hit/miss counters are
+    logged and returned at the end (cumulative since their ``reset_stats``).
+    """
+    resume_after = timezone.now() - timedelta(seconds=settings.REFRESH_RESUME_WITHIN)
+    run = RefreshRun.objects.filter(finished_at__isnull=True, started_at__gte=resume_after).order_by("-started_at").first()
+    if run is None:
+        run = RefreshRun.objects.create(brands_total=Brand.objects.count())
+    else:
+        logger.info("Resuming refresh run %s after brand %s", run.pk, run.cursor)
+
+    shard_size = settings.REFRESH_SHARD_SIZE
+    total_shards = max(1, -(-run.brands_total // shard_size))
+    spacing = settings.REFRESH_WINDOW / total_shards
+    # shard n is due at base + (n - base_shard) * spacing
+    base, base_shard = run.started_at, 0
+    if run.shards_dispatched:
+        base, base_shard = timezone.now(), run.shards_dispatched
+        rest = (run.started_at + timedelta(seconds=settings.REFRESH_WINDOW) - base).total_seconds()
+        if rest > 0:
+            spacing = rest / max(1, total_shards - run.shards_dispatched)
+
+    while True:
+        chunk = list(
+            Brand.objects.filter(pk__gt=run.cursor).order_by("pk").values_list("pk", flat=True)[: settings.REFRESH_CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        brand_ids = chunk
+        competitor_domains: Dict[int, List[tuple]] = {}
+        for owner_id, domain_id, host in _competitor_domains(Competitor.objects.filter(report__owner_id__in=brand_ids)):
+            competitor_domains.setdefault(owner_id, []).append((domain_id, host))
+
+        for i in range(0, len(chunk), shard_size):
+            shard = brand_ids[i:i + shard_size]
+            claimed = _claim_domains(run.pk, [d for b in shard for d in competitor_domains.get(b, [])])
+            domains = [pk for pk, _host in claimed]
+            eta = base + timedelta(seconds=(run.shards_dispatched - base_shard) * spacing)
+            try:
+                refresh_brand_shard.apply_async(
+                    (run.pk, shard, domains),
+                    eta=max(eta, timezone.now()),
+                    queue="scheduled",
+                    priority=settings.PRIORITY_SCHEDULED,
+                )
+            except Exception:
+                # the cursor stays on the last dispatched shard – the resumed
+                # run must be able to claim these domains again
+                _release_domains(run.pk, claimed)
+                raise
+            run.cursor = shard[-1]
+            run.shards_dispatched += 1
+            run.brands_dispatched += len(shard)
+            run.domains_dispatched += len(domains)
+            run.save(update_fields=["cursor", "shards_dispatched", "brands_dispatched", "domains_dispatched"])
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=["finished_at"])
+    savings, cache_stats = volatility.stats(), response_cache.stats()
+    logger.info(
+        "Refresh run %s dispatched %d brands in %d shards; scheduling savings %s; API cache %s",
+        run.pk, run.brands_dispatched, run.shards_dispatched, savings, cache_stats,
+    )
+    return {
+        "run": run.pk,
+        "brands": run.brands_dispatched,
+        "shards": run.shards_dispatched,
+        "domains": run.domains_dispatched,
+        "savings": savings,
+        "cache": cache_stats,
+    }
+
+
+@shared_task(name="refresh_brand_shard")
+def refresh_brand_shard(run_id: int, brand_ids: List[int], domain_ids: List[int]) -> None:
+    """
+    Refresh one shard: report-less snapshots for *brand_ids* (batched
+    multi-target calls first, then each brand's remaining steps) and the
+    shared DomainSnapshots of the deduped competitor *domain_ids*.
+
+    Only steps whose series are due per their adaptive RefreshSchedule are
+    pulled; afterwards the schedules are recomputed from the new history.
+    """
+    due: Dict[str, List[str]] = {}
+    for brand in Brand.objects.filter(id__in=brand_ids):
+        # one brand that cannot be planned must not sink the shard (or its domains)
+        try:
+            keys = [key for key, _client, _method, _args in _public_plan(brand)]
+            due_metrics = volatility.due_metrics(brand.pk, [STEP_METRICS[k] for k in keys])
+        except Exception as exc:
+            logger.warning("Refresh run %s: brand %s could not be planned: %r", run_id, brand.pk, exc)
+            continue
+        due[str(brand.pk)] = [k for k in keys if STEP_METRICS[k] in due_metrics]
+        volatility.record(due=len(due[str(brand.pk)]), skipped=len(keys) - len(due[str(brand.pk)]))
+
+    try:
+        fetch_batched_public_metrics([], brand_ids, due=due)
+    except Exception as exc:
+        logger.warning("Refresh run %s: batched stage failed: %r", run_id, exc)
+    for brand_id in brand_ids:
+        keys = [k for k in due.get(str(brand_id), []) if k not in BATCHED_PLAN_KEYS]
+        if not keys:
+            continue
+        try:
+            fetch_public_metrics(None, brand_id, batched=True, keys=keys)
+        except Exception as exc:
+            logger.warning("Refresh run %s: brand %s failed: %r", run_id, brand_id, exc)
+    if domain_ids:
+        fetch_domain_metrics(domain_ids)
+    volatility.update_schedules(brand_ids)
@@ -10,6 +10,7 @@ from core.views.oauth import (
     MetaOAuthStartView, MetaOAuthCallbackView,
     GA4OAuthStartView, GA4OAuthCallbackView,
     ShopifyOAuthStartView, ShopifyOAuthCallbackView,
+    ShopifyOrderWebhookView,
 )
 from core.views.privacy_and_deletion import (
     PrivacyPolicyView,
@@ -35,6 +36,7 @@ urlpatterns = [
     path("oauth/callback/ga4/", GA4OAuthCallbackView.as_view(), name="oauth-ga4-callback"),
     path("oauth/shopify/start/", ShopifyOAuthStartView.as_view(), name="oauth-shopify-start"),
     path("oauth/callback/shopify/", ShopifyOAuthCallbackView.as_view(), name="oauth-shopify-callback"),
+    path("webhooks/shopify/orders/", ShopifyOrderWebhookView.as_view(), name="shopify-orders-webhook"),
 
     # Privacy & Data Deletion
     path("privacy/", PrivacyPolicyView.as_view(), name="privacy_policy"),
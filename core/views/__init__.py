@@ -7,6 +7,7 @@ from core.views.oauth import (
     MetaOAuthStartView, MetaOAuthCallbackView,
     GA4OAuthStartView, GA4OAuthCallbackView,
     ShopifyOAuthStartView, ShopifyOAuthCallbackView,
+    ShopifyOrderWebhookView,
     FacebookDataDeletionView, FacebookDeletionStatusView,
 )
 from core.views.report import ReportDetailView
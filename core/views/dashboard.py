@@ -3,10 +3,10 @@
 from __future__ import annotations
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView, RedirectView
-from utils.kpi import build_kpi_dataframe as compute_kpi_frame
+from utils.kpi import kpi_table, kpi_value
 from utils.trends import pct_delta
 from core.models.oauth import Brand
-from core.models.metrics import MetricSnapshot
+from core.models.report import Report
 
 class DashboardRedirectView(RedirectView):
     """
@@ -27,24 +27,26 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
         rows: list[dict] = []
         for brand in brands:
-            # Build current vs previous KPI frames
-            current = compute_kpi_frame(brand.latest_report.id)
-            prev_report = getattr(brand.latest_report, "previous", None)
-            prev_df = compute_kpi_frame(prev_report.id) if prev_report else None
+            # Latest two reports – their stored KPI tables, no pandas per request
+            latest = list(Report.objects.filter(owner=brand).order_by("-created_at")[:2])
+            if not latest:
+                continue
+            current = kpi_table(latest[0])
+            prev = kpi_table(latest[1]) if len(latest) > 1 else None
 
             # Pick four flagship metrics
             flagship = [
                 ("Domain Authority", "domain_authority"),
-                ("Sessions", "sessions"),
+                ("Sessions", "ga4_sessions"),
                 ("IG Reach", "ig_reach"),
-                ("Conv Rate", "conversion_rate"),
+                ("Conv Rate", "ga4_conversion_rate"),
             ]
             cells = []
             for label, key in flagship:
-                new_val = current.loc[key, brand.name]
+                new_val = kpi_value(current, key, brand.name)
                 arrow, pct = "→", 0.0
-                if prev_df is not None and key in prev_df.index:
-                    old_val = prev_df.loc[key, brand.name]
+                old_val = kpi_value(prev, key, brand.name) if prev else None
+                if new_val is not None and old_val is not None:
                     arrow, pct = pct_delta(new_val, old_val)
                 cells.append({
                     "label": label,
@@ -56,7 +58,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             rows.append({
                 "brand": brand.name,
                 "cells": cells,
-                "report": brand.latest_report,
+                "report": latest[0],
             })
 
         ctx["rows"] = rows
@@ -1,5 +1,7 @@
 # core/views/input.py
 
+from celery import current_app
+from django.db import transaction
 from django.views import View
 from django.shortcuts import render, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -26,7 +28,11 @@ class InputFormView(LoginRequiredMixin, View):
             brand = _get_or_create_brand(request)
             # 2) form.save() will create Report + Competitor rows under that Brand
             report = form.save(brand)
-            # 3) redirect to the “report queued” page
+            # 3) queue collection on the interactive lane (see CELERY_TASK_ROUTES)
+            transaction.on_commit(
+                lambda: current_app.send_task("start_report_generation", args=[str(report.id)])
+            )
+            # 4) redirect to the “report queued” page
             return redirect("report_queued")
         return render(request, self.template_name, {"form": form})
 
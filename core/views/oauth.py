@@ -1,7 +1,11 @@
 from __future__ import annotations
+import base64
 import hmac
 import hashlib,  uuid
+import json
+import logging
 import requests
+from celery import current_app
 from datetime import timedelta
 from urllib.parse import urlencode
 from django.views.decorators.csrf import csrf_exempt
@@ -15,6 +19,10 @@ from django.utils.decorators import method_decorator
 from django.views import View
 
 from core.models.oauth import Brand, BrandOAuthToken
+from utils.api_clients import ShopifyClient
+from utils.ingest import apply_shopify_order
+
+log = logging.getLogger(__name__)
 
 # Decorator to require login on class-based views
 login_req = method_decorator(login_required, name="dispatch")
@@ -213,7 +221,46 @@ class ShopifyOAuthCallbackView(View):
         brand.shopify_shop = shop
         brand.save(update_fields=["shopify_shop"])
 
+        # Keep revenue rollups current via order webhooks + a one-off backfill
+        try:
+            ShopifyClient(brand).register_order_webhooks(
+                request.build_absolute_uri(reverse("shopify-orders-webhook"))
+            )
+            current_app.send_task("backfill_shopify_rollups", args=[brand.id])
+        except Exception:  # noqa: BLE001 – never block the OAuth flow on this
+            log.exception("Shopify webhook registration failed for %s", shop)
+
         return redirect("dashboard")
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ShopifyOrderWebhookView(View):
+    """
+    Receives orders/create|updated|delete and folds them into the per-day
+    revenue rollups. Signed with the same app secret as the OAuth callback,
+    but over the raw body and base64-encoded (X-Shopify-Hmac-Sha256).
+    """
+    def post(self, request: HttpRequest) -> HttpResponse:
+        given = request.headers.get("X-Shopify-Hmac-Sha256", "")
+        calculated = base64.b64encode(
+            hmac.new(
+                settings.SHOPIFY_API_SECRET.encode(),
+                request.body,
+                hashlib.sha256
+            ).digest()
+        ).decode()
+        if not hmac.compare_digest(calculated, given):
+            return HttpResponseBadRequest("HMAC validation failed")
+
+        shop = request.headers.get("X-Shopify-Shop-Domain", "")
+        topic = request.headers.get("X-Shopify-Topic", "")
+        brand = Brand.objects.filter(shopify_shop=shop).first()
+        if brand is None or topic not in ShopifyClient.ORDER_TOPICS:
+            # acknowledge so Shopify stops retrying deliveries we don't track
+            return HttpResponse(status=200)
+
+        apply_shopify_order(brand, topic, json.loads(request.body))
+        return HttpResponse(status=200)
 # ─────────────────────────────────────────────────────────────────────────────
 # Facebook Data Deletion Callback + Status Page
 # ─────────────────────────────────────────────────────────────────────────────
@@ -7,7 +7,7 @@ from django.views.generic import View
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 from core.models.report import Report
-from utils.kpi import build_kpi_dataframe
+from utils.kpi import kpi_table
 
 class ReportDetailView(LoginRequiredMixin, View):
     """
@@ -24,6 +24,5 @@ class ReportDetailView(LoginRequiredMixin, View):
                 resp["Content-Disposition"] = f"inline; filename=report-{pk}.pdf"
                 return resp
 
-        # HTML view
-        kpi_frame = build_kpi_dataframe(report.id)
-        return render(request, "report.html", {"report": report, "kpi_frame": kpi_frame})
+        # HTML view – the table stored at finalisation, no pandas per request
+        return render(request, "report.html", {"report": report, "kpi": kpi_table(report)})
@@ -1,8 +1,21 @@
 import os
 from celery import Celery
+from celery.signals import celeryd_init
 from django.conf import settings
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'market_insights.settings')
 app = Celery('market_insights')
 app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
\ No newline at end of file
+app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
+
+
+@celeryd_init.connect
+def size_pool_for_queue(sender=None, conf=None, options=None, **kwargs):
+    """Single-queue workers take their pool size from WORKER_QUEUE_CONCURRENCY."""
+    queues = options.get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    if len(queues) == 1 and not options.get("concurrency"):
+        size = settings.WORKER_QUEUE_CONCURRENCY.get(queues[0])
+        if size:
+            conf.worker_concurrency = size
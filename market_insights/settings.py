@@ -112,6 +112,121 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
+# Queues: on-demand reports never wait behind the daily refresh, and PDF /
+# AI work can't starve collection. Priority 0 is served first (Redis transport).
+CELERY_TASK_DEFAULT_QUEUE = "celery"
+CELERY_TASK_DEFAULT_PRIORITY = 5
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCHEDULED = 8
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1  # let priorities apply to every fetch
+_INTERACTIVE = {"queue": "interactive", "priority": PRIORITY_INTERACTIVE}
+CELERY_TASK_ROUTES = {
+    "start_report_generation": _INTERACTIVE,
+    "fetch_batched_public_metrics": _INTERACTIVE,
+    "fetch_public_step": _INTERACTIVE,
+    "fetch_public_metrics": _INTERACTIVE,
+    "fetch_private_metrics": _INTERACTIVE,
+    "fetch_domain_metrics": _INTERACTIVE,  # backfill sets queue="scheduled" on its signatures
+    "collect_results": _INTERACTIVE,
+    "finalise_report": _INTERACTIVE,
+    "backfill_report_metrics": {"queue": "scheduled", "priority": PRIORITY_SCHEDULED},
+    "core.tasks.refresh_all_reports": {"queue": "scheduled", "priority": PRIORITY_SCHEDULED},
+    "refresh_brand_shard": {"queue": "scheduled", "priority": PRIORITY_SCHEDULED},
+    "backfill_shopify_rollups": {"queue": "scheduled", "priority": PRIORITY_SCHEDULED},
+    "render_report_pdf": {"queue": "pdf", "priority": PRIORITY_INTERACTIVE},
+    "generate_ai_insight": {"queue": "insight", "priority": PRIORITY_INTERACTIVE},
+}
+# Pool size for a worker started on a single queue (`celery worker -Q pdf`)
+# without an explicit --concurrency; see market_insights/celery.py.
+WORKER_QUEUE_CONCURRENCY = {
+    "interactive": env.int("WORKER_CONCURRENCY_INTERACTIVE", default=16),  # I/O bound API calls
+    "scheduled": env.int("WORKER_CONCURRENCY_SCHEDULED", default=4),
+    "pdf": env.int("WORKER_CONCURRENCY_PDF", default=2),  # WeasyPrint is CPU / memory heavy
+    "insight": env.int("WORKER_CONCURRENCY_INSIGHT", default=4),
+    "celery": env.int("WORKER_CONCURRENCY_DEFAULT", default=4),
+}
+
+# Public metric collection – fan provider calls out concurrently per task
+PUBLIC_FETCH_CONCURRENT = env.bool("PUBLIC_FETCH_CONCURRENT", default=True)
+PUBLIC_FETCH_CONCURRENCY = env.int("PUBLIC_FETCH_CONCURRENCY", default=4)
+
+# Per-provider collection subtasks (core.tasks.fetch_public_step). A provider
+# entry overrides "default"; queue None keeps the task on the default queue.
+PUBLIC_PROVIDER_TASKS = {
+    "default": {"soft_time_limit": 45, "time_limit": 60, "max_retries": 2, "retry_delay": 5, "queue": None},
+    "moz": {"soft_time_limit": 30, "time_limit": 40},
+    "serpstack": {"soft_time_limit": 30, "time_limit": 40},
+    "socialblade": {"max_retries": 1},
+    "mention": {"soft_time_limit": 90, "time_limit": 120},
+}
+
+# Freshness per collection step (seconds): a report copies the brand's last
+# snapshots younger than this instead of calling the provider. 0 = always fetch.
+METRIC_FRESHNESS = {
+    "domain_authority": 7 * 24 * 3600,
+    "backlinks": 7 * 24 * 3600,
+    "traffic": 3 * 24 * 3600,
+    "serp": 24 * 3600,
+    "twitter": 24 * 3600,
+    "instagram": 24 * 3600,
+    "facebook": 24 * 3600,
+    "mentions": 6 * 3600,
+    "ga4": 24 * 3600,
+    "ig_insights": 24 * 3600,
+    "gbp": 24 * 3600,
+    "shopify": 24 * 3600,
+}
+
+# Report latency budget (seconds): finalise with partial data when it runs out
+REPORT_LATENCY_BUDGET = env.int("REPORT_LATENCY_BUDGET", default=90)
+REPORT_BACKFILL_MISSING = env.bool("REPORT_BACKFILL_MISSING", default=True)
+REPORT_BACKFILL_DELAY = env.int("REPORT_BACKFILL_DELAY", default=600)
+
+# Daily fleet refresh (core.tasks.refresh_all_reports)
+REFRESH_CHUNK_SIZE = env.int("REFRESH_CHUNK_SIZE", default=500)      # brands per keyset page
+REFRESH_SHARD_SIZE = env.int("REFRESH_SHARD_SIZE", default=25)       # brands per shard task
+REFRESH_WINDOW = env.int("REFRESH_WINDOW", default=4 * 3600)         # spread shards over this many seconds
+REFRESH_RESUME_WITHIN = env.int("REFRESH_RESUME_WITHIN", default=20 * 3600)  # < the daily beat, so runs never overlap
+# Adaptive per-metric refresh bounds (utils.volatility): volatile series are
+# re-pulled every MIN seconds, series that never move every MAX seconds
+REFRESH_INTERVAL_MIN = env.int("REFRESH_INTERVAL_MIN", default=24 * 3600)
+REFRESH_INTERVAL_MAX = env.int("REFRESH_INTERVAL_MAX", default=60 * 24 * 3600)
+
+# Provider quotas enforced across all workers (token buckets in Redis).
+# Keys are "provider" or "provider:endpoint"; rate = tokens/second, burst = bucket size.
+API_RATE_LIMITS = {
+    "moz": {"rate": 1.0, "burst": 5},
+    "serpstack": {"rate": 0.5, "burst": 3},
+    "dataforseo": {"rate": 2.0, "burst": 10},
+    "twitter:users_by": {"rate": 300 / 900, "burst": 10},  # 300 req / 15 min (app auth)
+    "mention": {"rate": 1.0, "burst": 5},
+    "socialblade": {"rate": 0.5, "burst": 2},
+}
+API_RATE_LIMIT_MAX_WAIT = env.int("API_RATE_LIMIT_MAX_WAIT", default=60)
+
+# Per-provider circuit breakers (shared through Redis)
+API_CIRCUIT_FAILURE_THRESHOLD = env.int("API_CIRCUIT_FAILURE_THRESHOLD", default=5)
+API_CIRCUIT_WINDOW = env.int("API_CIRCUIT_WINDOW", default=60)
+API_CIRCUIT_COOLDOWN = env.int("API_CIRCUIT_COOLDOWN", default=30)
+
+# Shared response cache TTLs in seconds ("provider" or "provider:endpoint")
+API_CACHE_TTLS = {
+    "moz:url_metrics": 7 * 24 * 3600,
+    "moz:links": 3 * 24 * 3600,
+    "serpstack:search": 24 * 3600,
+    "dataforseo:bulk_traffic_estimation": 3 * 24 * 3600,
+    "twitter:users_by": 6 * 3600,
+    "socialblade": 12 * 3600,
+}
+# Single-flight: one in-flight request per cache key across all workers
+API_SINGLE_FLIGHT_LOCK_TTL = env.int("API_SINGLE_FLIGHT_LOCK_TTL", default=60)
+API_SINGLE_FLIGHT_WAIT = env.int("API_SINGLE_FLIGHT_WAIT", default=45)
+
 # WeasyPrint
 WEASYPRINT_BASEURL = str(STATIC_ROOT)
 
@@ -37,4 +37,33 @@ def test_meta_callback_creates_token(client, django_user_model, monkeypatch):
         follow=True,
     )
     assert resp.status_code == 200
-    assert BrandOAuthToken.objects.filter(brand__user=user, provider="meta").exists()
\ No newline at end of file
+    assert BrandOAuthToken.objects.filter(brand__user=user, provider="meta").exists()
+
+def post_order_webhook(client, body, *, shop="demo.myshopify.com", secret="shh", topic="orders/create"):
+    import base64, hashlib, hmac
+    raw = json.dumps(body).encode()
+    sig = base64.b64encode(hmac.new(secret.encode(), raw, hashlib.sha256).digest()).decode()
+    return client.post(
+        reverse("shopify-orders-webhook"), data=raw, content_type="application/json",
+        HTTP_X_SHOPIFY_HMAC_SHA256=sig, HTTP_X_SHOPIFY_SHOP_DOMAIN=shop, HTTP_X_SHOPIFY_TOPIC=topic,
+    )
+
+
+def test_shopify_order_webhook(client, django_user_model, settings):
+    from core.models.ingest import ShopifyOrder
+    from core.models.oauth import Brand
+
+    settings.SHOPIFY_API_SECRET = "shh"
+    user = django_user_model.objects.create_user("s", "s@example.com", "pw")
+    brand = Brand.objects.create(user=user, name="S", shopify_shop="demo.myshopify.com")
+    order = {"id": 7, "created_at": "2024-05-01T09:00:00Z", "updated_at": "2024-05-01T09:00:00Z", "total_price": "12.50"}
+
+    assert post_order_webhook(client, order, secret="wrong").status_code == 400
+    assert not ShopifyOrder.objects.exists()
+
+    # unknown shop: acknowledged so Shopify stops retrying, nothing stored
+    assert post_order_webhook(client, order, shop="other.myshopify.com").status_code == 200
+    assert not ShopifyOrder.objects.exists()
+
+    assert post_order_webhook(client, order).status_code == 200
+    assert ShopifyOrder.objects.get().brand == brand
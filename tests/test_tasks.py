@@ -0,0 +1,349 @@
+from datetime import timedelta
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from django.utils import timezone
+
+from core import tasks
+from core.models.metrics import MetricSnapshot
+from core.models.oauth import Brand
+from core.models.refresh import RefreshRun
+from core.models.report import Report
+from utils.circuit import CircuitOpenError
+
+pytestmark = pytest.mark.django_db
+
+
+class Dispatch:
+    def __init__(self, log, name):
+        self.log, self.name = log, name
+
+    def apply_async(self, *a, **kw):
+        self.log.append(self.name)
+
+
+@pytest.fixture
+def report(django_user_model):
+    user = django_user_model.objects.create_user("t", "t@example.com", "pw")
+    brand = Brand.objects.create(user=user, name="T")
+    return Report.objects.create(owner=brand, your_site="https://t.example", status=Report.Status.COLLECTING)
+
+
+def test_finalise_runs_once_and_marks_missing(report, monkeypatch):
+    dispatched = []
+    missing = [{"brand": report.owner_id, "key": "gbp", "provider": "gbp", "error": "timeout"}]
+    monkeypatch.setattr(tasks, "_missing_metrics", lambda r: missing)
+    monkeypatch.setattr(tasks, "chain", lambda *sigs: Dispatch(dispatched, "handoff"))
+    monkeypatch.setattr(tasks.backfill_report_metrics, "apply_async", lambda *a, **kw: dispatched.append("backfill"))
+
+    assert tasks.finalise_report(report.id, reason="deadline") is True
+    assert tasks.finalise_report(report.id) is False  # pipeline arriving late
+
+    report.refresh_from_db()
+    assert report.status == Report.Status.FINALISING
+    assert report.data["partial"] is True
+    assert report.data["missing_providers"] == ["gbp"]
+    assert sorted(dispatched) == ["backfill", "handoff"]
+
+
+def test_collect_results_flattens_public_and_private_statuses(report):
+    results = [
+        [tasks._step_status(None, "traffic", "dataforseo", error="HTTP 503")],  # batched stage
+        tasks._step_status(report.owner_id, "serp", "serpstack"),  # one public step
+        [tasks._step_status(report.owner_id, "ga4", "ga4"), tasks._step_status(report.owner_id, "gbp", "gbp", error="x")],
+    ]
+    assert tasks.collect_results(results, report.id) == {"ok": 2, "missing": 2}
+
+    report.refresh_from_db()
+    assert report.data["missing_providers"] == ["dataforseo", "gbp"]
+
+
+def test_missing_api_keys_fail_steps_not_the_chord(report, monkeypatch):
+    from core.models.domain import Domain
+
+    for var in ("MOZ_API_TOKEN", "MOZ_ACCESS_ID", "MOZ_SECRET", "DATAFORSEO_B64_CREDENTIALS"):
+        monkeypatch.delenv(var, raising=False)
+    domain = Domain.objects.create(host="rival.example")
+
+    statuses = tasks.fetch_domain_metrics([domain.pk])
+    assert {(st["key"], st["ok"]) for st in statuses} == {
+        ("domain_authority", False), ("backlinks", False), ("traffic", False),
+    }
+
+    # finalise still hands off when the missing-metric check itself fails
+    dispatched = []
+    monkeypatch.setattr(tasks, "_missing_metrics", lambda r: 1 / 0)
+    monkeypatch.setattr(tasks, "chain", lambda *sigs: Dispatch(dispatched, "handoff"))
+    assert tasks.finalise_report(report.id) is True
+    assert dispatched == ["handoff"]
+
+
+def test_start_report_builds_the_chord_for_a_plain_brand(report, monkeypatch):
+    report.owner.website = "https://t.example"
+    report.owner.save()
+    built = []
+    monkeypatch.setattr(tasks, "chord", lambda jobs, callback: built.append(jobs) or Dispatch([], "chord"))
+
+    tasks.start_report_generation(report.id, budget=0)
+
+    [jobs] = built
+    names = [job.task for job in jobs]
+    assert names[0] == "fetch_batched_public_metrics" and names[-1] == "fetch_private_metrics"
+    assert sorted(job.args[2] for job in jobs if job.task == "fetch_public_step") == ["backlinks", "serp"]
+
+
+def test_batched_stage_only_pays_for_the_metrics_it_needs(report, monkeypatch, settings):
+    from utils.snapshots import SnapshotWriter
+
+    settings.METRIC_FRESHNESS = {"domain_authority": 7 * 24 * 3600, "traffic": 0}
+    report.owner.website = "https://t.example"
+    report.owner.save()
+    with SnapshotWriter() as snaps:  # DA is still fresh from last night
+        snaps.add(report.owner, "domain_authority", 41, {})
+    called = []
+
+    class Moz:
+        PROVIDER = "moz"
+
+        def domain_authority_many(self, sites):
+            called.append(("moz", sites))
+            return {s: 1 for s in sites}
+
+    class DataForSEO:
+        PROVIDER = "dataforseo"
+
+        def traffic_estimate(self, sites):
+            called.append(("dataforseo", sites))
+            return {"organic": 10, "paid": 2}
+
+    monkeypatch.setattr(tasks, "MozClient", Moz)
+    monkeypatch.setattr(tasks, "DataForSEOClient", DataForSEO)
+
+    statuses = tasks.fetch_batched_public_metrics([report.id])
+
+    assert called == [("dataforseo", ["https://t.example"])]
+    assert [st["key"] for st in statuses] == ["traffic"]
+    stored = dict(MetricSnapshot.objects.filter(report=report).values_list("metric_name", "value"))
+    assert stored == {"domain_authority": 41, "est_organic_visits": 10, "est_paid_visits": 2}
+
+
+class Serp:
+    PROVIDER = "serpstack"
+
+    def serp_features(self, name):
+        return {"featured_snippet": True, "local_pack": False}
+
+
+class DownMoz:
+    PROVIDER = "moz"
+
+    def backlinks(self, site):
+        raise ConnectionError("moz down")
+
+
+class FlakySerp:
+    PROVIDER = "serpstack"
+    raises = ConnectionError("serpstack down")
+    calls = 0
+
+    def serp_features(self, name):
+        FlakySerp.calls += 1
+        raise self.raises
+
+
+@pytest.mark.parametrize("exc, attempts", [
+    (ConnectionError("serpstack down"), 3),  # first try + max_retries
+    (SoftTimeLimitExceeded(), 1),
+    (CircuitOpenError("serpstack circuit open"), 1),
+])
+def test_public_step_gives_up_with_a_failed_status(report, monkeypatch, settings, exc, attempts):
+    settings.PUBLIC_PROVIDER_TASKS = {"default": {
+        "soft_time_limit": 45, "time_limit": 60, "max_retries": 2, "retry_delay": 0, "queue": None,
+    }}
+    monkeypatch.setattr(FlakySerp, "raises", exc)
+    monkeypatch.setattr(FlakySerp, "calls", 0)
+    monkeypatch.setattr(tasks, "_public_plan", lambda brand, **kw: [("serp", FlakySerp, "serp_features", ("T",))])
+
+    status = tasks.fetch_public_step.apply(args=(report.id, report.owner_id, "serp")).get()
+
+    assert FlakySerp.calls == attempts
+    assert status == {
+        "brand": report.owner_id, "key": "serp", "provider": "serpstack", "ok": False, "error": repr(exc),
+    }
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_one_failing_provider_keeps_the_other_results(report, monkeypatch, settings, concurrent):
+    settings.PUBLIC_FETCH_CONCURRENCY = 4
+    plan = [("serp", Serp, "serp_features", ("T",)), ("backlinks", DownMoz, "backlinks", ("t.example",))]
+    monkeypatch.setattr(tasks, "_public_plan", lambda brand, **kw: plan)
+
+    statuses = tasks.fetch_public_metrics(report.id, report.owner_id, concurrent=concurrent)
+
+    assert [(st["key"], st["ok"]) for st in statuses] == [("serp", True), ("backlinks", False)]
+    assert "moz down" in statuses[1]["error"]
+    stored = set(MetricSnapshot.objects.filter(report=report).values_list("metric_name", flat=True))
+    assert stored == {"serp_featured_snippet", "serp_local_pack"}
+
+
+def test_refresh_resumes_from_checkpoint_and_staggers_shards(django_user_model, monkeypatch, settings):
+    settings.REFRESH_CHUNK_SIZE, settings.REFRESH_SHARD_SIZE, settings.REFRESH_WINDOW = 2, 1, 300
+    user = django_user_model.objects.create_user("f", "f@example.com", "pw")
+    brands = [Brand.objects.create(user=user, name=f"B{i}") for i in range(4)]
+    sent = []
+    monkeypatch.setattr(tasks, "_claim_domains", lambda run_id, urls: [])
+    monkeypatch.setattr(tasks.refresh_brand_shard, "apply_async", lambda args, **kw: sent.append((args[1], kw["eta"])))
+
+    # a previous run died 150 s in, after dispatching the first brand
+    started = timezone.now() - timedelta(seconds=150)
+    run = RefreshRun.objects.create(
+        started_at=started, brands_total=4, cursor=brands[0].pk, shards_dispatched=1, brands_dispatched=1,
+    )
+    monkeypatch.setattr(tasks.volatility, "stats", lambda: {"due": 3, "skipped": 9, "savings_ratio": 0.75})
+    monkeypatch.setattr(tasks.response_cache, "stats", lambda: {})
+    out = tasks.refresh_all_reports()
+
+    assert out == {
+        "run": run.pk, "brands": 4, "shards": 4, "domains": 0,
+        "savings": {"due": 3, "skipped": 9, "savings_ratio": 0.75}, "cache": {},
+    }
+    assert [ids for ids, _ in sent] == [[b.pk] for b in brands[1:]]
+    # the remaining 3 shards share the 150 s left of the window instead of all firing now
+    offsets = [(eta - started).total_seconds() for _, eta in sent]
+    assert offsets == [pytest.approx(o, abs=2) for o in (150, 200, 250)]
+
+
+def test_failed_shard_dispatch_releases_its_domains(django_user_model, monkeypatch, settings):
+    settings.REFRESH_SHARD_SIZE = 1
+    user = django_user_model.objects.create_user("d", "d@example.com", "pw")
+    first, _second = Brand.objects.create(user=user, name="D1"), Brand.objects.create(user=user, name="D2")
+    claimed, released, sent = [(7, "rival.example")], [], []
+    monkeypatch.setattr(tasks, "_claim_domains", lambda run_id, domains: claimed)
+    monkeypatch.setattr(tasks, "_release_domains", lambda run_id, domains: released.extend(domains))
+
+    def broker_down_after_one(args, **kw):
+        if sent:
+            raise ConnectionError("broker unavailable")
+        sent.append(args[1])
+
+    monkeypatch.setattr(tasks.refresh_brand_shard, "apply_async", broker_down_after_one)
+    with pytest.raises(ConnectionError):
+        tasks.refresh_all_reports()
+
+    assert released == claimed
+    run = RefreshRun.objects.get()
+    # checkpointed after the shard that went out – a resume neither repeats it nor skips the domains
+    assert (run.cursor, run.shards_dispatched, run.domains_dispatched) == (first.pk, 1, 1)
+
+
+def test_refresh_shard_survives_a_brand_that_cannot_be_planned(django_user_model, monkeypatch):
+    user = django_user_model.objects.create_user("s", "s@example.com", "pw")
+    bad, good = Brand.objects.create(user=user, name="Bad"), Brand.objects.create(user=user, name="Good")
+    plan = tasks._public_plan
+
+    def flaky_plan(brand, **kw):
+        if brand.pk == bad.pk:
+            raise AttributeError("broken profile")
+        return plan(brand, **kw)
+
+    calls = {}
+    monkeypatch.setattr(tasks, "_public_plan", flaky_plan)
+    monkeypatch.setattr(tasks.volatility, "due_metrics", lambda brand_id, metrics: set(metrics))
+    monkeypatch.setattr(tasks.volatility, "record", lambda **kw: None)
+    monkeypatch.setattr(tasks.volatility, "update_schedules", lambda ids: None)
+    monkeypatch.setattr(tasks, "fetch_batched_public_metrics", lambda r, b, due: calls.setdefault("batched", due))
+    monkeypatch.setattr(tasks, "fetch_public_metrics", lambda r, brand_id, **kw: calls.setdefault("public", []).append(brand_id))
+    monkeypatch.setattr(tasks, "fetch_domain_metrics", lambda ids: calls.setdefault("domains", ids))
+
+    tasks.refresh_brand_shard(1, [bad.pk, good.pk], [42])
+
+    assert list(calls["batched"]) == [str(good.pk)]
+    assert calls["public"] == [good.pk]
+    assert calls["domains"] == [42]
+
+
+def test_fresh_snapshots_are_copied_not_refetched(report, settings):
+    from utils.snapshots import SnapshotWriter
+
+    settings.METRIC_FRESHNESS = {"serp": 24 * 3600, "ga4": 24 * 3600, "gbp": 24 * 3600, "domain_authority": 7 * 24 * 3600}
+
+    with SnapshotWriter() as snaps:  # e.g. last night's refresh
+        for metric, value in [("serp_featured_snippet", 1), ("serp_local_pack", 0), ("ga4_sessions", 900), ("gbp_avg_rating", 4.5)]:
+            snaps.add(report.owner, metric, value, {"v": value})
+
+    keys = ["serp", "ga4", "gbp", "domain_authority"]
+    settings.METRIC_FRESHNESS["gbp"] = 0  # 0 = always fetch
+    with SnapshotWriter(report) as snaps:
+        assert tasks._reuse_fresh(snaps, report, report.owner, ["gbp"]) == set()
+
+    settings.METRIC_FRESHNESS["gbp"] = 24 * 3600
+    with SnapshotWriter(report) as snaps:
+        reused = tasks._reuse_fresh(snaps, report, report.owner, keys)
+    assert reused == {"serp", "ga4", "gbp"}  # DA was never fetched
+
+    copies = MetricSnapshot.objects.filter(report=report)
+    assert sorted(c.metric_name for c in copies) == ["ga4_sessions", "gbp_avg_rating", "serp_featured_snippet", "serp_local_pack"]
+    assert all(c.reused_from.report_id is None and c.raw == {"v": c.value} for c in copies)
+
+    # a later report still reuses the original fetch, never a copy
+    later = Report.objects.create(owner=report.owner, your_site="https://t.example")
+    with SnapshotWriter(later) as snaps:
+        tasks._reuse_fresh(snaps, later, report.owner, ["ga4"])
+    copy = MetricSnapshot.objects.get(report=later)
+    assert copy.reused_from.reused_from_id is None
+
+
+def test_competitor_domains_are_canonical_and_fetched_once(report, monkeypatch):
+    from core.models.domain import Domain, DomainSnapshot, normalise_domain
+    from core.models.report import Competitor
+
+    assert normalise_domain("HTTPS://www.Rival.com/") == normalise_domain("rival.com") == "rival.com"
+    other = Report.objects.create(owner=report.owner, your_site="https://t.example")
+    a = Competitor.objects.create(report=report, website="https://www.rival.com/")
+    b = Competitor.objects.create(report=other, website="http://rival.com")
+    assert a.domain_id == b.domain_id and Domain.objects.count() == 1
+
+    calls = []
+    monkeypatch.setattr(tasks.MozClient, "__init__", lambda self: None)
+    monkeypatch.setattr(tasks.MozClient, "domain_authority_many", lambda self, hosts: calls.append(hosts) or {h: 50 for h in hosts})
+    monkeypatch.setattr(tasks.MozClient, "backlinks", lambda self, host: 10)
+    monkeypatch.setattr(tasks.DataForSEOClient, "__init__", lambda self: None)
+    monkeypatch.setattr(tasks.DataForSEOClient, "traffic_estimate", lambda self, hosts: {"organic": 1, "paid": 2})
+
+    tasks.fetch_domain_metrics([a.domain_id])
+    tasks.fetch_domain_metrics([b.domain_id])  # second tenant/report: still fresh
+
+    assert calls == [["rival.com"]]
+    assert DomainSnapshot.objects.filter(domain_id=a.domain_id).count() == 4
+
+
+def test_competitor_social_profiles_fill_the_kpi_table(report, monkeypatch):
+    from core.models.domain import normalise_profile
+    from core.models.report import Competitor
+    from utils.kpi import build_kpi_dataframe
+
+    assert normalise_profile("twitter", "@Rival") == normalise_profile("twitter", "https://x.com/rival/") == "twitter.com/rival"
+    comp = Competitor.objects.create(
+        report=report, name="Rival", website="https://rival.com",
+        twitter_handle="@Rival", instagram_url="https://www.instagram.com/Rival/",
+    )
+    assert comp.twitter_profile.host == "twitter.com/rival" and comp.instagram_profile.profile == ("instagram", "rival")
+
+    for cls in (tasks.MozClient, tasks.DataForSEOClient, tasks.TwitterClient, tasks.SocialBladeClient):
+        monkeypatch.setattr(cls, "__init__", lambda self: None)
+    monkeypatch.setattr(tasks.MozClient, "domain_authority_many", lambda self, hosts: {h: 50 for h in hosts})
+    monkeypatch.setattr(tasks.MozClient, "backlinks", lambda self, host: 10)
+    monkeypatch.setattr(tasks.DataForSEOClient, "traffic_estimate", lambda self, hosts: {"organic": 1, "paid": 2})
+    monkeypatch.setattr(tasks.TwitterClient, "public_metrics_many", lambda self, handles: {h: {"followers_count": 900} for h in handles})
+    monkeypatch.setattr(tasks.SocialBladeClient, "instagram_stats", lambda self, user: {"followers": 1200, "growth_30d": 30})
+
+    statuses = tasks.fetch_domain_metrics(tasks._report_domain_ids(report))
+    assert all(st["ok"] for st in statuses)
+    assert {st["key"] for st in statuses} == {"domain_authority", "backlinks", "traffic", "twitter", "instagram"}
+
+    Report.objects.filter(pk=report.pk).update(finalised_at=timezone.now())
+    row = build_kpi_dataframe(report.id).set_index("KPI")
+    assert row.loc["Twitter Followers", "Rival"] == 900
+    assert row.loc["Instagram Followers", "Rival"] == 1200
+    assert row.loc["Estimated Organic Visits", "Rival"] == 1
+    assert row.loc["Domain Authority", "Rival"] == 50
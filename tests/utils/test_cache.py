@@ -0,0 +1,99 @@
+import json
+
+from utils import cache
+
+
+class FakeRedis:
+    """Just enough of redis.Redis for the cache module (single process)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def exists(self, *keys):
+        return sum(k in self.data for k in keys)
+
+    def eval(self, _script, _n, key, token):
+        if self.data.get(key) == token.encode():
+            del self.data[key]
+
+    def hincrby(self, *a):
+        pass
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def set(self, *a, **kw):
+        self.ops.append((a, kw))
+
+    def execute(self):
+        return [self.r.set(*a, **kw) for a, kw in self.ops]
+
+
+def test_cached_many_single_flights_per_target(monkeypatch, settings):
+    settings.API_CACHE_TTLS = {"moz": 3600}
+    settings.API_SINGLE_FLIGHT_WAIT = 5
+    r = FakeRedis()
+    monkeypatch.setattr(cache, "get_redis", lambda: r)
+    monkeypatch.setattr(cache, "FLIGHT_POLL", 0)
+
+    # another worker is already fetching b.com
+    b_key = cache.cache_key("moz", "url_metrics", ["target", "b.com", None])
+    b_lock = cache.FLIGHT_PREFIX + b_key[len(cache.KEY_PREFIX):]
+    r.set(b_lock, "other", nx=True)
+
+    calls = []
+
+    def fetch(chunk):
+        calls.append(chunk)
+        if "b.com" not in chunk:  # the other worker lands its result meanwhile
+            r.set(b_key, json.dumps(70))
+            del r.data[b_lock]
+        return {t: 50 for t in chunk}
+
+    out = cache.cached_many("moz", "url_metrics", ["a.com", "b.com", "c.com"], fetch, batch_size=50)
+    assert calls == [["a.com", "c.com"]]
+    assert out == {"a.com": 50, "b.com": 70, "c.com": 50}
+    assert not any(k.startswith(cache.FLIGHT_PREFIX) for k in r.data)  # our locks released
+
+
+def test_cached_many_refetches_when_the_other_flight_lands_nothing(monkeypatch, settings):
+    settings.API_CACHE_TTLS = {"twitter": 3600}
+    settings.API_SINGLE_FLIGHT_WAIT = 5
+    r = FakeRedis()
+    monkeypatch.setattr(cache, "get_redis", lambda: r)
+    monkeypatch.setattr(cache, "FLIGHT_POLL", 0)
+    key = cache.cache_key("twitter", "users_by", ["target", "ghost", None])
+    lock = cache.FLIGHT_PREFIX + key[len(cache.KEY_PREFIX):]
+    r.set(lock, "other", nx=True)
+
+    lookups = []
+    mget = r.mget
+
+    def polled(keys):
+        lookups.append(keys)
+        if len(lookups) == 2:  # other worker finishes: unknown handle, nothing cached
+            del r.data[lock]
+        return mget(keys)
+
+    monkeypatch.setattr(r, "mget", polled)
+    calls = []
+    out = cache.cached_many("twitter", "users_by", ["ghost"], lambda chunk: calls.append(chunk) or {}, batch_size=100)
+    assert out == {} and calls == [["ghost"]]
+    assert len(lookups) == 2  # stopped waiting as soon as the flight ended
@@ -0,0 +1,56 @@
+import pytest
+
+from utils import circuit
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def r(monkeypatch, settings):
+    settings.API_CIRCUIT_FAILURE_THRESHOLD, settings.API_CIRCUIT_WINDOW, settings.API_CIRCUIT_COOLDOWN = 2, 60, 30
+    server = fakeredis.FakeRedis()
+    monkeypatch.setattr(circuit, "get_redis", lambda: server)
+    return server
+
+
+def cool_down(r, provider):
+    r.delete(circuit._keys(provider)["open"])  # as if API_CIRCUIT_COOLDOWN elapsed
+
+
+def test_threshold_opens_the_circuit(r):
+    circuit.record_failure("moz")
+    circuit.before_call("moz")  # one failure is not an outage
+
+    circuit.record_failure("moz")
+    with pytest.raises(circuit.CircuitOpenError):
+        circuit.before_call("moz")
+    assert 0 < r.ttl(circuit._keys("moz")["open"]) <= 30
+
+
+def test_half_open_allows_one_probe_and_a_failed_probe_reopens(r):
+    circuit.record_failure("moz")
+    circuit.record_failure("moz")
+    cool_down(r, "moz")
+
+    circuit.before_call("moz")  # the probe
+    with pytest.raises(circuit.CircuitOpenError, match="probe in flight"):
+        circuit.before_call("moz")
+
+    circuit.record_failure("moz")  # a single failed probe is enough
+    with pytest.raises(circuit.CircuitOpenError, match="circuit open"):
+        circuit.before_call("moz")
+
+
+def test_successful_probe_closes_the_circuit(r):
+    circuit.record_failure("moz")
+    circuit.record_failure("moz")
+    cool_down(r, "moz")
+
+    circuit.before_call("moz")
+    circuit.record_success("moz")
+
+    circuit.before_call("moz")
+    circuit.before_call("moz")  # no probe slot needed once closed
+    assert r.keys() == []
+    circuit.record_failure("moz")
+    circuit.before_call("moz")  # the failure count started over
@@ -0,0 +1,67 @@
+import datetime as dt
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.models.oauth import Brand, BrandOAuthToken
+from utils import api_clients
+from utils.api_clients import GA4Client
+
+
+class BatchResp:
+    status_code = 200
+
+    def __init__(self, reports):
+        self._reports = reports
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"reports": self._reports}
+
+
+def metric_row(dims, *vals):
+    return {"dimensionValues": [{"value": d} for d in dims], "metricValues": [{"value": str(v)} for v in vals]}
+
+
+def make_client():
+    client = GA4Client.__new__(GA4Client)
+    client.property_id, client.access_token = "123", "tok"
+    return client
+
+
+def test_period_users_is_one_call(monkeypatch):
+    sent = []
+
+    def fake_request(method, url, json=None, **kw):
+        sent.append(json["requests"])
+        return BatchResp([
+            {"rows": [metric_row(["current"], 700), metric_row(["previous"], 600)]},
+            {"rows": [metric_row(["20240501"], 30, 25, 1)]},
+        ])
+
+    monkeypatch.setattr(api_clients.http, "request", fake_request)
+    out = make_client().period_users(daily=(dt.date(2024, 5, 1), dt.date(2024, 5, 1)))
+
+    assert len(sent) == 1 and len(sent[0]) == 2
+    assert sent[0][0]["metrics"] == [{"name": "totalUsers"}]  # the rest is summed locally
+    assert (out["current"], out["previous"]) == (700, 600)
+    assert out["daily"] == [{"day": dt.date(2024, 5, 1), "sessions": 30, "users": 25, "purchases": 1}]
+
+
+@pytest.mark.django_db
+def test_token_cache_follows_reconnect(django_user_model):
+    user = django_user_model.objects.create_user("ga", "ga@example.com", "pw")
+    brand = Brand.objects.create(user=user, name="GA")
+    expires = timezone.now() + timedelta(hours=1)
+    BrandOAuthToken.objects.create(brand=brand, provider="ga4", access_token="old", expires_at=expires)
+    GA4Client._tokens.clear()
+
+    assert GA4Client._token_for(brand) == "old"
+    # reconnect from another process – this worker's cache must not win
+    BrandOAuthToken.objects.update_or_create(
+        brand=brand, provider="ga4", defaults={"access_token": "new", "expires_at": expires},
+    )
+    assert GA4Client._token_for(brand) == "new"
@@ -0,0 +1,81 @@
+import requests
+
+from utils import http
+
+
+def test_session_reused_per_host():
+    a = http.session_for("https://lsapi.seomoz.com/v2/url_metrics")
+    b = http.session_for("https://LSAPI.seomoz.com/v2/links?target=x")
+    c = http.session_for("https://api.serpstack.com/search")
+    assert a is b
+    assert a is not c
+
+
+def test_pooled_session_negotiates_gzip():
+    sess = http.session_for("https://api.twitter.com/2/users")
+    assert sess.headers["Accept-Encoding"] == "gzip, deflate"
+    adapter = sess.get_adapter("https://api.twitter.com/")
+    assert adapter._pool_maxsize == http.POOL_MAXSIZE
+
+
+def test_close_sessions_drops_pool():
+    a = http.session_for("https://api.mention.net/api")
+    http.close_sessions()
+    assert http.session_for("https://api.mention.net/api") is not a
+
+
+class FakeResp:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+def test_retry_after_parses_seconds_and_dates():
+    assert http.retry_after(FakeResp(429, {"Retry-After": "7"})) == 7.0
+    assert http.retry_after(FakeResp(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert http.retry_after(FakeResp(503)) is None
+
+
+def test_request_retries_transient_status(monkeypatch):
+    responses = [FakeResp(503), FakeResp(429, {"Retry-After": "0"}), FakeResp(200)]
+    sess = http.session_for("https://api.dataforseo.com/v3")
+    monkeypatch.setattr(sess, "request", lambda *a, **kw: responses.pop(0))
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+    assert http.request("POST", "https://api.dataforseo.com/v3").status_code == 200
+    assert responses == []
+
+
+def test_request_gives_up_after_max_retries(monkeypatch):
+    calls = []
+    sess = http.session_for("https://api.serpstack.com/search")
+    monkeypatch.setattr(sess, "request", lambda *a, **kw: calls.append(1) or FakeResp(502))
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+    assert http.request("GET", "https://api.serpstack.com/search").status_code == 502
+    assert len(calls) == http.MAX_RETRIES + 1
+
+
+def test_request_retries_over_a_given_session(monkeypatch):
+    responses = [FakeResp(429, {"Retry-After": "0"}), FakeResp(200)]
+    authed = requests.Session()
+    monkeypatch.setattr(authed, "request", lambda *a, **kw: responses.pop(0))
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+    pooled = http.session_for("https://mybusiness.googleapis.com/v4")
+    monkeypatch.setattr(pooled, "request", lambda *a, **kw: 1 / 0)
+    assert http.request("GET", "https://mybusiness.googleapis.com/v4", session=authed).status_code == 200
+    assert responses == []
+
+
+def test_only_non_failure_statuses_close_the_circuit(monkeypatch):
+    seen = []
+    monkeypatch.setattr(http.circuit, "before_call", lambda p: None)
+    monkeypatch.setattr(http.circuit, "record_success", lambda p: seen.append(("ok", p)))
+    monkeypatch.setattr(http.circuit, "record_failure", lambda p: seen.append(("fail", p)))
+    monkeypatch.setattr(http.ratelimit, "acquire", lambda *a: None)
+    responses = [FakeResp(401), FakeResp(200)]
+    sess = http.session_for("https://api.moz.com/v2")
+    monkeypatch.setattr(sess, "request", lambda *a, **kw: responses.pop(0))
+
+    assert http.request("GET", "https://api.moz.com/v2", provider="moz").status_code == 401
+    assert seen == []  # a revoked key must not close a half-open breaker
+    assert http.request("GET", "https://api.moz.com/v2", provider="moz").status_code == 200
+    assert seen == [("ok", "moz")]
@@ -0,0 +1,165 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.models.oauth import Brand
+from core.models.ingest import GA4DailyMetric, ShopifyDailyRevenue, ShopifyOrder
+from utils import api_clients
+from utils.api_clients import GBPClient
+from utils.ingest import (
+    apply_mention_buckets,
+    apply_shopify_order,
+    mention_cursor,
+    sync_ga4_daily,
+    sync_gbp_reviews,
+)
+
+
+def order(price, updated="2024-05-01T10:00:00Z", created="2024-05-01T09:00:00-04:00"):
+    return {"id": 1001, "created_at": created, "updated_at": updated, "total_price": price}
+
+
+class ShopifyRollupTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("shop", "shop@example.com", "pw")
+        self.brand = Brand.objects.create(user=user, name="Shop")
+
+    def day(self):
+        return ShopifyDailyRevenue.objects.get(brand=self.brand)
+
+    def test_create_is_idempotent(self):
+        apply_shopify_order(self.brand, "orders/create", order("25.00"))
+        apply_shopify_order(self.brand, "orders/create", order("25.00"))
+        self.assertEqual(self.day().orders, 1)
+        self.assertEqual(self.day().revenue, Decimal("25.00"))
+        self.assertEqual(str(self.day().day), "2024-05-01")  # UTC day of created_at
+
+    def test_update_applies_delta_and_ignores_stale(self):
+        apply_shopify_order(self.brand, "orders/create", order("25.00"))
+        apply_shopify_order(self.brand, "orders/updated", order("30.00", updated="2024-05-02T00:00:00Z"))
+        apply_shopify_order(self.brand, "orders/updated", order("99.00", updated="2024-05-01T11:00:00Z"))
+        self.assertEqual(self.day().orders, 1)
+        self.assertEqual(self.day().revenue, Decimal("30.00"))
+
+    def test_delete_reverses_order(self):
+        apply_shopify_order(self.brand, "orders/create", order("25.00"))
+        apply_shopify_order(self.brand, "orders/delete", {"id": 1001})
+        self.assertEqual(self.day().orders, 0)
+        self.assertEqual(self.day().revenue, Decimal("0"))
+        self.assertFalse(ShopifyOrder.objects.exists())
+
+
+class FakeGA4:
+    def __init__(self):
+        self.calls = []
+
+    def period_users(self, days, *, daily=None):
+        self.calls.append(daily)
+        start, end = daily
+        return {
+            "current": 900,
+            "previous": 800,
+            "daily": [
+                {"day": start + timedelta(days=i), "sessions": 100, "users": 80, "purchases": 2}
+                for i in range((end - start).days + 1)
+            ],
+        }
+
+
+class GA4DailyTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("ga", "ga@example.com", "pw")
+        self.brand = Brand.objects.create(user=user, name="GA")
+
+    def test_second_sync_only_pulls_settling_day(self):
+        client = FakeGA4()
+        first = sync_ga4_daily(self.brand, client)
+        second = sync_ga4_daily(self.brand, client)
+
+        yesterday = timezone.now().date() - timedelta(days=1)
+        self.assertEqual(client.calls[0], (yesterday - timedelta(days=59), yesterday))
+        self.assertEqual(client.calls[1], (yesterday, yesterday))
+        self.assertEqual(first, second)
+        self.assertEqual(first["current"], {"sessions": 3000, "purchases": 60, "conversion_rate": 2.0, "users": 900})
+        self.assertEqual(first["previous"]["sessions"], 3000)
+        self.assertEqual(first["previous"]["users"], 800)
+        self.assertEqual(GA4DailyMetric.objects.filter(brand=self.brand).count(), 60)
+
+
+class MentionBucketTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("men", "men@example.com", "pw")
+        self.brand = Brand.objects.create(user=user, name="Men")
+
+    def test_buckets_accumulate_and_cursor_advances(self):
+        today = timezone.now().date().isoformat()
+        first = {"days": {today: {"volume": 4, "positive": 1}}, "since_id": None, "last_id": "10", "last_published_at": f"{today}T08:00:00Z"}
+        second = {"days": {today: {"volume": 1, "positive": 1}}, "since_id": "10", "last_id": "11", "last_published_at": f"{today}T09:00:00Z"}
+
+        self.assertIsNone(mention_cursor(self.brand, "a1"))
+        apply_mention_buckets(self.brand, "a1", first)
+        summary = apply_mention_buckets(self.brand, "a1", second)
+
+        self.assertEqual(mention_cursor(self.brand, "a1"), "11")
+        self.assertEqual(summary, {"volume": 5, "sentiment_pct": 40.0})
+
+    def test_overlapping_pull_is_not_counted_twice(self):
+        today = timezone.now().date().isoformat()
+        pull = {"days": {today: {"volume": 3, "positive": 3}}, "since_id": None, "last_id": "7", "last_published_at": f"{today}T08:00:00Z"}
+
+        apply_mention_buckets(self.brand, "a1", pull)
+        # a fleet refresh read the same cursor before the report run stored it
+        summary = apply_mention_buckets(self.brand, "a1", dict(pull))
+
+        self.assertEqual(mention_cursor(self.brand, "a1"), "7")
+        self.assertEqual(summary, {"volume": 3, "sentiment_pct": 100.0})
+
+
+def at(value):
+    return parse_datetime(value)
+
+
+class FakeGBP:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.since = []
+
+    def reviews_since(self, since):
+        self.since.append(since)
+        return self.pages.pop(0)
+
+
+class GBPReviewSyncTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("gbp", "gbp@example.com", "pw")
+        self.brand = Brand.objects.create(user=user, name="GBP")
+
+    def test_edits_adjust_running_average(self):
+        client = FakeGBP([
+            {"reviews": [
+                {"id": "a", "rating": 5, "update_time": at("2026-01-02T00:00:00Z")},
+                {"id": "b", "rating": 3, "update_time": at("2026-01-01T00:00:00Z")},
+            ], "average": None, "total": None},
+            {"reviews": [{"id": "b", "rating": 1, "update_time": at("2026-01-03T00:00:00Z")}],
+             "average": None, "total": None},
+        ])
+        self.assertEqual(sync_gbp_reviews(self.brand, client), {"rating": 4.0, "count": 2})
+        self.assertEqual(sync_gbp_reviews(self.brand, client), {"rating": 3.0, "count": 2})
+        self.assertEqual(client.since, [None, at("2026-01-02T00:00:00Z")])
+
+    def test_watermark_compares_instants_not_text(self):
+        client = GBPClient.__new__(GBPClient)
+        client.account_id, client.location_id, client.session = "1", "2", None
+        page = {"reviews": [
+            {"reviewId": "new", "starRating": "FIVE", "updateTime": "2026-01-02T10:00:25.5Z"},
+            {"reviewId": "old", "starRating": "ONE", "updateTime": "2026-01-02T10:00:25Z"},
+        ]}
+        with mock.patch.object(api_clients, "_get", return_value=page):
+            out = client.reviews_since(at("2026-01-02T10:00:25Z"))
+        # "…25.5Z" sorts before "…25Z" as text, but it is the newer edit
+        self.assertEqual([rv["id"] for rv in out["reviews"]], ["new"])
@@ -1,6 +1,11 @@
+import datetime as dt
+
 import pandas as pd
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
 
+from core.models.domain import DomainSnapshot
 from core.models.oauth import Brand
 from core.models.report import Report, Competitor
 from core.models.metrics import MetricSnapshot
@@ -29,4 +34,37 @@ class KPITest(TestCase):
         df = build_kpi_dataframe(self.report.id)
         da_row = df[df["KPI"] == "Domain Authority"].iloc[0]
         self.assertEqual(da_row["CatMer"], 45)
-        self.assertEqual(da_row["Comp‑A"], 38)
\ No newline at end of file
+        self.assertEqual(da_row["Comp‑A"], 38)
+
+
+class LatestSnapshotTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("kpi", "kpi@example.com", "pw")
+        self.brand = Brand.objects.create(user=user, name="Owner")
+        self.report = Report.objects.create(owner=self.brand, your_site="https://owner.example")
+        self.t0 = timezone.now() - dt.timedelta(hours=1)
+
+    def test_latest_row_by_fetched_at_wins(self):
+        # written out of time order: a backfill / re-flush lands after the first pull
+        for minutes, value in [(30, 45), (0, 40), (50, 47), (10, 41), (20, 43)]:
+            MetricSnapshot.objects.create(
+                report=self.report, brand=self.brand, metric_name="domain_authority",
+                value=value, fetched_at=self.t0 + dt.timedelta(minutes=minutes),
+            )
+        df = build_kpi_dataframe(self.report.id)  # uuid pks say nothing about order
+        da_row = df[df["KPI"] == "Domain Authority"].iloc[0]
+        self.assertEqual(da_row["Owner"], 47)
+
+    def test_competitor_columns_as_of_finalisation(self):
+        comp = Competitor.objects.create(report=self.report, name="Rival", website="https://rival.example")
+        for minutes, value in [(0, 30), (20, 32), (90, 60)]:  # the last one is a later pull
+            DomainSnapshot.objects.create(
+                domain=comp.domain, metric_name="domain_authority",
+                value=value, fetched_at=self.t0 + dt.timedelta(minutes=minutes),
+            )
+        self.report.finalised_at = self.t0 + dt.timedelta(minutes=30)
+        self.report.save()
+
+        df = build_kpi_dataframe(self.report.id)
+        da_row = df[df["KPI"] == "Domain Authority"].iloc[0]
+        self.assertEqual(da_row["Rival"], 32)
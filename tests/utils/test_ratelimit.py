@@ -0,0 +1,47 @@
+import pytest
+
+from utils import ratelimit
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def r(monkeypatch):
+    server = fakeredis.FakeRedis()
+    monkeypatch.setattr(ratelimit, "get_redis", lambda: server)
+    return server
+
+
+def tokens(r, name):
+    return float(r.hget(ratelimit.KEY_PREFIX + name, "tokens"))
+
+
+def test_bucket_allows_burst_then_times_out(r, settings, monkeypatch):
+    settings.API_RATE_LIMITS = {"serpstack": {"rate": 1, "burst": 2}}
+    settings.API_RATE_LIMIT_MAX_WAIT = 0.5
+    slept = []
+    monkeypatch.setattr(ratelimit.time, "sleep", slept.append)
+
+    assert ratelimit.acquire("serpstack", "search") == 0.0
+    assert ratelimit.acquire("serpstack", "search") == 0.0
+    # bucket empty: the next token is ~1 s away, longer than we may wait
+    with pytest.raises(ratelimit.RateLimitTimeout):
+        ratelimit.acquire("serpstack", "search")
+    assert slept == []
+
+
+def test_call_takes_from_endpoint_and_provider_buckets(r, settings):
+    settings.API_RATE_LIMITS = {"moz": {"rate": 0.001, "burst": 5}, "moz:url_metrics": {"rate": 0.001, "burst": 2}}
+
+    ratelimit.acquire("moz", "url_metrics")
+    ratelimit.acquire("moz", "links")  # no endpoint bucket – provider only
+
+    assert tokens(r, "moz:url_metrics") == pytest.approx(1, abs=0.01)
+    assert tokens(r, "moz") == pytest.approx(3, abs=0.01)
+    assert r.pttl(ratelimit.KEY_PREFIX + "moz") > 0  # idle buckets expire
+
+
+def test_unconfigured_provider_is_not_limited(r, settings):
+    settings.API_RATE_LIMITS = {}
+    assert ratelimit.acquire("twitter", "users_by") == 0.0
+    assert r.keys() == []
@@ -0,0 +1,44 @@
+from utils import api_clients
+from utils.api_clients import ShopifyClient
+
+
+class PageResp:
+    status_code = 200
+
+    def __init__(self, orders, next_url=None):
+        self._orders = orders
+        self.links = {"next": {"url": next_url}} if next_url else {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"orders": self._orders}
+
+
+def make_client():
+    client = ShopifyClient.__new__(ShopifyClient)
+    client.token, client.shop = "tok", "demo.myshopify.com"
+    return client
+
+
+def test_sales_summary_follows_link_cursor(monkeypatch):
+    pages = {
+        None: PageResp([{"total_price": "10.00"}, {"total_price": "20.50"}], "https://next/1"),
+        "https://next/1": PageResp([{"total_price": "9.50"}], "https://next/2"),
+        "https://next/2": PageResp([]),
+    }
+    seen = []
+
+    def fake_request(method, url, params=None, **kw):
+        key = None if url.endswith("orders.json") else url
+        seen.append((key, params))
+        return pages[key]
+
+    monkeypatch.setattr(api_clients.http, "request", fake_request)
+    summary = make_client().sales_summary(mode="rest")
+
+    assert summary == {"revenue": 40.0, "aov": 13.33}
+    assert [k for k, _ in seen] == [None, "https://next/1", "https://next/2"]
+    assert seen[0][1]["limit"] == ShopifyClient.PAGE_LIMIT
+    assert seen[1][1] is None  # cursor URLs carry their own filters
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.models.metrics import MetricSnapshot, RawPayload
+from core.models.oauth import Brand
+from core.models.report import Report
+from utils.kpi import kpi_table, kpi_value, materialise_kpi_table
+from utils.snapshots import SnapshotWriter
+
+
+class SnapshotWriterTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("snap", "snap@example.com", "pw")
+        self.brand = Brand.objects.create(user=user, name="Snap")
+        self.r1 = Report.objects.create(owner=self.brand, your_site="https://a.example")
+        self.r2 = Report.objects.create(owner=self.brand, your_site="https://a.example")
+
+    def test_single_insert_with_unique_timestamps(self):
+        # savepoint + INSERT + kpi_table reset + release (no payloads)
+        with self.assertNumQueries(4):
+            with SnapshotWriter(self.r1) as snaps:
+                snaps.add(self.brand, "domain_authority", 40)
+                snaps.add(self.brand, "domain_authority", 41)  # replaces the first
+                snaps.add(self.brand, "backlinks", 900)
+                snaps.add(self.brand, "domain_authority", 41, report=self.r2)
+
+        self.assertEqual(MetricSnapshot.objects.count(), 3)
+        da = MetricSnapshot.objects.filter(metric_name="domain_authority").order_by("fetched_at")
+        self.assertEqual([s.report_id for s in da], [self.r1.id, self.r2.id])
+        self.assertEqual(da[0].value, 41)
+
+    def test_identical_raw_payloads_stored_once(self):
+        ga4 = {"sessions": 10, "users": 7}
+        with SnapshotWriter(self.r1) as snaps:
+            for key, val in ga4.items():
+                snaps.add(self.brand, f"ga4_{key}", val, ga4)
+        with SnapshotWriter(self.r2) as snaps:
+            snaps.add(self.brand, "ga4_sessions", 10, {"users": 7, "sessions": 10})
+
+        self.assertEqual(RawPayload.objects.count(), 1)
+        snap = MetricSnapshot.objects.filter(report=self.r2).get()
+        self.assertEqual(snap.raw, ga4)
+
+    def test_flush_invalidates_materialised_kpi_table(self):
+        with SnapshotWriter(self.r1) as snaps:
+            snaps.add(self.brand, "domain_authority", 40)
+        materialise_kpi_table(self.r1.id)
+        self.r1.refresh_from_db()
+        self.assertEqual(kpi_value(self.r1.kpi_table, "domain_authority", "Snap"), 40)
+
+        with SnapshotWriter(self.r1) as snaps:
+            snaps.add(self.brand, "domain_authority", 45)
+        self.r1.refresh_from_db()
+        self.assertIsNone(self.r1.kpi_table)
+        self.assertEqual(kpi_value(kpi_table(self.r1), "domain_authority", "Snap"), 45)
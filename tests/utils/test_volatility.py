@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models.metrics import MetricSnapshot
+from core.models.oauth import Brand
+from core.models.refresh import RefreshSchedule
+from utils import volatility
+
+
+class VolatilityTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("vol", "vol@example.com", "pw")
+        self.brand = Brand.objects.create(user=user, name="Vol")
+
+    def test_change_rate_and_interval_bounds(self):
+        self.assertEqual(volatility.change_rate([40, 40, 40.1, 40]), 0.0)  # within tolerance
+        self.assertEqual(volatility.change_rate([100, 120, 150]), 1.0)
+        self.assertEqual(volatility.change_rate([5]), 1.0)  # no history yet
+        with self.settings(REFRESH_INTERVAL_MIN=3600, REFRESH_INTERVAL_MAX=3600 * 100):
+            self.assertEqual(volatility.interval_for(1.0), 3600)
+            self.assertEqual(volatility.interval_for(0.0), 3600 * 100)
+            self.assertEqual(volatility.interval_for(0.5), 3600 * 10)
+
+    def test_stable_series_skipped_volatile_due(self):
+        start = timezone.now() - timedelta(days=10)
+        for day in range(5):
+            at = start + timedelta(days=day)
+            MetricSnapshot.objects.create(brand=self.brand, metric_name="domain_authority", value=42, fetched_at=at)
+            MetricSnapshot.objects.create(brand=self.brand, metric_name="twitter_followers", value=1000 + day * 50, fetched_at=at)
+
+        self.assertEqual(volatility.update_schedules([self.brand.pk]), 2)
+        da = RefreshSchedule.objects.get(brand=self.brand, metric_name="domain_authority")
+        self.assertEqual(da.change_rate, 0.0)
+        due = volatility.due_metrics(self.brand.pk, ["domain_authority", "twitter_followers", "backlinks"])
+        self.assertEqual(due, {"twitter_followers", "backlinks"})
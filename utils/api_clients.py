@@ -20,26 +20,50 @@ GOOGLE_CREDENTIALS                          (svc-acct JSON for GBP optional)
 """
 
 from __future__ import annotations
-import os, json, base64, logging, datetime as dt
-from typing import Dict, Any, List, Optional
+import os, json, time, base64, asyncio, logging, datetime as dt
+from decimal import Decimal
+from typing import Dict, Any, Iterator, List, Optional
 
 import requests
 
+from utils import http
+from utils import cache as response_cache
+
 log = logging.getLogger(__name__)
-TIMEOUT = 15
 
 
 # ─────────────────────────────  shared HTTP helpers ──────────────────────────
-def _get(url: str, **kw) -> Dict[str, Any]:
-    r = requests.get(url, timeout=TIMEOUT, **kw)
-    _raise_for_status(r)
-    return r.json()
+# All calls go through utils.http so each provider host keeps one pooled,
+# keep-alive, gzip-negotiating session per worker process.
+def _get(url: str, *, cache: bool = False, **kw) -> Dict[str, Any]:
+    return _call("GET", url, cache=cache, **kw)
+
+
+def _post(url: str, *, cache: bool = False, **kw) -> Dict[str, Any]:
+    return _call("POST", url, cache=cache, **kw)
+
+
+def _call(method: str, url: str, *, cache: bool, **kw) -> Dict[str, Any]:
+    def fetch() -> Dict[str, Any]:
+        r = http.request(method, url, **kw)
+        _raise_for_status(r)
+        return r.json()
 
+    if not cache:
+        return fetch()
+    # auth headers are deliberately left out of the key – results are shared
+    parts = [method, url, kw.get("params"), kw.get("json")]
+    return response_cache.cached(kw["provider"], kw.get("endpoint", ""), parts, fetch)
 
-def _post(url: str, **kw) -> Dict[str, Any]:
-    r = requests.post(url, timeout=TIMEOUT, **kw)
-    _raise_for_status(r)
-    return r.json()
+
+def _iter_pages(url: str, *, params: Optional[dict] = None, **kw) -> Iterator[Dict[str, Any]]:
+    """Yield each JSON page, following RFC 5988 ``Link: <…>; rel="next"`` cursors."""
+    while url:
+        r = http.request("GET", url, params=params, **kw)
+        _raise_for_status(r)
+        yield r.json()
+        url = r.links.get("next", {}).get("url")
+        params = None  # the next URL already carries the cursor + filters
 
 
 def _raise_for_status(r: requests.Response) -> None:
@@ -55,6 +79,8 @@ class MozClient:
     """Moz Links API v2 (https://moz.com/products/api/links-api)"""
 
     BASE = "https://lsapi.seomoz.com/v2"
+    PROVIDER = "moz"
+    MAX_TARGETS = 50  # url_metrics accepts up to 50 targets per call
 
     def __init__(self) -> None:
         self.token = os.getenv("MOZ_API_TOKEN")
@@ -71,19 +97,34 @@ class MozClient:
 
     # endpoints --------------------------------------------------------------
     def domain_authority(self, domain: str) -> int:
+        return self.domain_authority_many([domain])[domain]
+
+    def domain_authority_many(self, domains: List[str]) -> Dict[str, int]:
+        """DA for many domains in as few url_metrics calls as Moz allows."""
         url = f"{self.BASE}/url_metrics"
-        payload = {"targets": [domain], "metrics": ["domain_authority"]}
-        data = _post(url, json=payload, **self._auth())
-        # response shape: {"results":[{"target":"example.com","domain_authority":42.1}]}
+
+        def fetch(chunk: List[str]) -> Dict[str, Any]:
+            payload = {"targets": chunk, "metrics": ["domain_authority"]}
+            data = _post(url, json=payload, provider=self.PROVIDER, endpoint="url_metrics", **self._auth())
+            # response shape: {"results":[{"target":"example.com","domain_authority":42.1}, …]}
+            # results come back in request order
+            results = data.get("results") or []
+            if len(results) != len(chunk):
+                raise RuntimeError(f"Unexpected Moz response: {data}")
+            return dict(zip(chunk, results))
+
+        items = response_cache.cached_many(
+            self.PROVIDER, "url_metrics", domains, fetch, batch_size=self.MAX_TARGETS
+        )
         try:
-            return int(round(data["results"][0]["domain_authority"]))
-        except (KeyError, IndexError):
-            raise RuntimeError(f"Unexpected Moz response: {data}")
+            return {d: int(round(items[d]["domain_authority"])) for d in domains}
+        except (KeyError, TypeError):
+            raise RuntimeError(f"Unexpected Moz response: {items}")
 
     def backlinks(self, domain: str) -> int:
         url = f"{self.BASE}/links"
         params = {"target": domain, "limit": 1, "filter": "external"}
-        data = _get(url, params=params, **self._auth())
+        data = _get(url, params=params, provider=self.PROVIDER, endpoint="links", cache=True, **self._auth())
         # response shape: {"total_count":12345,"links":[...]}
         return int(data.get("total_count", 0))
 
@@ -91,6 +132,7 @@ class MozClient:
 # ═════════════════════════════  SERPSTACK  ══════════════════════════════════
 class SerpstackClient:
     BASE = "https://api.serpstack.com/search"
+    PROVIDER = "serpstack"
 
     def __init__(self) -> None:
         self.key = os.getenv("SERPSTACK_API_KEY")
@@ -105,7 +147,7 @@ class SerpstackClient:
             "gl": gl,
             "output": "json",
         }
-        data = _get(self.BASE, params=params)
+        data = _get(self.BASE, params=params, provider=self.PROVIDER, endpoint="search", cache=True)
         answer_box = data.get("answer_box") or {}
         has_snippet = bool(answer_box.get("type") == "snippet" or data.get("featured_snippets"))
         has_local_pack = bool(data.get("local_results"))
@@ -118,6 +160,8 @@ class DataForSEOClient:
         "https://api.dataforseo.com/v3/dataforseo_labs/"
         "google/bulk_traffic_estimation/live"
     )
+    PROVIDER = "dataforseo"
+    MAX_TARGETS = 1000  # bulk_traffic_estimation accepts up to 1000 targets
 
     def __init__(self) -> None:
         cred_b64 = os.getenv("DATAFORSEO_B64_CREDENTIALS")
@@ -135,22 +179,30 @@ class DataForSEOClient:
         if isinstance(domains, str):
             domains = [domains]
 
-        payload = [
-            {
-                "target": d,
-                "location_code": location_code,
-                "language_code": language_code,
-                "item_types": ["organic", "paid"],
-            }
-            for d in domains
-        ]
-        data = _post(self.ENDPOINT, json=payload, headers=self.headers)
-        try:
-            results = data["tasks"][0]["result"]
-        except (KeyError, IndexError):
-            raise RuntimeError(f"Unexpected DataForSEO response: {data}")
-
-        mapped = {item["target"]: item for item in results}
+        def fetch(chunk: List[str]) -> Dict[str, Any]:
+            payload = [
+                {
+                    "target": d,
+                    "location_code": location_code,
+                    "language_code": language_code,
+                    "item_types": ["organic", "paid"],
+                }
+                for d in chunk
+            ]
+            data = _post(
+                self.ENDPOINT, json=payload, headers=self.headers,
+                provider=self.PROVIDER, endpoint="bulk_traffic_estimation",
+            )
+            try:
+                results = data["tasks"][0]["result"]
+            except (KeyError, IndexError):
+                raise RuntimeError(f"Unexpected DataForSEO response: {data}")
+            return {item["target"]: item for item in results}
+
+        mapped = response_cache.cached_many(
+            self.PROVIDER, "bulk_traffic_estimation", domains, fetch,
+            batch_size=self.MAX_TARGETS, variant=[location_code, language_code],
+        )
         # If only one domain requested ⇒ return its metrics directly
         if len(domains) == 1:
             return mapped[domains[0]]
@@ -159,7 +211,9 @@ class DataForSEOClient:
 
 # ═════════════════════════════  TWITTER  ════════════════════════════════════
 class TwitterClient:
-    BASE = "https://api.twitter.com/2/users/by/username"
+    BASE = "https://api.twitter.com/2/users/by"
+    PROVIDER = "twitter"
+    MAX_USERNAMES = 100  # /2/users/by accepts up to 100 usernames per call
 
     def __init__(self) -> None:
         self.token = os.getenv("TWITTER_BEARER")
@@ -167,17 +221,40 @@ class TwitterClient:
             raise RuntimeError("TWITTER_BEARER missing")
         self.headers = {"Authorization": f"Bearer {self.token}"}
 
+    @staticmethod
+    def normalise_handle(handle: str) -> str:
+        return handle.strip().lstrip("@").lower()
+
     def public_metrics(self, handle: str) -> Dict[str, Any]:
-        handle = handle.lstrip("@")
-        url = f"{self.BASE}/{handle}"
-        params = {"user.fields": "public_metrics"}
-        data = _get(url, headers=self.headers, params=params)
-        return data["data"]["public_metrics"]
+        handle = self.normalise_handle(handle)
+        found = self.public_metrics_many([handle])
+        if handle not in found:
+            raise RuntimeError(f"Twitter user not found: @{handle}")
+        return found[handle]
+
+    def public_metrics_many(self, handles: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        ``{handle: public_metrics}`` for every resolvable handle, looked up
+        100 at a time. Unknown / suspended accounts are simply absent.
+        """
+        def fetch(chunk: List[str]) -> Dict[str, Any]:
+            params = {"usernames": ",".join(chunk), "user.fields": "public_metrics"}
+            data = _get(self.BASE, headers=self.headers, params=params, provider=self.PROVIDER, endpoint="users_by")
+            for err in data.get("errors", []):
+                log.warning("Twitter lookup error: %s", err.get("detail") or err)
+            return {u["username"].lower(): u["public_metrics"] for u in data.get("data", [])}
+
+        wanted = [self.normalise_handle(h) for h in handles if h]
+        return response_cache.cached_many(
+            self.PROVIDER, "users_by", wanted, fetch, batch_size=self.MAX_USERNAMES
+        )
 
 
 # ═════════════════════════════  MENTION  ════════════════════════════════════
 class MentionClient:
     BASE = "https://api.mention.net/api"
+    PROVIDER = "mention"
+    PAGE_LIMIT = 100
 
     def __init__(self) -> None:
         self.token = os.getenv("MENTION_ACCESS_TOKEN")
@@ -185,37 +262,63 @@ class MentionClient:
         if not self.token:
             raise RuntimeError("MENTION_ACCESS_TOKEN missing")
 
-    def brand_mentions(
+    def new_mention_buckets(
         self,
         account_id: str,
         alert_id: str,
-        *,
-        since_days: int = 7
+        since_id: Optional[str] = None,
+        since_days: int = 7,
     ) -> Dict[str, Any]:
         """
-        Returns volume + %-positive for the last *since_days* days.
-        Caller is responsible for storing account_id / alert_id.
+        Page through mentions newer than *since_id* (or the last *since_days*
+        days on a first sync) and fold them into per-day counters without
+        keeping the mentions themselves::
+
+            {"days": {"2024-05-01": {"volume": 12, "positive": 7}, …},
+             "since_id": "987001", "last_id": "987654", "last_published_at": "2024-05-01T18:03:11Z"}
+
+        ``since_id`` echoes the cursor the pull started from, so
+        ``apply_mention_buckets`` can tell an overlapping run apart.
         """
-        since = (dt.datetime.utcnow() - dt.timedelta(days=since_days)).isoformat(timespec="seconds") + "Z"
-        url = (
-            f"{self.BASE}/accounts/{account_id}/alerts/{alert_id}/mentions"
-            f"?since={since}"
-        )
+        params: Dict[str, Any] = {"limit": self.PAGE_LIMIT}
+        if since_id:
+            params["since_id"] = since_id
+        else:
+            since = dt.datetime.utcnow() - dt.timedelta(days=since_days)
+            params["since"] = since.isoformat(timespec="seconds") + "Z"
         headers = {
             "Authorization": f"Bearer {self.token}",
             "Accept-Version": self.version,
         }
-        data = _get(url, headers=headers)
-        mentions = data.get("mentions", [])
-        volume = len(mentions)
-        positive = sum(1 for m in mentions if m.get("tone") == 1)
-        pct_positive = round((positive / volume) * 100, 1) if volume else 0.0
-        return {"volume": volume, "sentiment_pct": pct_positive}
+        url: Optional[str] = f"{self.BASE}/accounts/{account_id}/alerts/{alert_id}/mentions"
+
+        days: Dict[str, Dict[str, int]] = {}
+        newest: Optional[Dict[str, Any]] = None
+        while url:
+            data = _get(url, headers=headers, params=params, provider=self.PROVIDER, endpoint="mentions")
+            for m in data.get("mentions", []):
+                published = m.get("published_at") or m.get("created_at") or ""
+                bucket = days.setdefault(published[:10], {"volume": 0, "positive": 0})
+                bucket["volume"] += 1
+                bucket["positive"] += int(m.get("tone") == 1)
+                if newest is None or (published, int(m["id"])) > (newest["published_at"], int(newest["id"])):
+                    newest = {"id": str(m["id"]), "published_at": published}
+            more = (data.get("_links") or {}).get("more", {}).get("href")
+            url = f"https://api.mention.net{more}" if more and more.startswith("/") else more
+            params = None  # the "more" link carries the cursor
+
+        return {
+            "days": days,
+            "since_id": since_id,
+            "last_id": newest["id"] if newest else since_id,
+            "last_published_at": newest["published_at"] if newest else None,
+        }
 
 
 # ═════════════════════════════  SOCIAL BLADE  ═══════════════════════════════
 class SocialBladeClient:
     BASE = "https://business.socialblade.com/api/v1"
+    PROVIDER = "socialblade"
 
     def __init__(self) -> None:
         cid = os.getenv("SOCIALBLADE_CLIENT_ID")
@@ -227,7 +330,7 @@ class SocialBladeClient:
     # instagram --------------------------------------------------------------
     def instagram_stats(self, username: str) -> Dict[str, Any]:
         url = f"{self.BASE}/instagram/{username.lstrip('@')}"
-        data = _get(url, params=self.params)
+        data = _get(url, params=self.params, provider=self.PROVIDER, endpoint="instagram", cache=True)
         return self._simplify_instagram(data)
 
     # backwards-compat alias
@@ -236,7 +339,7 @@ class SocialBladeClient:
     # facebook ---------------------------------------------------------------
     def facebook_stats(self, page: str) -> Dict[str, Any]:
         url = f"{self.BASE}/facebook/{page}"
-        data = _get(url, params=self.params)
+        data = _get(url, params=self.params, provider=self.PROVIDER, endpoint="facebook", cache=True)
         return self._simplify_facebook(data)
 
     # helpers ---------------------------------------------------------------
@@ -262,50 +365,120 @@ class SocialBladeClient:
 
 # ═════════════════════════════  GA4 (Analytics Data API)  ═══════════════════
 class GA4Client:
-    API_URL = "https://analyticsdata.googleapis.com/v1/properties/{prop}:runReport"
+    BATCH_URL = "https://analyticsdata.googleapis.com/v1beta/properties/{prop}:batchRunReports"
+    PROVIDER = "ga4"
+    MAX_BATCH = 5  # batchRunReports accepts up to 5 report requests
+
+    # {brand_pk: ((token pk, updated_at), access_token, expires_at)} – skips the
+    # decrypt + refresh check while the row is unchanged; a reconnect or refresh
+    # bumps updated_at, so every worker drops its copy on the next lookup
+    _tokens: Dict[Any, tuple] = {}
 
     def __init__(self, brand):
-        from core.models.oauth import BrandOAuthToken  # local import
-        token_obj = BrandOAuthToken.objects.filter(brand=brand, provider="ga4").first()
-        if not token_obj:
-            raise RuntimeError("Brand has no GA4 token")
-        token_obj.refresh_if_needed()
-        self.access_token = token_obj.access_token
         if not getattr(brand, "ga4_property_id", None):
             raise RuntimeError("brand.ga4_property_id not set")
         self.property_id = str(brand.ga4_property_id)
+        self.access_token = self._token_for(brand)
+
+    @classmethod
+    def _token_for(cls, brand) -> str:
+        from django.utils import timezone
+        from core.models.oauth import BrandOAuthToken  # local import
+
+        tokens = BrandOAuthToken.objects.filter(brand=brand, provider="ga4")
+        version = tokens.values_list("pk", "updated_at").first()
+        if version is None:
+            raise RuntimeError("Brand has no GA4 token")
+        cached = cls._tokens.get(brand.pk)
+        if cached and cached[0] == version and timezone.now() < cached[2] - dt.timedelta(minutes=5):
+            return cached[1]
+
+        token_obj = tokens.get()
+        token_obj.refresh_if_needed()
+        cls._tokens[brand.pk] = ((token_obj.pk, token_obj.updated_at), token_obj.access_token, token_obj.expires_at)
+        return token_obj.access_token
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
 
-    def summary(self) -> Dict[str, Any]:
-        body = {
-            "dateRanges": [{"startDate": "30daysAgo", "endDate": "yesterday"}],
+    @staticmethod
+    def _daily_body(start: dt.date, end: dt.date) -> Dict[str, Any]:
+        return {
+            "dateRanges": [{"startDate": start.isoformat(), "endDate": end.isoformat()}],
+            "dimensions": [{"name": "date"}],
             "metrics": [
                 {"name": "sessions"},
                 {"name": "totalUsers"},
                 {"name": "ecommercePurchases"},
             ],
+            "keepEmptyRows": True,  # zero days are stored too, so they aren't re-asked
         }
-        headers = {"Authorization": f"Bearer {self.access_token}"}
-        url = self.API_URL.format(prop=self.property_id)
-        data = _post(url, json=body, headers=headers)
+
+    @staticmethod
+    def _daily_rows(data: Dict[str, Any]) -> List[Dict[str, Any]]:
         try:
-            row = data["rows"][0]["metricValues"]
-            sessions = int(row[0]["value"])
-            users = int(row[1]["value"])
-            purchases = int(row[2]["value"])
-        except (KeyError, IndexError) as e:
+            return [
+                {
+                    "day": dt.datetime.strptime(row["dimensionValues"][0]["value"], "%Y%m%d").date(),
+                    "sessions": int(row["metricValues"][0]["value"]),
+                    "users": int(row["metricValues"][1]["value"]),
+                    "purchases": int(row["metricValues"][2]["value"]),
+                }
+                for row in data.get("rows", [])
+            ]
+        except (KeyError, IndexError, ValueError) as e:
             raise RuntimeError(f"Unexpected GA4 response: {data}") from e
-        conv_rate = round((purchases / sessions) * 100, 2) if sessions else 0.0
-        return {
-            "sessions": sessions,
-            "users": users,
-            "purchases": purchases,
-            "conversion_rate": conv_rate,
+
+    def batch_run_reports(self, reports: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run up to ``MAX_BATCH`` runReport bodies in one HTTP call; returns the reports in order."""
+        if len(reports) > self.MAX_BATCH:
+            raise ValueError(f"batchRunReports takes at most {self.MAX_BATCH} reports")
+        url = self.BATCH_URL.format(prop=self.property_id)
+        data = _post(
+            url, json={"requests": reports}, headers=self._headers,
+            provider=self.PROVIDER, endpoint="batchRunReports",
+        )
+        return data.get("reports", [])
+
+    def period_users(self, days: int = 30, *, daily: Optional[tuple] = None) -> Dict[str, Any]:
+        """
+        Current vs previous *days*-day ``totalUsers`` – the one total that
+        can't be summed from daily rows – from a single batchRunReports call.
+
+        Both periods come from the same report, so they are the same
+        (de-duplicated) measure. *daily* = ``(start, end)`` adds the per-day
+        sessions / users / purchases for those dates to the same call::
+
+            {"current": 700, "previous": 600,
+             "daily": [{"day": date(2024, 5, 1), "sessions": 30, "users": 25, "purchases": 1}, …]}
+        """
+        current = {"startDate": f"{days}daysAgo", "endDate": "yesterday", "name": "current"}
+        previous = {"startDate": f"{2 * days}daysAgo", "endDate": f"{days + 1}daysAgo", "name": "previous"}
+        reports = [{"dateRanges": [current, previous], "metrics": [{"name": "totalUsers"}]}]
+        if daily is not None:
+            reports.append(self._daily_body(*daily))
+        results = self.batch_run_reports(reports)
+        totals = results[0]
+
+        out: Dict[str, Any] = {
+            "current": 0,
+            "previous": 0,
+            "daily": self._daily_rows(results[1]) if daily is not None else [],
         }
+        try:
+            # multiple date ranges add an implicit dateRange dimension per row
+            for row in totals.get("rows", []):
+                out[row["dimensionValues"][-1]["value"]] = int(row["metricValues"][0]["value"])
+        except (KeyError, IndexError, ValueError) as e:
+            raise RuntimeError(f"Unexpected GA4 batch response: {totals}") from e
+        return out
 
 
 # ═════════════════════════════  META (IG Insights)  ═════════════════════════
 class MetaInsightsClient:
     GRAPH = "https://graph.facebook.com/v19.0"
+    PROVIDER = "meta"
 
     def __init__(self, brand):
         from core.models.oauth import BrandOAuthToken
@@ -324,7 +497,7 @@ class MetaInsightsClient:
             "period": "days_28",
             "access_token": self.token,
         }
-        data = _get(url, params=params)
+        data = _get(url, params=params, provider=self.PROVIDER, endpoint="insights")
         try:
             reach_entry = next(
                 item for item in data["data"] if item["name"] == "reach"
@@ -338,6 +511,12 @@ class MetaInsightsClient:
 # ═════════════════════════════  GBP (Reviews)  ══════════════════════════════
 class GBPClient:
     REVIEWS_ENDPOINT = "https://mybusiness.googleapis.com/v4/accounts/{acct}/locations/{loc}/reviews"
+    PROVIDER = "gbp"
+    PAGE_SIZE = 50  # API maximum
+    STARS = {"ONE": 1, "TWO": 2, "THREE": 3, "FOUR": 4, "FIVE": 5}
+
+    # {(pid, creds_path): AuthorizedSession} – reuse the pooled session per worker
+    _sessions: Dict[tuple, Any] = {}
 
     def __init__(self, brand):
         creds_path = os.getenv("GOOGLE_CREDENTIALS")
@@ -350,34 +529,63 @@ class GBPClient:
             raise RuntimeError(
                 "google-auth not installed; add to requirements.txt"
             ) from exc
-        scopes = ["https://www.googleapis.com/auth/business.manage"]
-        creds = service_account.Credentials.from_service_account_file(creds_path, scopes=scopes)
-        self.session = AuthorizedSession(creds)
+        key = (os.getpid(), creds_path)
+        if key not in self._sessions:
+            scopes = ["https://www.googleapis.com/auth/business.manage"]
+            creds = service_account.Credentials.from_service_account_file(creds_path, scopes=scopes)
+            self._sessions[key] = http.mount_pool(AuthorizedSession(creds))
+        self.session = self._sessions[key]
         if "/" not in brand.gbp_location_id:
             raise RuntimeError("brand.gbp_location_id must be 'accountId/locationId'")
         self.account_id, self.location_id = brand.gbp_location_id.split("/", 1)
 
-    def reviews(self) -> Dict[str, Any]:
+    def reviews_since(self, since: Optional[dt.datetime] = None) -> Dict[str, Any]:
+        """
+        Page through reviews newest-updated first (``nextPageToken``) and stop
+        at the first one not updated after *since*. Returns only the new /
+        edited reviews in compact form plus the location totals::
+
+            {"reviews": [{"id": …, "rating": 5, "update_time": datetime(…)}, …],
+             "average": 4.6 | None, "total": 312 | None}
+
+        Timestamps are parsed, not compared as RFC 3339 text – the API trims
+        trailing zeros from the fraction, so ``"…25.5Z" < "…25Z"`` as strings.
+        """
+        from django.utils.dateparse import parse_datetime
+
         url = self.REVIEWS_ENDPOINT.format(acct=self.account_id, loc=self.location_id)
-        data = self.session.get(url, timeout=TIMEOUT).json()
-        avg = data.get("averageRating")
-        cnt = data.get("totalReviewCount")
-        if avg is None or cnt is None:
-            # fallback: derive from individual reviews list
-            reviews = data.get("reviews", [])
-            cnt = len(reviews)
-            if cnt:
-                score = sum(int(rv.get("starRating", "ZERO")[0]) for rv in reviews)
-                avg = round(score / cnt, 2)
-        return {"rating": avg, "count": cnt}
+        params: Dict[str, Any] = {"pageSize": self.PAGE_SIZE, "orderBy": "updateTime desc"}
+        out: Dict[str, Any] = {"reviews": [], "average": None, "total": None}
+        first = True
+        while True:
+            data = _get(url, params=params, provider=self.PROVIDER, endpoint="reviews", session=self.session)
+            if first:
+                out["average"] = data.get("averageRating")
+                out["total"] = data.get("totalReviewCount")
+                first = False
+            for rv in data.get("reviews", []):
+                updated = parse_datetime(rv.get("updateTime") or rv.get("createTime") or "")
+                if since and (updated is None or updated <= since):
+                    return out
+                out["reviews"].append({
+                    "id": rv["reviewId"],
+                    "rating": self.STARS.get(rv.get("starRating"), 0),
+                    "update_time": updated,
+                })
+            token = data.get("nextPageToken")
+            if not token:
+                return out
+            params = {**params, "pageToken": token}
     
 class ShopifyClient:
     """
-    Lightweight wrapper around Shopify Admin REST API.
+    Lightweight wrapper around the Shopify Admin REST + GraphQL bulk APIs.
     Requires brand.shopify_shop = "<my-shop>.myshopify.com"
     and a BrandOAuthToken(provider="shopify") with access_token.
     """
 
+    PROVIDER = "shopify"
+
     def __init__(self, brand):
         from core.models.oauth import BrandOAuthToken
         token_obj = BrandOAuthToken.objects.filter(
@@ -390,26 +598,172 @@ class ShopifyClient:
         if not self.shop:
             raise RuntimeError("brand.shopify_shop not set")
 
-    def sales_summary(self) -> Dict[str, Any]:
+    API_VERSION = "2024-01"
+    PAGE_LIMIT = 250  # max orders per REST page
+    BULK_THRESHOLD = int(os.getenv("SHOPIFY_BULK_THRESHOLD", "10000"))
+    BULK_POLL_SECONDS = 3
+    BULK_MAX_WAIT = int(os.getenv("SHOPIFY_BULK_MAX_WAIT", "600"))
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        return {"X-Shopify-Access-Token": self.token}
+
+    def _admin_url(self, path: str) -> str:
+        return f"https://{self.shop}/admin/api/{self.API_VERSION}/{path}"
+
+    def sales_summary(self, *, days: int = 30, mode: str = "auto") -> Dict[str, Any]:
         """
-        Fetches all orders (status=any) in the last 30 days,
-        sums total_price to compute revenue and AOV.
+        Revenue and AOV over all orders (status=any) of the last *days* days.
+
+        mode="rest"  – stream every ``orders.json`` page via the Link cursor
+        mode="bulk"  – run a GraphQL bulk export and fold its JSONL in one pass
+        mode="auto"  – bulk when ``orders/count.json`` exceeds BULK_THRESHOLD
+        Totals are folded into running sums; no page is kept after it is read.
         """
-        # Use 2024-01 API version; adjust as needed
-        endpoint = f"https://{self.shop}/admin/api/2024-01/orders.json"
+        since = (dt.datetime.utcnow() - dt.timedelta(days=days)).isoformat(timespec="seconds") + "Z"
+        if mode == "auto":
+            count = self.order_count(since)
+            mode = "bulk" if count > self.BULK_THRESHOLD else "rest"
+        prices = self._bulk_prices(since) if mode == "bulk" else self._rest_prices(since)
+
+        total = Decimal("0")
+        count = 0
+        for price in prices:
+            total += price
+            count += 1
+        aov = (total / count) if count else Decimal("0")
+        return {"revenue": round(float(total), 2), "aov": round(float(aov), 2)}
+
+    def order_count(self, since: str) -> int:
+        params = {"status": "any", "created_at_min": since}
+        data = _get(
+            self._admin_url("orders/count.json"), headers=self._headers, params=params,
+            provider=self.PROVIDER, endpoint="orders_count",
+        )
+        return int(data.get("count", 0))
+
+    # REST cursor pagination ----------------------------------------------------
+    def iter_orders(self, since: str, *, fields: str = "total_price") -> Iterator[Dict[str, Any]]:
+        """Stream every order created since *since*, one 250-order page at a time."""
         params = {
             "status": "any",
-            "created_at_min": (requests.utils.datetime.datetime.utcnow()
-                               - requests.utils.datetime.timedelta(days=30)
-                               ).isoformat() + "Z",
-            "fields": "total_price"
+            "created_at_min": since,
+            "fields": fields,
+            "limit": self.PAGE_LIMIT,
         }
-        headers = {"X-Shopify-Access-Token": self.token}
-        data = _get(endpoint, headers=headers, params=params)
+        for page in _iter_pages(
+            self._admin_url("orders.json"), params=params, headers=self._headers,
+            provider=self.PROVIDER, endpoint="orders",
+        ):
+            yield from page.get("orders", [])
+
+    def _rest_prices(self, since: str) -> Iterator[Decimal]:
+        for order in self.iter_orders(since):
+            yield Decimal(str(order.get("total_price") or 0))
+
+    # webhooks -------------------------------------------------------------------
+    ORDER_TOPICS = ("orders/create", "orders/updated", "orders/delete")
+
+    def register_order_webhooks(self, address: str) -> None:
+        """Subscribe *address* to the order topics (already-registered is fine)."""
+        for topic in self.ORDER_TOPICS:
+            body = {"webhook": {"topic": topic, "address": address, "format": "json"}}
+            r = http.request(
+                "POST", self._admin_url("webhooks.json"), json=body, headers=self._headers,
+                provider=self.PROVIDER, endpoint="webhooks",
+            )
+            if r.status_code == 422:  # "address for this topic has already been taken"
+                continue
+            _raise_for_status(r)
+
+    # GraphQL bulk export ------------------------------------------------------
+    def _graphql(self, query: str) -> Dict[str, Any]:
+        data = _post(
+            self._admin_url("graphql.json"), json={"query": query}, headers=self._headers,
+            provider=self.PROVIDER, endpoint="graphql",
+        )
+        if data.get("errors"):
+            raise RuntimeError(f"Shopify GraphQL error: {data['errors']}")
+        return data["data"]
+
+    def _bulk_prices(self, since: str) -> Iterator[Decimal]:
+        inner = (
+            '{ orders(query: "created_at:>=%s") '
+            "{ edges { node { totalPriceSet { shopMoney { amount } } } } } }" % since
+        )
+        started = self._graphql(
+            'mutation { bulkOperationRunQuery(query: %s) '
+            "{ bulkOperation { id status } userErrors { field message } } }" % json.dumps(inner)
+        )["bulkOperationRunQuery"]
+        if started["userErrors"]:
+            raise RuntimeError(f"Shopify bulk operation rejected: {started['userErrors']}")
+
+        waited = 0
+        while True:
+            op = self._graphql(
+                "{ currentBulkOperation { id status errorCode objectCount url } }"
+            )["currentBulkOperation"]
+            if op["status"] == "COMPLETED":
+                break
+            if op["status"] in ("FAILED", "CANCELED", "EXPIRED"):
+                raise RuntimeError(f"Shopify bulk operation {op['status']}: {op.get('errorCode')}")
+            if waited >= self.BULK_MAX_WAIT:
+                raise RuntimeError("Shopify bulk operation did not finish in time")
+            time.sleep(self.BULK_POLL_SECONDS)
+            waited += self.BULK_POLL_SECONDS
+
+        if not op.get("url"):  # no matching orders
+            return
+        r = http.request("GET", op["url"], stream=True)
+        _raise_for_status(r)
+        with r:
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                amount = json.loads(line).get("totalPriceSet", {}).get("shopMoney", {}).get("amount")
+                yield Decimal(str(amount or 0))
+
+
+# ═════════════════════════════  ASYNC FAN-OUT  ══════════════════════════════
+class AsyncClient:
+    """
+    asyncio façade over any client above: ``await AsyncClient(MozClient(), sem)
+    .domain_authority("x.com")``. Each call runs on the default thread pool over
+    the same pooled session as the sync client, and *semaphore* caps how many
+    calls of one task are in flight at once.
+    """
+
+    def __init__(self, client: Any, semaphore: asyncio.Semaphore) -> None:
+        self._client = client
+        self._sem = semaphore
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
 
-        orders = data.get("orders", [])
-        total_revenue = sum(float(o.get("total_price", 0)) for o in orders)
-        count = len(orders)
-        aov = (total_revenue / count) if count else 0.0
+        async def call(*args, **kwargs):
+            async with self._sem:
+                return await asyncio.to_thread(attr, *args, **kwargs)
 
-        return {"revenue": round(total_revenue, 2), "aov": round(aov, 2)}
\ No newline at end of file
+        return call
+
+
+async def gather_calls(
+    calls: List[tuple],
+    *,
+    limit: int,
+) -> Dict[str, Any]:
+    """
+    Run ``[(key, client, method, args), …]`` concurrently (at most *limit* at a
+    time) and return ``{key: result}``. A failed call maps to its exception
+    instead of cancelling the others – their results are already paid for.
+    """
+    sem = asyncio.Semaphore(max(1, limit))
+    wrapped: Dict[int, AsyncClient] = {}
+    coros = []
+    for _key, client, method, args in calls:
+        aclient = wrapped.setdefault(id(client), AsyncClient(client, sem))
+        coros.append(getattr(aclient, method)(*args))
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    return {key: res for (key, *_), res in zip(calls, results)}
@@ -0,0 +1,264 @@
+"""
+Redis-backed TTL cache for slow-changing provider responses.
+
+Entries are shared across tenants and workers and keyed on
+``(provider, endpoint, sha256(normalised request))`` where the normalised
+request is the method, URL, query params and JSON body serialised with sorted
+keys. TTLs come from ``settings.API_CACHE_TTLS`` (``"provider:endpoint"`` or
+``"provider"`` → seconds); anything without a TTL is never cached.
+Concurrent misses for the same key are coalesced into one provider call.
+
+Usage:
+    from utils.cache import cached, stats
+    data = cached("moz", "url_metrics", request_parts, lambda: _post(...))
+    stats()   # {"moz:url_metrics": {"hit": 12, "miss": 3, "coalesced": 2, "hit_ratio": 0.82}, …}
+"""
+from __future__ import annotations
+import json, time, uuid, hashlib, logging
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+from django.conf import settings
+
+from utils.redis_conn import get_redis
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "mi:cache:"
+FLIGHT_PREFIX = "mi:flight:"
+STATS_KEY = "mi:cache-stats"
+FLIGHT_POLL = 0.2  # seconds between single-flight result checks
+
+# delete the lock only if we still own it
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def ttl_for(provider: str, endpoint: str = "") -> Optional[int]:
+    ttls: Dict[str, int] = getattr(settings, "API_CACHE_TTLS", {})
+    return ttls.get(f"{provider}:{endpoint}", ttls.get(provider))
+
+
+def cache_key(provider: str, endpoint: str, request_parts: Any) -> str:
+    blob = json.dumps(request_parts, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(blob.encode()).hexdigest()
+    return f"{KEY_PREFIX}{provider}:{endpoint}:{digest}"
+
+
+def _count(provider: str, endpoint: str, outcome: str) -> None:
+    try:
+        get_redis().hincrby(STATS_KEY, f"{provider}:{endpoint}:{outcome}", 1)
+    except redis.RedisError:
+        pass
+
+
+def cached(
+    provider: str,
+    endpoint: str,
+    request_parts: Any,
+    fetch: Callable[[], Any],
+) -> Any:
+    """
+    Return the cached JSON for *request_parts* or call *fetch* and store its
+    result for the configured TTL. Redis errors degrade to a plain *fetch*.
+
+    Misses are single-flighted across workers: the first caller takes a Redis
+    lock and fetches, concurrent callers for the same key wait for its result
+    to land in the cache instead of issuing a duplicate request.
+    """
+    ttl = ttl_for(provider, endpoint)
+    if not ttl:
+        return fetch()
+
+    key = cache_key(provider, endpoint, request_parts)
+    try:
+        r = get_redis()
+        hit = r.get(key)
+    except redis.RedisError as exc:
+        log.warning("Response cache unavailable (%s)", exc)
+        return fetch()
+    if hit is not None:
+        _count(provider, endpoint, "hit")
+        return json.loads(hit)
+
+    lock_key = FLIGHT_PREFIX + key[len(KEY_PREFIX):]
+    token = uuid.uuid4().hex
+    lock_ttl = int(getattr(settings, "API_SINGLE_FLIGHT_LOCK_TTL", 60))
+    max_wait = float(getattr(settings, "API_SINGLE_FLIGHT_WAIT", 45))
+    deadline = time.monotonic() + max_wait
+    try:
+        while not r.set(lock_key, token, nx=True, ex=lock_ttl):
+            # another worker is fetching this key – wait for its result
+            time.sleep(FLIGHT_POLL)
+            hit = r.get(key)
+            if hit is not None:
+                _count(provider, endpoint, "coalesced")
+                return json.loads(hit)
+            if time.monotonic() > deadline:
+                log.warning("Single-flight wait for %s:%s timed out", provider, endpoint)
+                token = None
+                break
+    except redis.RedisError:
+        token = None
+
+    _count(provider, endpoint, "miss")
+    try:
+        data = fetch()
+        try:
+            r.set(key, json.dumps(data), ex=int(ttl))
+        except redis.RedisError:
+            pass
+        return data
+    finally:
+        if token:
+            try:
+                r.eval(_RELEASE_LUA, 1, lock_key, token)
+            except redis.RedisError:
+                pass
+
+
+def cached_many(
+    provider: str,
+    endpoint: str,
+    targets: List[str],
+    fetch_batch: Callable[[List[str]], Dict[str, Any]],
+    *,
+    batch_size: int,
+    variant: Any = None,
+) -> Dict[str, Any]:
+    """
+    Per-target cache for multi-target endpoints: look every target up in one
+    MGET, then call ``fetch_batch(chunk) -> {target: item}`` for the misses in
+    chunks of *batch_size* and cache each item on its own, so later batches
+    with a different mix of targets still hit. *variant* carries any request
+    options (locale, fields …) that change the per-target answer.
+
+    Misses are single-flighted per target like ``cached``: this call fetches
+    only the targets whose flight lock it takes, then waits for the ones
+    another worker is already fetching (and fetches them itself if that
+    worker fails, times out or finds nothing for them).
+    """
+    targets = list(dict.fromkeys(targets))
+    ttl = ttl_for(provider, endpoint)
+    keys = {t: cache_key(provider, endpoint, ["target", t, variant]) for t in targets}
+    out: Dict[str, Any] = {}
+    r = None
+    if ttl:
+        try:
+            r = get_redis()
+            for target, hit in zip(targets, r.mget([keys[t] for t in targets])):
+                if hit is not None:
+                    out[target] = json.loads(hit)
+        except redis.RedisError as exc:
+            log.warning("Response cache unavailable (%s)", exc)
+            r = None
+        for _ in out:
+            _count(provider, endpoint, "hit")
+
+    def fetch(batch: List[str]) -> None:
+        for i in range(0, len(batch), batch_size):
+            chunk = batch[i:i + batch_size]
+            fetched = fetch_batch(chunk)
+            out.update(fetched)
+            if not ttl:
+                continue
+            for _ in chunk:
+                _count(provider, endpoint, "miss")
+            try:
+                pipe = get_redis().pipeline()
+                for target, item in fetched.items():
+                    pipe.set(keys[target], json.dumps(item), ex=int(ttl))
+                pipe.execute()
+            except redis.RedisError:
+                pass
+
+    missing = [t for t in targets if t not in out]
+    if not missing:
+        return out
+    if r is None:  # nothing to cache, or Redis is down – no single-flight either
+        fetch(missing)
+        return out
+
+    token = uuid.uuid4().hex
+    locks = {t: FLIGHT_PREFIX + keys[t][len(KEY_PREFIX):] for t in missing}
+    lock_ttl = int(getattr(settings, "API_SINGLE_FLIGHT_LOCK_TTL", 60))
+    try:
+        pipe = r.pipeline()
+        for t in missing:
+            pipe.set(locks[t], token, nx=True, ex=lock_ttl)
+        mine = [t for t, ok in zip(missing, pipe.execute()) if ok]
+    except redis.RedisError:
+        mine, token = [], None
+    claimed = set(mine)
+    theirs = [t for t in missing if t not in claimed] if token else []
+
+    try:
+        fetch(mine if token else missing)
+    finally:
+        try:
+            for t in mine:
+                r.eval(_RELEASE_LUA, 1, locks[t], token)
+        except redis.RedisError:
+            pass
+
+    if theirs:
+        landed = _await_flights(r, [keys[t] for t in theirs], [locks[t] for t in theirs])
+        for target, item in zip(theirs, landed):
+            if item is not None:
+                out[target] = item
+                _count(provider, endpoint, "coalesced")
+        fetch([t for t, item in zip(theirs, landed) if item is None])
+    return out
+
+
+def _await_flights(r, keys: List[str], locks: List[str]) -> List[Any]:
+    """
+    Poll until each of *keys* is cached or its flight lock is gone (the other
+    worker finished without caching it); values in order, None where nothing landed.
+    """
+    found: List[Any] = [None] * len(keys)
+    pending = list(range(len(keys)))
+    deadline = time.monotonic() + float(getattr(settings, "API_SINGLE_FLIGHT_WAIT", 45))
+    try:
+        while pending and time.monotonic() <= deadline:
+            time.sleep(FLIGHT_POLL)
+            hits = r.mget([keys[i] for i in pending])
+            held = r.exists(*[locks[i] for i in pending])
+            still = []
+            for i, hit in zip(pending, hits):
+                if hit is not None:
+                    found[i] = json.loads(hit)
+                else:
+                    still.append(i)
+            pending = still
+            if not held:
+                break  # every remaining flight ended without caching its target
+    except redis.RedisError:
+        pass
+    if pending:
+        log.debug("Single-flight wait ended with %d target(s) uncached", len(pending))
+    return found
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """Hit/miss counters per ``provider:endpoint`` since the last ``reset_stats``."""
+    try:
+        raw = get_redis().hgetall(STATS_KEY)
+    except redis.RedisError:
+        return {}
+    out: Dict[str, Dict[str, float]] = {}
+    for field, count in raw.items():
+        name, _, outcome = field.decode().rpartition(":")
+        out.setdefault(name, {"hit": 0, "miss": 0, "coalesced": 0})[outcome] = int(count)
+    for row in out.values():
+        total = row["hit"] + row["miss"] + row["coalesced"]
+        row["hit_ratio"] = round((row["hit"] + row["coalesced"]) / total, 3) if total else 0.0
+    return out
+
+
+def reset_stats() -> None:
+    get_redis().delete(STATS_KEY)
@@ -0,0 +1,96 @@
+"""
+Per-provider circuit breaker shared by every Celery worker via Redis.
+
+closed     – calls flow; transport failures are counted in a sliding window.
+open       – ``API_CIRCUIT_FAILURE_THRESHOLD`` failures inside
+             ``API_CIRCUIT_WINDOW`` seconds trip the breaker; every call fails
+             fast with ``CircuitOpenError`` for ``API_CIRCUIT_COOLDOWN`` seconds.
+half-open  – after the cooldown exactly one worker is allowed a probe call;
+             a 2xx/3xx answer closes the breaker, an outage re-opens it.
+             Any other answer (401/403 from a revoked key, 429) is
+             inconclusive: the probe slot is kept until it expires, so the
+             next probe waits one more cooldown.
+
+Only outages count (connection errors, timeouts, 5xx) – quota responses (429)
+are the rate limiter's job.
+"""
+from __future__ import annotations
+import logging
+
+import redis
+from django.conf import settings
+
+from utils.redis_conn import get_redis
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "mi:circuit:"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+def _conf(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def _keys(provider: str) -> dict:
+    base = f"{KEY_PREFIX}{provider}"
+    return {
+        "fails": f"{base}:fails",
+        "open": f"{base}:open",
+        "tripped": f"{base}:tripped",
+        "probe": f"{base}:probe",
+    }
+
+
+def before_call(provider: str) -> None:
+    """Raise ``CircuitOpenError`` if *provider* must not be called right now."""
+    k = _keys(provider)
+    try:
+        r = get_redis()
+        if r.exists(k["open"]):
+            raise CircuitOpenError(f"{provider} circuit open – failing fast")
+        if r.exists(k["tripped"]):
+            # half-open: let a single worker probe the provider
+            probe_ttl = _conf("API_CIRCUIT_COOLDOWN", 30)
+            if not r.set(k["probe"], 1, nx=True, ex=probe_ttl):
+                raise CircuitOpenError(f"{provider} circuit half-open – probe in flight")
+    except redis.RedisError as exc:
+        log.warning("Circuit breaker unavailable (%s) – allowing %s call", exc, provider)
+
+
+def record_success(provider: str) -> None:
+    k = _keys(provider)
+    try:
+        r = get_redis()
+        if r.exists(k["tripped"]):
+            log.info("%s circuit closed", provider)
+        r.delete(k["fails"], k["tripped"], k["probe"])
+    except redis.RedisError:
+        pass
+
+
+def record_failure(provider: str) -> None:
+    k = _keys(provider)
+    cooldown = _conf("API_CIRCUIT_COOLDOWN", 30)
+    try:
+        r = get_redis()
+        if r.exists(k["tripped"]):
+            # failed probe – straight back to open
+            trip = True
+        else:
+            fails = r.incr(k["fails"])
+            if fails == 1:
+                r.expire(k["fails"], _conf("API_CIRCUIT_WINDOW", 60))
+            trip = fails >= _conf("API_CIRCUIT_FAILURE_THRESHOLD", 5)
+        if trip:
+            pipe = r.pipeline()
+            pipe.set(k["open"], 1, ex=cooldown)
+            pipe.set(k["tripped"], 1, ex=cooldown * 20)
+            pipe.delete(k["fails"], k["probe"])
+            pipe.execute()
+            log.error("%s circuit opened for %ss", provider, cooldown)
+    except redis.RedisError:
+        pass
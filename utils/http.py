@@ -0,0 +1,178 @@
+"""
+Shared HTTP transport for every outbound API call in Market Insights.
+
+One pooled ``requests.Session`` is kept per provider host and per worker
+process, so consecutive Moz / Serpstack / GA4 / Shopify … calls reuse the same
+keep-alive TCP+TLS connection instead of paying a fresh handshake each time.
+
+Tunables (environment)
+──────────────────────
+HTTP_POOL_CONNECTIONS   – number of host pools per session       (default 10)
+HTTP_POOL_MAXSIZE       – max keep-alive sockets per host pool   (default 20)
+HTTP_CONNECT_TIMEOUT    – seconds to establish a connection      (default 3.05)
+HTTP_READ_TIMEOUT       – seconds to wait for a response         (default 15)
+HTTP_MAX_RETRIES        – retries after the first attempt        (default 3)
+HTTP_BACKOFF_BASE       – first backoff ceiling in seconds       (default 0.5)
+HTTP_BACKOFF_MAX        – backoff ceiling in seconds             (default 20)
+HTTP_RETRY_AFTER_MAX    – longest Retry-After we will sleep for  (default 60)
+"""
+
+from __future__ import annotations
+import os, time, random, logging, threading, datetime as dt
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import circuit, ratelimit
+
+log = logging.getLogger(__name__)
+
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+TIMEOUT: Tuple[float, float] = (
+    float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+    float(os.getenv("HTTP_READ_TIMEOUT", "15")),
+)
+
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "20"))
+RETRY_AFTER_MAX = float(os.getenv("HTTP_RETRY_AFTER_MAX", "60"))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "User-Agent": "market-insights/1.0 (+requests)",
+}
+
+# {(pid, "scheme://host"): Session} – keyed by pid so a Celery prefork child
+# never inherits (and shares) sockets opened by its parent before the fork.
+_SESSIONS: Dict[Tuple[int, str], requests.Session] = {}
+_LOCK = threading.Lock()
+
+
+# ─────────────────────────────  sessions  ───────────────────────────────────
+def mount_pool(session: requests.Session) -> requests.Session:
+    """Attach a pooled, keep-alive adapter + default headers to **session**."""
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # gzip/deflate only – requests cannot decode brotli without extra deps
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def session_for(url: str) -> requests.Session:
+    """Return the process-wide pooled session for the host of **url**."""
+    key = (os.getpid(), _origin(url))
+    sess = _SESSIONS.get(key)
+    if sess is None:
+        with _LOCK:
+            sess = _SESSIONS.get(key)
+            if sess is None:
+                sess = mount_pool(requests.Session())
+                _SESSIONS[key] = sess
+    return sess
+
+
+def close_sessions() -> None:
+    """Drop every pooled session owned by this process (e.g. on worker shutdown)."""
+    pid = os.getpid()
+    with _LOCK:
+        for key in [k for k in _SESSIONS if k[0] == pid]:
+            _SESSIONS.pop(key).close()
+
+
+# ─────────────────────────────  resilience  ─────────────────────────────────
+def retry_after(resp: requests.Response) -> Optional[float]:
+    """Seconds requested by a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+def backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter for retry number *attempt* (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+# ─────────────────────────────  requests  ───────────────────────────────────
+def request(
+    method: str,
+    url: str,
+    *,
+    provider: Optional[str] = None,
+    endpoint: str = "",
+    session: Optional[requests.Session] = None,
+    **kw,
+) -> requests.Response:
+    """
+    Send **method** to **url** over the pooled session for its host.
+
+    Connection errors, timeouts, 429 and 5xx are retried up to ``MAX_RETRIES``
+    times with jittered exponential backoff, honouring ``Retry-After``. When
+    *provider* is given the call also waits on the shared rate limiter for
+    ``provider[:endpoint]`` and goes through that provider's circuit breaker.
+    The last response is returned as-is; callers decide how to raise.
+    *session* overrides the per-host pool for clients that must send through
+    their own authorised session (e.g. Google service-account credentials).
+    """
+    kw.setdefault("timeout", TIMEOUT)
+    sess = session or session_for(url)
+    if provider:
+        circuit.before_call(provider)
+
+    for attempt in range(MAX_RETRIES + 1):
+        last = attempt == MAX_RETRIES
+        if provider:
+            ratelimit.acquire(provider, endpoint)
+        try:
+            resp = sess.request(method, url, **kw)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            if last:
+                if provider:
+                    circuit.record_failure(provider)
+                raise
+            delay = backoff(attempt)
+            log.warning("%s %s failed (%s) – retry %d in %.1fs", method, url, exc, attempt + 1, delay)
+            time.sleep(delay)
+            continue
+
+        if resp.status_code not in RETRY_STATUSES:
+            # 4xx (revoked key, bad request) proves nothing about an outage –
+            # it must not close a half-open breaker nor reset the failure count
+            if provider and resp.status_code < 400:
+                circuit.record_success(provider)
+            return resp
+
+        delay = retry_after(resp)
+        if delay is None:
+            delay = backoff(attempt)
+        if last or delay > RETRY_AFTER_MAX:
+            if provider and resp.status_code >= 500:
+                circuit.record_failure(provider)
+            return resp
+        log.warning("%s %s → %s – retry %d in %.1fs", method, url, resp.status_code, attempt + 1, delay)
+        time.sleep(delay)
+
+    return resp  # pragma: no cover – loop always returns or raises
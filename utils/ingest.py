@@ -0,0 +1,297 @@
+"""Incremental ingestion helpers – keep local rollups current instead of
+re-pulling whole provider windows on every report.
+
+Usage:
+    from utils.ingest import apply_shopify_order, shopify_rollup_summary
+    apply_shopify_order(brand, "orders/create", payload)   # from the webhook
+    shopify_rollup_summary(brand)   # → {"revenue": …, "aov": …} or None
+    sync_ga4_daily(brand, GA4Client(brand))   # → current / previous 30-day GA4 totals
+    apply_mention_buckets(brand, alert_id, fetched)   # → 7-day volume / sentiment
+    sync_gbp_reviews(brand, GBPClient(brand))   # → {"rating": …, "count": …}
+"""
+from __future__ import annotations
+import datetime as dt
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.models.oauth import Brand
+from core.models.ingest import (
+    ShopifyOrder,
+    ShopifyDailyRevenue,
+    ShopifyRollupState,
+    GA4DailyMetric,
+    MentionCursor,
+    MentionDailyBucket,
+    GBPReview,
+    GBPReviewState,
+)
+
+# ---------------------------------------------------------------------------
+# Shopify – order webhooks → per-day revenue rollups
+# ---------------------------------------------------------------------------
+
+SHOPIFY_BACKFILL_BATCH = 1000
+
+
+def _order_fields(order: Dict[str, Any]) -> Dict[str, Any]:
+    created = parse_datetime(order["created_at"])
+    updated = parse_datetime(order.get("updated_at") or order["created_at"])
+    return {
+        "day": created.astimezone(dt.timezone.utc).date(),
+        "total_price": Decimal(str(order.get("total_price") or 0)),
+        "updated_at": updated,
+    }
+
+
+def _bump(brand: Brand, day: dt.date, revenue: Decimal, orders: int) -> None:
+    row, _ = ShopifyDailyRevenue.objects.get_or_create(brand=brand, day=day)
+    ShopifyDailyRevenue.objects.filter(pk=row.pk).update(
+        revenue=F("revenue") + revenue, orders=F("orders") + orders
+    )
+
+
+def apply_shopify_order(brand: Brand, topic: str, order: Dict[str, Any]) -> None:
+    """
+    Fold one ``orders/create|updated|delete`` webhook into the daily rollups.
+    Redeliveries and out-of-order updates are absorbed via the order ledger.
+    """
+    order_id = int(order["id"])
+    with transaction.atomic():
+        if topic == "orders/delete":
+            row = ShopifyOrder.objects.select_for_update().filter(brand=brand, order_id=order_id).first()
+            if row:
+                _bump(brand, row.day, -row.total_price, -1)
+                row.delete()
+            return
+
+        fields = _order_fields(order)
+        row, created = ShopifyOrder.objects.get_or_create(brand=brand, order_id=order_id, defaults=fields)
+        if created:
+            _bump(brand, row.day, row.total_price, 1)
+            ShopifyRollupState.objects.get_or_create(brand=brand, defaults={"covered_since": timezone.now().date()})
+            return
+
+        row = ShopifyOrder.objects.select_for_update().get(pk=row.pk)
+        if fields["updated_at"] < row.updated_at:
+            return  # stale redelivery
+        delta = fields["total_price"] - row.total_price
+        if delta:
+            _bump(brand, row.day, delta, 0)
+        row.total_price = fields["total_price"]
+        row.updated_at = fields["updated_at"]
+        row.save(update_fields=["total_price", "updated_at"])
+
+
+def seed_shopify_rollups(brand: Brand, client, *, days: int = 30) -> None:
+    """Seed the ledger + rollups from the Admin API so they cover *days* at once."""
+    start = (timezone.now() - timedelta(days=days)).date()
+    since = dt.datetime.combine(start, dt.time.min).isoformat(timespec="seconds") + "Z"
+
+    batch = []
+    for order in client.iter_orders(since, fields="id,created_at,updated_at,total_price"):
+        batch.append(ShopifyOrder(brand=brand, order_id=int(order["id"]), **_order_fields(order)))
+        if len(batch) >= SHOPIFY_BACKFILL_BATCH:
+            ShopifyOrder.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    ShopifyOrder.objects.bulk_create(batch, ignore_conflicts=True)
+
+    # rebuild the covered days from the ledger (≤ days+1 rows)
+    with transaction.atomic():
+        totals = (
+            ShopifyOrder.objects.filter(brand=brand, day__gte=start)
+            .values("day")
+            .annotate(revenue=Sum("total_price"), orders=Count("id"))
+        )
+        ShopifyDailyRevenue.objects.filter(brand=brand, day__gte=start).delete()
+        ShopifyDailyRevenue.objects.bulk_create(
+            ShopifyDailyRevenue(brand=brand, day=t["day"], revenue=t["revenue"], orders=t["orders"])
+            for t in totals
+        )
+        ShopifyRollupState.objects.update_or_create(brand=brand, defaults={"covered_since": start})
+
+
+def shopify_rollup_summary(brand: Brand, *, days: int = 30) -> Optional[Dict[str, Any]]:
+    """
+    Revenue / AOV over the last *days* days from the local rollups – O(days)
+    rows – or ``None`` when the rollups do not cover the whole window yet.
+    """
+    start = (timezone.now() - timedelta(days=days)).date()
+    state = ShopifyRollupState.objects.filter(brand=brand).first()
+    if state is None or state.covered_since > start:
+        return None
+    agg = ShopifyDailyRevenue.objects.filter(brand=brand, day__gte=start).aggregate(
+        revenue=Sum("revenue"), orders=Sum("orders")
+    )
+    revenue = agg["revenue"] or Decimal("0")
+    orders = agg["orders"] or 0
+    aov = (revenue / orders) if orders else Decimal("0")
+    return {"revenue": round(float(revenue), 2), "aov": round(float(aov), 2)}
+
+
+# ---------------------------------------------------------------------------
+# GA4 – daily rows pulled incrementally, windows summed locally
+# ---------------------------------------------------------------------------
+
+# GA4 keeps revising the most recent day(s) while processing catches up
+GA4_SETTLE_DAYS = 1
+
+
+def sync_ga4_daily(brand: Brand, client, *, days: int = 30) -> Dict[str, Any]:
+    """
+    Fetch only the GA4 days we don't have yet (plus the still-settling last
+    day) for the current and previous *days*-day periods, store them, and
+    return ``{"current": …, "previous": …}`` summed from local rows.
+
+    ``users`` can't be summed across days (returning visitors), so it is the
+    one total still asked from GA4 – in the same batch call as the days.
+    """
+    fetched = client.period_users(days, daily=ga4_missing_days(brand, days=2 * days))
+    store_ga4_daily(brand, fetched["daily"])
+    yesterday = timezone.now().date() - timedelta(days=1)
+    current = ga4_window_summary(brand, yesterday - timedelta(days=days - 1), yesterday)
+    previous = ga4_window_summary(brand, yesterday - timedelta(days=2 * days - 1), yesterday - timedelta(days=days))
+    return {
+        "current": {**current, "users": fetched["current"]},
+        "previous": {**previous, "users": fetched["previous"]},
+    }
+
+
+def ga4_missing_days(brand: Brand, *, days: int = 30) -> Optional[Tuple[dt.date, dt.date]]:
+    """``(start, end)`` of the *days*-day window not stored yet, or None when complete."""
+    yesterday = timezone.now().date() - timedelta(days=1)
+    window_start = yesterday - timedelta(days=days - 1)
+    latest = GA4DailyMetric.objects.filter(brand=brand).aggregate(day=Max("day"))["day"]
+    if latest is None or latest < window_start:
+        fetch_from = window_start
+    else:
+        fetch_from = min(latest + timedelta(days=1), yesterday - timedelta(days=GA4_SETTLE_DAYS - 1))
+    return (fetch_from, yesterday) if fetch_from <= yesterday else None
+
+
+def store_ga4_daily(brand: Brand, rows: List[Dict[str, Any]]) -> None:
+    """Upsert ``GA4Client.period_users()["daily"]``-shaped rows."""
+    GA4DailyMetric.objects.bulk_create(
+        [GA4DailyMetric(brand=brand, **row) for row in rows],
+        update_conflicts=True,
+        unique_fields=["brand", "day"],
+        update_fields=["sessions", "users", "purchases", "fetched_at"],
+    )
+
+
+def ga4_window_summary(brand: Brand, start: dt.date, end: dt.date) -> Dict[str, Any]:
+    """Sessions / purchases / conversion rate summed over stored days (users don't add up)."""
+    agg = GA4DailyMetric.objects.filter(brand=brand, day__range=(start, end)).aggregate(
+        sessions=Sum("sessions"), purchases=Sum("purchases")
+    )
+    sessions = agg["sessions"] or 0
+    purchases = agg["purchases"] or 0
+    conv_rate = round((purchases / sessions) * 100, 2) if sessions else 0.0
+    return {
+        "sessions": sessions,
+        "purchases": purchases,
+        "conversion_rate": conv_rate,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Mention – cursor-based pulls folded into daily buckets
+# ---------------------------------------------------------------------------
+
+def mention_cursor(brand: Brand, alert_id: str) -> Optional[str]:
+    """Id of the newest mention already counted for this alert, if any."""
+    cursor = MentionCursor.objects.filter(brand=brand, alert_id=str(alert_id)).first()
+    return (cursor.last_mention_id or None) if cursor else None
+
+
+def apply_mention_buckets(
+    brand: Brand,
+    alert_id: str,
+    fetched: Dict[str, Any],
+    *,
+    days: int = 7,
+) -> Dict[str, Any]:
+    """
+    Add the per-day counters from ``MentionClient.new_mention_buckets`` to the
+    local buckets, advance the cursor and return volume + %-positive summed
+    over the last *days* calendar days.
+
+    The counters are only applied while the stored cursor still equals the
+    ``since_id`` the pull started from; an overlapping run (report collection
+    and fleet refresh at once) that lost the race is dropped instead of
+    counting the same mentions twice – the next pull starts after the winner.
+    """
+    alert_id = str(alert_id)
+    with transaction.atomic():
+        cursor, _ = MentionCursor.objects.select_for_update().get_or_create(brand=brand, alert_id=alert_id)
+        if (cursor.last_mention_id or None) == (fetched.get("since_id") or None):
+            for day, counts in fetched["days"].items():
+                if not day:
+                    continue
+                row, _ = MentionDailyBucket.objects.get_or_create(brand=brand, alert_id=alert_id, day=day)
+                MentionDailyBucket.objects.filter(pk=row.pk).update(
+                    volume=F("volume") + counts["volume"], positive=F("positive") + counts["positive"]
+                )
+            if fetched.get("last_id"):
+                cursor.last_mention_id = fetched["last_id"]
+                cursor.last_published_at = parse_datetime(fetched["last_published_at"] or "") or None
+                cursor.save(update_fields=["last_mention_id", "last_published_at"])
+
+    start = (timezone.now() - timedelta(days=days)).date()
+    agg = MentionDailyBucket.objects.filter(brand=brand, alert_id=alert_id, day__gte=start).aggregate(
+        volume=Sum("volume"), positive=Sum("positive")
+    )
+    volume = agg["volume"] or 0
+    positive = agg["positive"] or 0
+    pct_positive = round((positive / volume) * 100, 1) if volume else 0.0
+    return {"volume": volume, "sentiment_pct": pct_positive}
+
+
+# ---------------------------------------------------------------------------
+# Google Business Profile – reviews newer than the last sync only
+# ---------------------------------------------------------------------------
+
+def sync_gbp_reviews(brand: Brand, client) -> Dict[str, Any]:
+    """
+    Pull reviews updated since the stored watermark, fold them into the
+    running rating sum / count and return ``{"rating", "count"}``. The API's
+    own location totals win when it sends them; the local aggregates cover
+    locations where it doesn't.
+    """
+    state, _ = GBPReviewState.objects.get_or_create(brand=brand)
+    fetched = client.reviews_since(state.last_update_time)
+
+    with transaction.atomic():
+        state = GBPReviewState.objects.select_for_update().get(pk=state.pk)
+        for rv in fetched["reviews"]:
+            row, created = GBPReview.objects.get_or_create(
+                brand=brand,
+                review_id=rv["id"],
+                defaults={"rating": rv["rating"], "update_time": rv["update_time"]},
+            )
+            if created:
+                state.rating_sum += rv["rating"]
+                state.review_count += 1
+            elif row.rating != rv["rating"]:
+                state.rating_sum += rv["rating"] - row.rating
+                row.rating = rv["rating"]
+                row.update_time = rv["update_time"]
+                row.save(update_fields=["rating", "update_time"])
+        seen = [rv["update_time"] for rv in fetched["reviews"] if rv["update_time"]]
+        if state.last_update_time:
+            seen.append(state.last_update_time)
+        if seen:
+            state.last_update_time = max(seen)
+        state.save()
+
+    avg = fetched["average"]
+    cnt = fetched["total"]
+    if avg is None or cnt is None:
+        cnt = state.review_count
+        avg = round(state.rating_sum / cnt, 2) if cnt else None
+    return {"rating": avg, "count": cnt}
@@ -1,8 +1,9 @@
 """KPI calculation helper.
 
 Usage:
-    from utils.kpi import build_kpi_dataframe
-    df = build_kpi_dataframe(report_id)
+    from utils.kpi import build_kpi_dataframe, kpi_table
+    df = build_kpi_dataframe(report_id)   # pandas, from raw snapshots
+    table = kpi_table(report)             # stored compact table (views / PDF)
 """
 from __future__ import annotations
 import math
@@ -10,7 +11,7 @@ from datetime import date
 from typing import Dict, Any
 
 import pandas as pd
-from django.db.models import Max, QuerySet, F
+from core.models.domain import DomainSnapshot
 from core.models.metrics import MetricSnapshot
 from core.models.report import Report, Competitor
 
@@ -35,19 +36,19 @@ class KPI:
 
 _REGISTRY: list[KPI] = [
     KPI("domain_authority", "Domain Authority", lambda s: s.max()),
-    KPI("total_backlinks", "Total Backlinks", lambda s: s.max()),
-    KPI("estimated_org_visits", "Estimated Organic Visits", lambda s: s.mean()),
-    KPI("estimated_paid_visits", "Estimated Paid Visits", lambda s: s.mean()),
+    KPI("backlinks", "Total Backlinks", lambda s: s.max()),
+    KPI("est_organic_visits", "Estimated Organic Visits", lambda s: s.mean()),
+    KPI("est_paid_visits", "Estimated Paid Visits", lambda s: s.mean()),
     KPI("twitter_followers", "Twitter Followers", lambda s: s.max()),
     KPI("twitter_engagement_rate", "Tweet Engagement %", lambda s: round(s.mean(), 2)),
-    KPI("ig_followers", "Instagram Followers", lambda s: s.max()),
+    KPI("instagram_followers", "Instagram Followers", lambda s: s.max()),
     KPI("ig_reach", "IG Reach (30d)", lambda s: s.mean()),
-    KPI("ga_sessions", "GA4 Sessions (30d)", lambda s: s.sum()),
-    KPI("ga_purchases", "Purchases (30d)", lambda s: s.sum()),
-    KPI("ga_conversion_rate", "Conversion Rate %", lambda s: round(s.mean(), 2)),
-    KPI("avg_rating", "Google Rating", lambda s: round(s.max(), 2)),
-    KPI("review_count", "Review Count", lambda s: s.max()),
-    KPI("shopify_revenue", "Revenue (30d)", lambda s: s.sum()),
+    KPI("ga4_sessions", "GA4 Sessions (30d)", lambda s: s.sum()),
+    KPI("ga4_purchases", "Purchases (30d)", lambda s: s.sum()),
+    KPI("ga4_conversion_rate", "Conversion Rate %", lambda s: round(s.mean(), 2)),
+    KPI("gbp_avg_rating", "Google Rating", lambda s: round(s.max(), 2)),
+    KPI("gbp_review_count", "Review Count", lambda s: s.max()),
+    KPI("shopify_rev", "Revenue (30d)", lambda s: s.sum()),
     KPI("shopify_aov", "Average Order Value", lambda s: round(s.mean(), 2)),
 ]
 
@@ -59,35 +60,103 @@ _REGISTRY: list[KPI] = [
 def build_kpi_dataframe(report_id: int) -> pd.DataFrame:
     """Return a DataFrame with rows=KPIs and columns=[label, brand, competitor1, competitor2]."""
 
-    report: Report = Report.objects.select_related("brand").get(id=report_id)
-    brands = [report.brand] + list(report.competitors.order_by("id"))
-
-    # Pull latest snapshot per metric per brand within the report's pull window.
-    qs: QuerySet = (
-        MetricSnapshot.objects
-        .filter(report_id=report_id)
-        .values("brand_id", "metric_name")
-        .annotate(latest_pk=Max("id"))
-    )
+    report: Report = Report.objects.select_related("owner").get(id=report_id)
+    competitors = list(report.competitors.order_by("id"))
+    brands = [report.owner] + competitors
 
-    latest_ids = [row["latest_pk"] for row in qs]
-    latest_snaps = MetricSnapshot.objects.filter(id__in=latest_ids)
+    # values[column][metric_name] – column 0 is the owner, then competitors in order
+    values: list[Dict[str, Any]] = [{} for _ in brands]
 
-    # Build a DataFrame keyed by (brand, metric_name)
-    df_raw = (
-        pd.DataFrame.from_records(latest_snaps.values("brand_id", "metric_name", "value"))
-        .pivot(index="metric_name", columns="brand_id", values="value")
+    # Latest snapshot per metric on this report: ordered by fetched_at, the
+    # last row wins (ids are uuid4 and say nothing about recency)
+    rows = (
+        MetricSnapshot.objects
+        .filter(report_id=report_id, brand_id=report.owner_id)
+        .order_by("fetched_at")
+        .values_list("metric_name", "value")
     )
+    for metric, value in rows:
+        values[0][metric] = value
+
+    # Competitors read the shared site / profile rows – the latest pull as of the
+    # report's finalisation, so rebuilding an old report doesn't pick up
+    # today's numbers
+    as_of = report.finalised_at or report.created_at
+    by_domain: Dict[int, Dict[str, Any]] = {pk: {} for c in competitors for pk in c.domain_ids}
+    if by_domain:
+        rows = (
+            DomainSnapshot.objects
+            .filter(domain_id__in=by_domain, fetched_at__lte=as_of)
+            .order_by("fetched_at")
+            .values_list("domain_id", "metric_name", "value")
+        )
+        for domain_id, metric, value in rows:
+            by_domain[domain_id][metric] = value
+        for col, comp in enumerate(competitors, start=1):
+            for pk in comp.domain_ids:  # site + social profiles; their metric names don't overlap
+                values[col].update(by_domain[pk])
 
     # Create final dataframe
     data = []
     for kpi in _REGISTRY:
         row = [kpi.label]
-        metric = df_raw.loc[kpi.key] if kpi.key in df_raw.index else pd.Series(dtype=float)
-        for brand in brands:
-            val = kpi.compute(metric.get(brand.id, pd.NA)) if not metric.empty else pd.NA
-            row.append(val)
+        for column in values:
+            val = column.get(kpi.key)
+            row.append(kpi.compute(pd.Series([val], dtype=float)) if val is not None else pd.NA)
         data.append(row)
 
     columns = ["KPI"] + [b.name for b in brands]
-    return pd.DataFrame(data, columns=columns)
\ No newline at end of file
+    return pd.DataFrame(data, columns=columns)
+
+
+# ---------------------------------------------------------------------------
+# 3. Materialised table – built once at finalisation, read by the views
+# ---------------------------------------------------------------------------
+
+def _cell(val: Any) -> Any:
+    """JSON-safe scalar: NaN / NA → None, whole floats → int."""
+    try:
+        num = float(val)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(num):
+        return None
+    return int(num) if num.is_integer() else round(num, 4)
+
+
+def materialise_kpi_table(report_id) -> Dict[str, Any]:
+    """
+    Build the KPI table once and store it on ``Report.kpi_table`` as
+    ``{"columns": ["KPI", brand, …], "keys": [metric key per row], "rows": [[label, v, …], …]}``.
+    Competitor columns are read as of ``Report.finalised_at``, so a rebuild
+    after an invalidation gives the same competitor numbers.
+    """
+    df = build_kpi_dataframe(report_id)
+    table = {
+        "columns": list(df.columns),
+        "keys": [kpi.key for kpi in _REGISTRY],
+        "rows": [[row[0]] + [_cell(v) for v in row[1:]] for row in df.itertuples(index=False)],
+    }
+    Report.objects.filter(id=report_id).update(kpi_table=table)
+    return table
+
+
+def kpi_table(report: Report) -> Dict[str, Any]:
+    """The stored table; rebuilt (and stored again) only after an invalidation."""
+    if report.kpi_table is not None:
+        return report.kpi_table
+    report.kpi_table = materialise_kpi_table(report.id)
+    return report.kpi_table
+
+
+def kpi_value(table: Dict[str, Any], key: str, column: str) -> Any:
+    """Cell for registry *key* (e.g. ``"domain_authority"``) and *column* (brand name)."""
+    try:
+        return table["rows"][table["keys"].index(key)][table["columns"].index(column)]
+    except (KeyError, ValueError, IndexError):
+        return None
+
+
+def kpi_records(table: Dict[str, Any]) -> list[Dict[str, Any]]:
+    """Row dicts, e.g. for the AI insight prompt."""
+    return [dict(zip(table["columns"], row)) for row in table["rows"]]
@@ -0,0 +1,29 @@
+"""Content-addressed, zstd-compressed storage for raw provider responses.
+
+Usage:
+    from utils.payloads import pack, decode
+    digest, blob, size = pack(ga4_data)   # sha256 key, compressed bytes, raw length
+    decode(blob)                          # → the JSON round-tripped ga4_data
+"""
+from __future__ import annotations
+import os, json, hashlib
+from typing import Any, Tuple
+
+import zstandard
+
+LEVEL = int(os.getenv("RAW_PAYLOAD_ZSTD_LEVEL", "3"))
+
+
+def canonical(raw: Any) -> bytes:
+    """Stable JSON bytes – key order and whitespace never change the digest."""
+    return json.dumps(raw, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def pack(raw: Any) -> Tuple[str, bytes, int]:
+    body = canonical(raw)
+    blob = zstandard.ZstdCompressor(level=LEVEL).compress(body)
+    return hashlib.sha256(body).hexdigest(), blob, len(body)
+
+
+def decode(blob: bytes | memoryview) -> Any:
+    return json.loads(zstandard.ZstdDecompressor().decompress(bytes(blob)))
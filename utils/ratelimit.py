@@ -0,0 +1,91 @@
+"""
+Distributed token-bucket rate limiter shared by every Celery worker via Redis.
+
+Buckets are configured in ``settings.API_RATE_LIMITS`` keyed by ``"provider"``
+or ``"provider:endpoint"``; a call must pass *both* the endpoint bucket (if
+any) and the provider bucket. Each bucket holds up to ``burst`` tokens and
+refills at ``rate`` tokens/second, measured on the Redis server clock so that
+workers on different hosts agree.
+
+Usage:
+    from utils.ratelimit import acquire
+    acquire("serpstack", "search")   # blocks until a token is available
+"""
+from __future__ import annotations
+import time, logging
+from typing import Dict, Any, List
+
+import redis
+from django.conf import settings
+
+from utils.redis_conn import get_redis
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "mi:ratelimit:"
+
+# Returns seconds to wait (as a string – Lua floats are truncated otherwise);
+# "0" means a token was taken.
+_TOKEN_BUCKET_LUA = """
+if redis.replicate_commands then redis.replicate_commands() end
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a token could not be obtained within ``API_RATE_LIMIT_MAX_WAIT``."""
+
+
+def _buckets(provider: str, endpoint: str = "") -> List[tuple]:
+    limits: Dict[str, Dict[str, Any]] = getattr(settings, "API_RATE_LIMITS", {})
+    names = [f"{provider}:{endpoint}", provider] if endpoint else [provider]
+    return [(name, limits[name]) for name in names if name in limits]
+
+
+def acquire(provider: str, endpoint: str = "", *, cost: float = 1.0) -> float:
+    """
+    Block until *cost* tokens are available in every bucket configured for
+    ``provider[:endpoint]`` and return the seconds spent waiting. Fails open
+    (logs and proceeds) when Redis is unreachable.
+    """
+    buckets = _buckets(provider, endpoint)
+    if not buckets:
+        return 0.0
+    max_wait = float(getattr(settings, "API_RATE_LIMIT_MAX_WAIT", 60))
+    waited = 0.0
+    try:
+        script = get_redis().register_script(_TOKEN_BUCKET_LUA)
+        for name, conf in buckets:
+            while True:
+                wait = float(script(
+                    keys=[KEY_PREFIX + name],
+                    args=[conf["rate"], conf.get("burst", 1), cost],
+                ))
+                if wait <= 0:
+                    break
+                if waited + wait > max_wait:
+                    raise RateLimitTimeout(f"Rate limit for {name} exceeded {max_wait}s wait")
+                time.sleep(wait)
+                waited += wait
+    except redis.RedisError as exc:
+        log.warning("Rate limiter unavailable (%s) – proceeding unthrottled", exc)
+    if waited:
+        log.info("Throttled %s:%s for %.2fs", provider, endpoint, waited)
+    return waited
@@ -0,0 +1,22 @@
+"""Process-wide Redis connection shared by the rate limiter, breakers & caches."""
+from __future__ import annotations
+import os
+from typing import Dict
+
+import redis
+from django.conf import settings
+
+_CLIENTS: Dict[int, redis.Redis] = {}
+
+
+def get_redis() -> redis.Redis:
+    """Return this process's client for ``settings.REDIS_URL`` (fork-safe)."""
+    pid = os.getpid()
+    if pid not in _CLIENTS:
+        _CLIENTS[pid] = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+            health_check_interval=30,
+        )
+    return _CLIENTS[pid]
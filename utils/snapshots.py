@@ -0,0 +1,160 @@
+"""Buffered MetricSnapshot writer – one INSERT per collection task instead of
+one per metric.
+
+Usage:
+    with SnapshotWriter(report) as snaps:
+        snaps.add(brand, "domain_authority", 57)
+        snaps.add(brand, "ga4_sessions", 1234, raw=ga4_data)
+    # → flushed with a single bulk_create inside one transaction, and the
+    #   report's materialised KPI table invalidated
+
+Raw responses go to RawPayload once per distinct content; the same dict
+passed for several metrics (e.g. the four GA4 KPIs) is packed only once.
+"""
+from __future__ import annotations
+import datetime as dt
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models.domain import Domain, DomainSnapshot
+from core.models.metrics import MetricSnapshot, RawPayload
+from core.models.oauth import Brand
+from core.models.report import Report
+from utils.payloads import pack
+
+
+class SnapshotWriter:
+    """
+    Collects snapshot rows for one task and writes them in one round-trip.
+
+    Every row of a flush shares one ``fetched_at``. Adding the same metric
+    twice for one report replaces the earlier value; the same brand + metric
+    for *different* reports (batched stage) is kept once per report, each
+    copy nudged forward by a microsecond so ``(brand, metric_name,
+    fetched_at)`` stays unique. A row colliding with an existing one (two
+    workers flushing in the same microsecond) overwrites it instead of
+    raising ``IntegrityError``.
+    """
+
+    UPDATE_FIELDS = ["report", "value", "payload", "reused_from"]
+
+    def __init__(self, report: Optional[Report] = None):
+        self.report = report
+        self._rows: Dict[Tuple[Any, Any, str], MetricSnapshot] = {}
+        # id(raw) → (raw, RawPayload); raw is held so its id cannot be reused
+        self._packed: Dict[int, Tuple[Any, RawPayload]] = {}
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        # flush even when the task fails part-way – metrics already fetched
+        # are kept, as with the old one-create-per-metric writes
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(
+        self,
+        brand: Brand,
+        metric: str,
+        value: float | None,
+        raw: Dict[str, Any] | None = None,
+        *,
+        report: Optional[Report] = None,
+    ) -> None:
+        """Buffer one KPI; *report* overrides the writer's report for this row."""
+        report = report if report is not None else self.report
+        self._rows[(report.pk if report else None, brand.pk, metric)] = MetricSnapshot(
+            report=report,
+            brand=brand,
+            metric_name=metric,
+            value=value,
+            payload=self._payload(raw) if raw else None,
+        )
+
+    def copy(self, source: Dict[str, Any], *, report: Optional[Report] = None) -> None:
+        """
+        Buffer a copy of an existing snapshot (``id``, ``brand_id``,
+        ``metric_name``, ``value``, ``payload_id`` values) for this report
+        instead of fetching it again; the copy points back via ``reused_from``.
+        """
+        report = report if report is not None else self.report
+        self._rows[(report.pk if report else None, source["brand_id"], source["metric_name"])] = MetricSnapshot(
+            report=report,
+            brand_id=source["brand_id"],
+            metric_name=source["metric_name"],
+            value=source["value"],
+            payload_id=source["payload_id"],
+            reused_from_id=source["id"],
+        )
+
+    def _payload(self, raw: Dict[str, Any]) -> RawPayload:
+        hit = self._packed.get(id(raw))
+        if hit is None:
+            digest, blob, size = pack(raw)
+            hit = self._packed[id(raw)] = (raw, RawPayload(digest=digest, data=blob, size=size))
+        return hit[1]
+
+    def flush(self, fetched_at: Optional[dt.datetime] = None) -> int:
+        """Write payloads + snapshots with one ``bulk_create`` each; returns the row count."""
+        rows = list(self._rows.values())
+        payloads = {p.digest: p for _raw, p in self._packed.values()}
+        self._rows.clear()
+        self._packed.clear()
+        if not rows:
+            return 0
+        fetched_at = fetched_at or timezone.now()
+        seen: Dict[Tuple[Any, str], int] = {}
+        for row in rows:
+            n = seen.get((row.brand_id, row.metric_name), 0)
+            seen[(row.brand_id, row.metric_name)] = n + 1
+            row.fetched_at = fetched_at + dt.timedelta(microseconds=n)
+        report_ids = {row.report_id for row in rows if row.report_id}
+        with transaction.atomic():
+            # identical content already stored by an earlier flush is skipped
+            RawPayload.objects.bulk_create(payloads.values(), ignore_conflicts=True)
+            MetricSnapshot.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["brand", "metric_name", "fetched_at"],
+                update_fields=self.UPDATE_FIELDS,
+            )
+            # the materialised KPI table of these reports is now out of date
+            if report_ids:
+                Report.objects.filter(id__in=report_ids, kpi_table__isnull=False).update(kpi_table=None)
+        return len(rows)
+
+
+def store_domain_snapshots(rows: List[Tuple[Domain, str, float | None, Dict[str, Any] | None]]) -> int:
+    """
+    Write ``(domain, metric, value, raw)`` rows as DomainSnapshots in one
+    transaction, payloads packed and deduped the same way as SnapshotWriter.
+    """
+    if not rows:
+        return 0
+    fetched_at = timezone.now()
+    packed: Dict[int, RawPayload] = {}
+    snaps: Dict[Tuple[int, str], DomainSnapshot] = {}
+    for domain, metric, value, raw in rows:
+        payload = None
+        if raw:
+            if id(raw) not in packed:
+                digest, blob, size = pack(raw)
+                packed[id(raw)] = RawPayload(digest=digest, data=blob, size=size)
+            payload = packed[id(raw)]
+        snaps[(domain.pk, metric)] = DomainSnapshot(
+            domain=domain, metric_name=metric, value=value, payload=payload, fetched_at=fetched_at,
+        )
+    with transaction.atomic():
+        RawPayload.objects.bulk_create({p.digest: p for p in packed.values()}.values(), ignore_conflicts=True)
+        DomainSnapshot.objects.bulk_create(
+            snaps.values(),
+            update_conflicts=True,
+            unique_fields=["domain", "metric_name", "fetched_at"],
+            update_fields=["value", "payload"],
+        )
+    return len(snaps)
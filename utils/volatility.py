@@ -0,0 +1,130 @@
+"""Adaptive refresh scheduling from observed metric volatility.
+
+Each (brand, metric) series gets a change rate – the share of its last
+``HISTORY`` original pulls whose value moved by more than ``TOLERANCE`` – and
+a refresh interval interpolated geometrically between
+``REFRESH_INTERVAL_MIN`` (rate 1: changes every pull) and
+``REFRESH_INTERVAL_MAX`` (rate 0: never changes). The fleet refresh runs
+daily and pulls only the due series, so intervals resolve to whole days.
+
+Usage:
+    from utils import volatility
+    volatility.due_metrics(brand_id, ["domain_authority", "twitter_followers"])
+    volatility.update_schedules([brand_id, …])   # after the refresh stored new rows
+    volatility.stats()   # → {"due": …, "skipped": …, "savings_ratio": …}
+"""
+from __future__ import annotations
+import datetime as dt
+from typing import Dict, Iterable, List, Sequence
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models.metrics import MetricSnapshot
+from core.models.refresh import RefreshSchedule
+from utils.redis_conn import get_redis
+
+HISTORY = 10          # pulls per series the change rate looks at
+TOLERANCE = 0.01      # relative move below this counts as "unchanged"
+LOOKBACK_DAYS = 180
+# a series is due slightly early rather than a whole refresh cycle late
+DUE_SLACK = dt.timedelta(hours=12)
+STATS_KEY = "mi:refresh-stats"
+
+
+def change_rate(values: Sequence[float | None]) -> float:
+    """Share of consecutive pulls (oldest → newest) whose value moved."""
+    pairs = list(zip(values, values[1:]))
+    if not pairs:
+        return 1.0  # unknown – treat as volatile until history builds up
+    moved = 0
+    for old, new in pairs:
+        if old is None or new is None:
+            moved += (old is None) != (new is None)
+        elif abs(new - old) > TOLERANCE * max(abs(old), 1.0):
+            moved += 1
+    return moved / len(pairs)
+
+
+def interval_for(rate: float) -> int:
+    """Seconds until the next pull: MIN at rate 1, MAX at rate 0, geometric in between."""
+    lo, hi = settings.REFRESH_INTERVAL_MIN, settings.REFRESH_INTERVAL_MAX
+    return int(round(lo ** rate * hi ** (1 - rate)))
+
+
+def update_schedules(brand_ids: Iterable[int]) -> int:
+    """Recompute the schedule of every series of *brand_ids* from snapshot history."""
+    since = timezone.now() - dt.timedelta(days=LOOKBACK_DAYS)
+    rows = (
+        MetricSnapshot.objects
+        .filter(brand_id__in=list(brand_ids), reused_from__isnull=True, fetched_at__gte=since)
+        .order_by("brand_id", "metric_name", "-fetched_at")
+        .values_list("brand_id", "metric_name", "value", "fetched_at")
+    )
+    series: Dict[tuple, List[tuple]] = {}
+    for brand_id, metric, value, fetched_at in rows:
+        pulls = series.setdefault((brand_id, metric), [])
+        if len(pulls) < HISTORY:
+            pulls.append((fetched_at, value))
+
+    schedules = []
+    for (brand_id, metric), pulls in series.items():
+        pulls.reverse()  # oldest first
+        rate = change_rate([v for _, v in pulls])
+        interval = interval_for(rate)
+        schedules.append(RefreshSchedule(
+            brand_id=brand_id,
+            metric_name=metric,
+            change_rate=round(rate, 3),
+            samples=len(pulls),
+            interval=interval,
+            next_refresh_at=pulls[-1][0] + dt.timedelta(seconds=interval),
+        ))
+    with transaction.atomic():
+        RefreshSchedule.objects.bulk_create(
+            schedules,
+            update_conflicts=True,
+            unique_fields=["brand", "metric_name"],
+            update_fields=["change_rate", "samples", "interval", "next_refresh_at", "updated_at"],
+        )
+    return len(schedules)
+
+
+def due_metrics(brand_id: int, metrics: Iterable[str]) -> set:
+    """*metrics* of the brand that are due now – series without a schedule always are."""
+    metrics = set(metrics)
+    not_due = set(
+        RefreshSchedule.objects
+        .filter(brand_id=brand_id, metric_name__in=metrics, next_refresh_at__gt=timezone.now() + DUE_SLACK)
+        .values_list("metric_name", flat=True)
+    )
+    return metrics - not_due
+
+
+# ─────────────────────────────  savings  ────────────────────────────────────
+def record(due: int, skipped: int) -> None:
+    """Count refresh calls made (*due*) and avoided (*skipped*)."""
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hincrby(STATS_KEY, "due", due)
+        pipe.hincrby(STATS_KEY, "skipped", skipped)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def stats() -> Dict[str, float]:
+    """Calls made / avoided by adaptive scheduling since the last ``reset_stats``."""
+    try:
+        raw = get_redis().hgetall(STATS_KEY)
+    except redis.RedisError:
+        return {}
+    due, skipped = int(raw.get(b"due", 0)), int(raw.get(b"skipped", 0))
+    total = due + skipped
+    return {"due": due, "skipped": skipped, "savings_ratio": round(skipped / total, 3) if total else 0.0}
+
+
+def reset_stats() -> None:
+    get_redis().delete(STATS_KEY)